@@ -0,0 +1,70 @@
+# Benchmark ticking ability cooldowns held in per-ability dicts vs the player's single timer array
+# Run from the repository root: python benchmarks/bench_abilities.py
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import numpy as np
+import main as game
+
+game.init_display(headless=True)
+
+TICKS = 6000
+ABILITY_COUNTS = [4, 16, 64, 256]
+
+def dict_abilities(count):
+    # The old Player.abilities: a dict per ability, a speed burst style duration on every fourth
+    abilities = {}
+    for i in range(count):
+        ability = {"cooldown": 0, "max_cooldown": 15 + i}
+        if i % 4 == 3:
+            ability.update(active=False, duration=0, max_duration=30)
+        abilities[f"ability_{i}"] = ability
+    return abilities
+
+def dict_tick(abilities, cast):
+    # The old Player.use_ability bookkeeping and Player.update
+    for name in cast:
+        ability = abilities[name]
+        if ability["cooldown"] <= 0:
+            ability["cooldown"] = ability["max_cooldown"]
+            if "active" in ability:
+                ability["active"] = True
+                ability["duration"] = ability["max_duration"]
+    for ability in abilities.values():
+        if ability["cooldown"] > 0:
+            ability["cooldown"] -= 1
+        if ability.get("active"):
+            ability["duration"] -= 1
+            if ability["duration"] <= 0:
+                ability["active"] = False
+
+def array_tick(timers, max_cooldowns, max_durations, cast):
+    cooldowns, durations = timers
+    for i in cast:
+        if cooldowns[i] <= 0:
+            cooldowns[i] = max_cooldowns[i]
+            durations[i] = max_durations[i]
+    timers -= timers > 0
+
+def time_ticks(tick):
+    start = time.perf_counter()
+    for t in range(TICKS):
+        tick(t)
+    return (time.perf_counter() - start) / TICKS * 1e6
+
+if __name__ == "__main__":
+    print(f"{'abilities':>10} {'dicts (us/tick)':>16} {'array (us/tick)':>16} {'speedup':>8}")
+    for count in ABILITY_COUNTS:
+        names = [f"ability_{i}" for i in range(count)]
+        abilities = dict_abilities(count)
+        before = time_ticks(lambda t: dict_tick(abilities, names[t % count:t % count + 1]))
+
+        timers = np.zeros((2, count), dtype=np.int32)
+        max_cooldowns = np.arange(15, 15 + count, dtype=np.int32)
+        max_durations = np.where(np.arange(count) % 4 == 3, 30, 0).astype(np.int32)
+        after = time_ticks(lambda t: array_tick(timers, max_cooldowns, max_durations, [t % count]))
+        print(f"{count:>10} {before:>16.2f} {after:>16.2f} {before / after:>7.1f}x")
@@ -0,0 +1,63 @@
+# Benchmark a fire cone lingering over a dense horde: rect hits every tick vs its pixel mask hitting once per interval
+# Run from the repository root: python benchmarks/bench_aoe.py
+import os
+import sys
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import main as game
+
+game.init_display(headless=True)
+from entities import ecs
+from entities.ecs import Archetype
+from utils.masks import overlap_tables
+
+ENEMY_COUNTS = [100, 1000, 5000]
+CONE_X, CONE_Y = 1000, 1000
+
+def make_scene(enemy_count, exact):
+    random.seed(enemy_count)
+    enemies = game.create_enemy_swarm()
+    width, height = game.assets.get("fire_cone").get_size()
+    top = game.PROJECTILE_KINDS[game.FIRE_CONE]["top"]
+    for _ in range(enemy_count):
+        # Packed over both cones' rects and just around them
+        x = random.randint(CONE_X - width // 2 - 40, CONE_X + width // 2)
+        y = random.randint(CONE_Y - top - 40, CONE_Y + height)
+        enemies.spawn(x, y, random.randint(0, 4))
+    enemies.health[:enemies.count] = 1e12  # Keep the horde alive for the cone's whole lifetime
+    projectiles = Archetype(game.PROJECTILE_COMPONENTS)
+    i = game.spawn_projectile(projectiles, game.FIRE_CONE, CONE_X, CONE_Y)
+    if not exact:
+        # The old cone: its whole rect hanging from the caster, 10 damage to everything under it every tick
+        projectiles.masked[i] = False
+        projectiles.hit_interval[i] = 0
+        projectiles.damage[i] = 10
+        projectiles.anchor_y[i] = 0
+    shapes = overlap_tables([game.assets.get(spec["sprite"]) for spec in game.PROJECTILE_KINDS], enemies.images,
+                            [spec["mask"] for spec in game.PROJECTILE_KINDS])
+    return enemies, projectiles, shapes
+
+def time_cone(enemy_count, exact):
+    """(us per tick, damage dealt, largest hit set) over the cone's lifetime"""
+    enemies, projectiles, shapes = make_scene(enemy_count, exact)
+    hits = ecs.HitSet()
+    ticks = game.PROJECTILE_KINDS[game.FIRE_CONE]["lifetime"]
+    largest = 0
+    start = time.perf_counter()
+    for tick in range(ticks):
+        ecs.damage(projectiles, enemies, shapes, hits, tick)
+        largest = max(largest, len(hits))
+    elapsed = (time.perf_counter() - start) / ticks * 1e6
+    return elapsed, (1e12 - enemies.health[:enemies.count]).sum(), largest
+
+if __name__ == "__main__":
+    print(f"{'enemies':>8} {'rect (us/tick)':>15} {'mask (us/tick)':>15} {'rect damage':>12} {'mask damage':>12} "
+          f"{'hit set':>8}")
+    for count in ENEMY_COUNTS:
+        before, before_damage, _ = time_cone(count, exact=False)
+        after, after_damage, largest = time_cone(count, exact=True)
+        print(f"{count:>8} {before:>15.1f} {after:>15.1f} {before_damage:>12.0f} {after_damage:>12.0f} {largest:>8}")
@@ -0,0 +1,65 @@
+# Benchmark drawing a field of cakes with per-frame scaling vs. the pre-baked pulse frames
+# Run from the repository root: python benchmarks/bench_cake_draw.py
+import os
+import sys
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import pygame
+import main as game
+from entities import ecs
+from entities.ecs import Archetype
+
+game.init_display(headless=True)
+from utils.game_utils import PULSE_AMOUNT, PULSE_STEPS
+
+FRAMES = 60
+CAKE_COUNTS = [10, 100, 500, 2000]
+
+def scaled_draw(cakes, window, camera_x, camera_y):
+    # The old Cake.draw: scale the sprite for every cake on every frame
+    image = game.assets.get("cake")
+    width, height = image.get_size()
+    for x, y, step in zip(cakes.x[:cakes.count].tolist(), cakes.y[:cakes.count].tolist(),
+                          cakes.pulse_step[:cakes.count].tolist()):
+        pulse_scale = 1 + PULSE_AMOUNT * step / PULSE_STEPS
+        pulsed_img = pygame.transform.scale(image, (int(width * pulse_scale), int(height * pulse_scale)))
+        window.blit(
+            pulsed_img,
+            (
+                x - camera_x - (pulsed_img.get_width() - width) // 2,
+                y - camera_y - (pulsed_img.get_height() - height) // 2
+            )
+        )
+
+def frames_draw(cakes, window, camera_x, camera_y):
+    frames = game.get_pulse_frames(game.assets.get("cake"))
+    for x, y, step in zip(cakes.x[:cakes.count].tolist(), cakes.y[:cakes.count].tolist(),
+                          cakes.pulse_step[:cakes.count].tolist()):
+        pulsed_img, offset_x, offset_y = frames[step]
+        window.blit(pulsed_img, (x - camera_x - offset_x, y - camera_y - offset_y))
+
+def time_frames(cakes, draw):
+    window = pygame.Surface((game.WIDTH, game.HEIGHT))
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        ecs.pulse(cakes)
+        draw(cakes, window, 0, 0)
+    return (time.perf_counter() - start) / FRAMES * 1000
+
+def make_cakes(count):
+    random.seed(count)
+    cakes = Archetype(game.CAKE_COMPONENTS)
+    for _ in range(count):
+        game.spawn_cake(cakes, random.randint(0, game.WIDTH), random.randint(0, game.HEIGHT))
+    return cakes
+
+if __name__ == "__main__":
+    print(f"{'cakes':>6} {'scaled (ms)':>12} {'frames (ms)':>12} {'speedup':>8}")
+    for count in CAKE_COUNTS:
+        before = time_frames(make_cakes(count), scaled_draw)
+        after = time_frames(make_cakes(count), frames_draw)
+        print(f"{count:>6} {before:>12.3f} {after:>12.3f} {before / after:>7.1f}x")
@@ -0,0 +1,81 @@
+# Benchmark the enemy update + projectile collision part of a frame, per-object scan vs the grid-indexed swarm
+# Run from the repository root: python benchmarks/bench_collision.py
+import os
+import sys
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import pygame
+import main as game
+
+game.init_display(headless=True)
+from entities import ecs
+from entities.ecs import Archetype
+from old_enemy import Enemy
+
+FRAMES = 60
+ENEMY_COUNTS = [100, 1000, 5000]
+
+ENEMY_IMAGES = [game.assets.get(name) for name in ("mob_ariel", "mob_john", "mob_kirtik", "mob_margaret", "mob_tim")]
+
+def make_scene(enemy_count, swarm=False):
+    random.seed(enemy_count)
+    size = game.MAP_WIDTH * game.TILE_SIZE
+    enemies = game.create_enemy_swarm() if swarm else []
+    for _ in range(enemy_count):
+        x, y, type_id = random.randint(0, size), random.randint(0, size), random.randint(0, 4)
+        if swarm:
+            enemy = enemies.spawn(x, y, type_id)
+        else:
+            enemy = Enemy(x, y, type_id, ENEMY_IMAGES[type_id], game.INTERRUPTION_MESSAGES)
+            enemies.append(enemy)
+        enemy.health = float("inf")  # Keep the population constant across frames
+    # Worst case allowed by the cooldowns: four lingering cones, eight missiles and a lightning bolt
+    archetype = Archetype(game.PROJECTILE_COMPONENTS)
+    for _ in range(4):
+        game.spawn_projectile(archetype, game.FIRE_CONE, random.randint(0, size), random.randint(0, size))
+    for _ in range(8):
+        game.spawn_projectile(archetype, game.MAGIC_MISSILE, random.randint(0, size), random.randint(0, size))
+    game.spawn_projectile(archetype, game.LIGHTNING, size // 2, size // 2)
+    # (rect, damage, pierce) per projectile, so no pass spends its projectiles
+    projectiles = [(pygame.Rect(rect), damage, pierce) for rect, damage, pierce in zip(
+        zip(*(column.tolist() for column in ecs.rects(archetype))),
+        archetype.damage[:archetype.count].tolist(), archetype.pierce[:archetype.count].tolist())]
+    return enemies, projectiles
+
+def naive_pass(enemies, projectiles, player):
+    for enemy in enemies:
+        enemy.update(player)
+    for rect, damage, pierce in projectiles:
+        for enemy in enemies[:]:
+            if rect.colliderect(enemy.rect):
+                enemy.health -= damage
+                if not pierce:
+                    break
+
+def swarm_pass(swarm, projectiles, player):
+    swarm.update(player)
+    for rect, damage, pierce in projectiles:
+        hits = swarm.query_indices(rect)
+        if not pierce:
+            hits = hits[:1]
+        swarm.damage(hits, damage)
+
+def time_frames(frame):
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        frame()
+    return (time.perf_counter() - start) / FRAMES * 1000
+
+if __name__ == "__main__":
+    print(f"{'enemies':>8} {'objects (ms)':>13} {'swarm (ms)':>11} {'speedup':>8}")
+    for count in ENEMY_COUNTS:
+        enemies, projectiles = make_scene(count)
+        player = game.Player(game.WIDTH // 2, game.HEIGHT // 2)
+        before = time_frames(lambda: naive_pass(enemies, projectiles, player))
+        swarm, projectiles = make_scene(count, swarm=True)
+        vectorised = time_frames(lambda: swarm_pass(swarm, projectiles, player))
+        print(f"{count:>8} {before:>13.3f} {vectorised:>11.3f} {before / vectorised:>7.1f}x")
@@ -0,0 +1,67 @@
+# Benchmark drawing every entity on the map vs culling draws to the viewport with the spatial indexes
+# Run from the repository root: python benchmarks/bench_culling.py
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import main as game
+
+window = game.init_display(headless=True)
+from old_draw import draw_enemy
+
+FRAMES = 60
+SPREAD = 8  # Entities are scattered over this many screens in each direction
+POPULATIONS = [100, 1000, 5000]
+
+def make_game(count):
+    """A game on an unbounded map with `count` enemies and cakes scattered around the player"""
+    state = game.Game(infinite=True, seed=count)
+    rng = state.rng
+    width, height = game.WIDTH * SPREAD, game.HEIGHT * SPREAD
+    for _ in range(count):
+        x = rng.randint(-width // 2, width // 2)
+        y = rng.randint(-height // 2, height // 2)
+        state.enemies.spawn(x, y, rng.randint(0, 4))
+        game.spawn_cake(state.cakes, rng.randint(-width // 2, width // 2), rng.randint(-height // 2, height // 2))
+    state.enemies.message_timer[:state.enemies.count] = 0  # Every speech bubble up
+    state.enemies.rebuild_grid()
+    return state
+
+def draw_all(state):
+    # The old Game.draw, background and entity loops without culling (the small HUD is left out)
+    camera_x, camera_y = state.camera_x, state.camera_y
+    state.draw_background(window)
+    cakes, projectiles = state.cakes, state.projectiles
+    frames = game.get_pulse_frames(game.assets.get("cake"))
+    for x, y, step in zip(cakes.x[:cakes.count].tolist(), cakes.y[:cakes.count].tolist(),
+                          cakes.pulse_step[:cakes.count].tolist()):
+        pulsed_img, offset_x, offset_y = frames[step]
+        window.blit(pulsed_img, (x - camera_x - offset_x, y - camera_y - offset_y))
+    for i in range(projectiles.count):
+        image = game.assets.get(game.PROJECTILE_KINDS[projectiles.sprite[i]]["sprite"])
+        window.blit(image, (projectiles.x[i] - projectiles.anchor_x[i] - camera_x,
+                            projectiles.y[i] - projectiles.anchor_y[i] - camera_y))
+    for enemy in state.enemies:
+        draw_enemy(window, enemy, camera_x, camera_y)
+
+def draw_culled(state):
+    state.draw(window)
+
+def time_frames(state, draw):
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        draw(state)
+    return (time.perf_counter() - start) / FRAMES * 1000
+
+if __name__ == "__main__":
+    print(f"{'entities':>9} {'drawn':>6} {'all (ms)':>9} {'culled (ms)':>12} {'speedup':>8}")
+    for count in POPULATIONS:
+        state = make_game(count)
+        state.draw(window)
+        culled = sum(state.culled)
+        before = time_frames(state, draw_all)
+        after = time_frames(state, draw_culled)
+        print(f"{2 * count:>9} {2 * count - culled:>6} {before:>9.2f} {after:>12.2f} {before / after:>7.1f}x")
@@ -0,0 +1,60 @@
+# Benchmark a full redraw and flip of every frame vs the dirty-rect renderer, with the camera at rest
+# Run from the repository root: python benchmarks/bench_dirty_rects.py
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import numpy as np
+import pygame
+import main as game
+
+window = game.init_display(headless=True)
+from utils.dirty_rects import DirtyRects
+
+FRAMES = 300
+ENEMY_COUNTS = [0, 10, 50, 200]
+
+def make_game(enemies):
+    state = game.Game(seed=enemies)
+    for _ in range(enemies):
+        game.spawn_enemy(state.player, state.enemies, rng=state.rng)
+    for _ in range(120):  # Let the camera settle on the player
+        state.step(0, 0)
+    return state
+
+def time_frames(state, dirty):
+    """Average ms per drawn and flipped frame, and the average share of the window updated"""
+    area = 0
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        state.step(0, 0)
+        rects = state.draw(window, dirty)
+        if rects is None:
+            pygame.display.update()
+            area += game.WIDTH * game.HEIGHT
+        else:
+            pygame.display.update(rects)
+            area += sum(rect.width * rect.height for rect in rects)
+    elapsed = (time.perf_counter() - start) / FRAMES * 1000
+    return elapsed, area / FRAMES / (game.WIDTH * game.HEIGHT)
+
+if __name__ == "__main__":
+    # Both paths must put the same pixels on screen
+    state, reference = make_game(20), make_game(20)
+    dirty = DirtyRects()
+    surface = pygame.Surface((game.WIDTH, game.HEIGHT)).convert()
+    for _ in range(90):
+        state.step(0, 0)
+        reference.step(0, 0)
+        state.draw(window, dirty)
+        reference.draw(surface)
+        assert np.array_equal(pygame.surfarray.array2d(window), pygame.surfarray.array2d(surface))
+
+    print(f"{'enemies':>8} {'full (ms)':>10} {'dirty (ms)':>11} {'updated':>8} {'speedup':>8}")
+    for count in ENEMY_COUNTS:
+        before, _ = time_frames(make_game(count), None)
+        after, updated = time_frames(make_game(count), DirtyRects())
+        print(f"{count:>8} {before:>10.3f} {after:>11.3f} {updated:>7.0%} {before / after:>7.1f}x")
@@ -0,0 +1,96 @@
+# Benchmark per-object projectile and cake updates vs the archetype systems running over whole columns
+# Run from the repository root: python benchmarks/bench_ecs.py
+import os
+import sys
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import pygame
+import main as game
+
+game.init_display(headless=True)
+from entities import ecs
+from entities.ecs import Archetype
+from utils.game_utils import PULSE_STEPS
+
+FRAMES = 60
+ENTITY_COUNTS = [10, 100, 1000, 10000]  # Of each of projectiles and cakes
+
+class Projectile:
+    # The old per-object projectile: its own rect, moved and aged by its own update()
+    __slots__ = ("x", "y", "vx", "vy", "width", "height", "lifetime", "rect")
+
+    def __init__(self, x, y, vx, vy):
+        self.x, self.y, self.vx, self.vy = x, y, vx, vy
+        self.width, self.height = game.assets.get("magic_missile").get_size()
+        self.lifetime = FRAMES + 1
+        self.rect = pygame.Rect(0, 0, self.width, self.height)
+
+    def update(self):
+        self.x += self.vx
+        self.y += self.vy
+        self.rect.x = self.x - self.width // 2
+        self.rect.y = self.y - self.height // 2
+        self.lifetime -= 1
+        return self.lifetime <= 0
+
+class Cake:
+    # The old per-object cake pulse
+    __slots__ = ("pulse_step", "growing")
+
+    def __init__(self):
+        self.pulse_step = 0
+        self.growing = True
+
+    def update(self):
+        if self.growing:
+            self.pulse_step += 1
+            if self.pulse_step >= PULSE_STEPS:
+                self.growing = False
+        else:
+            self.pulse_step -= 1
+            if self.pulse_step <= 0:
+                self.growing = True
+
+def make_entities(count):
+    random.seed(count)
+    velocities = [(random.uniform(-6, 6), random.uniform(-6, 6)) for _ in range(count)]
+    objects = [Projectile(game.WIDTH / 2, game.HEIGHT / 2, vx, vy) for vx, vy in velocities], [Cake() for _ in range(count)]
+    projectiles, cakes = Archetype(game.PROJECTILE_COMPONENTS), Archetype(game.CAKE_COMPONENTS)
+    for vx, vy in velocities:
+        i = game.spawn_projectile(projectiles, game.MAGIC_MISSILE, game.WIDTH / 2, game.HEIGHT / 2)
+        projectiles.vx[i], projectiles.vy[i] = vx, vy
+        projectiles.lifetime[i] = FRAMES + 1
+        game.spawn_cake(cakes, 0, 0)
+    return objects, (projectiles, cakes)
+
+def object_frame(objects):
+    projectiles, cakes = objects
+    for proj in projectiles:
+        proj.update()
+    for cake in cakes:
+        cake.update()
+
+def system_frame(archetypes):
+    projectiles, cakes = archetypes
+    ecs.movement(projectiles)
+    ecs.lifetime(projectiles)
+    ecs.rects(projectiles)
+    ecs.pulse(cakes)
+
+def time_frames(frame, entities):
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        frame(entities)
+    return (time.perf_counter() - start) / FRAMES * 1000
+
+if __name__ == "__main__":
+    print(f"{'entities':>9} {'objects (ms)':>13} {'systems (ms)':>13} {'speedup':>8}")
+    for count in ENTITY_COUNTS:
+        objects, archetypes = make_entities(count)
+        before = time_frames(object_frame, objects)
+        after = time_frames(system_frame, archetypes)
+        print(f"{2 * count:>9} {before:>13.3f} {after:>13.3f} {before / after:>7.1f}x")
@@ -0,0 +1,95 @@
+# Benchmark enemy pathing: beelining vs following the shared flow field, per tick and per enemy, and
+# check how often enemies away from the player have their bodies over a desk
+# Run from the repository root: python benchmarks/bench_flow_field.py
+import os
+import sys
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import numpy as np
+import main as game
+
+game.init_display(headless=True)
+from utils.flow_field import FlowField, blocked_tiles
+
+FRAMES = 200
+ENEMY_COUNTS = [100, 1000, 5000]
+DESK_ENEMIES = 1000
+DESK_TICKS = 300
+NEAR_PLAYER = 3 * game.TILE_SIZE  # Enemies this close head straight for the player, desks or not
+MAX_ON_DESK = 0.02  # Share of enemy ticks away from the player allowed over a desk when following the field
+
+def make_swarm(enemy_count):
+    random.seed(enemy_count)
+    size = game.MAP_WIDTH * game.TILE_SIZE
+    swarm = game.create_enemy_swarm()
+    for _ in range(enemy_count):
+        swarm.spawn(random.randint(0, size), random.randint(0, size), random.randint(0, 4))
+    return swarm
+
+def on_desk(swarm, blocked):
+    """Mask of the enemies whose rect overlaps a blocked tile, for rects no larger than a tile"""
+    n = swarm.count
+    size = game.TILE_SIZE
+    rows, cols = blocked.shape
+    left = np.clip(swarm.rect_x[:n] // size, 0, cols - 1)
+    right = np.clip((swarm.rect_x[:n] + swarm.width[:n] - 1) // size, 0, cols - 1)
+    top = np.clip(swarm.rect_y[:n] // size, 0, rows - 1)
+    bottom = np.clip((swarm.rect_y[:n] + swarm.height[:n] - 1) // size, 0, rows - 1)
+    return blocked[top, left] | blocked[top, right] | blocked[bottom, left] | blocked[bottom, right]
+
+def share_on_desks(blocked, field, player, flow):
+    """Share of enemy ticks away from the player spent overlapping a desk, enemies starting off the desks"""
+    random.seed(DESK_ENEMIES)
+    size = game.MAP_WIDTH * game.TILE_SIZE
+    swarm = game.create_enemy_swarm()
+    while swarm.count < DESK_ENEMIES:
+        enemy = swarm.spawn(random.randint(0, size - game.TILE_SIZE), random.randint(0, size - game.TILE_SIZE),
+                            random.randint(0, 4))
+        if on_desk(swarm, blocked)[enemy.index]:
+            swarm.remove(enemy)
+    over = away = 0
+    for _ in range(DESK_TICKS):
+        swarm.update(player, field if flow else None)
+        n = swarm.count
+        far = np.hypot(swarm.x[:n] - player.x, swarm.y[:n] - player.y) > NEAR_PLAYER
+        over += np.count_nonzero(on_desk(swarm, blocked) & far)
+        away += np.count_nonzero(far)
+    return over / away
+
+def time_frames(frame):
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        frame()
+    return (time.perf_counter() - start) / FRAMES * 1000
+
+if __name__ == "__main__":
+    random.seed(0)
+    blocked = blocked_tiles(game.create_office_tiles())
+    field = FlowField(blocked, game.TILE_SIZE)
+    player = game.Player(game.WIDTH // 2, game.HEIGHT // 2)
+
+    targets = [(random.randrange(game.MAP_WIDTH), random.randrange(game.MAP_HEIGHT)) for _ in range(FRAMES)]
+    def rebuild():
+        field.target = targets[field.rebuilds % FRAMES]
+        field.rebuild()
+    print(f"flow field rebuild ({game.MAP_WIDTH}x{game.MAP_HEIGHT} tiles): {time_frames(rebuild):.3f} ms")
+
+    field.update(player.x, player.y)
+    print(f"{'enemies':>8} {'beeline (ms)':>13} {'flow (ms)':>10} {'flow per enemy (us)':>20}")
+    for count in ENEMY_COUNTS:
+        swarm = make_swarm(count)
+        beeline = time_frames(lambda: swarm.update(player))
+        swarm = make_swarm(count)
+        flow = time_frames(lambda: swarm.update(player, field))
+        print(f"{count:>8} {beeline:>13.3f} {flow:>10.3f} {flow / count * 1000:>20.3f}")
+
+    beeline = share_on_desks(blocked, field, player, flow=False)
+    flow = share_on_desks(blocked, field, player, flow=True)
+    print(f"enemies away from the player over a desk: {beeline:.1%} beelining, {flow:.1%} following the field")
+    if flow > MAX_ON_DESK:
+        sys.exit(f"enemies following the flow field spent {flow:.1%} of their ticks over desks, "
+                 f"more than {MAX_ON_DESK:.0%}")
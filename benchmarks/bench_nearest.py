@@ -0,0 +1,77 @@
+# Benchmark magic missile targeting: linear scan over every enemy vs the swarm's grid nearest-neighbour query
+# Run from the repository root: python benchmarks/bench_nearest.py
+import math
+import os
+import sys
+import random
+import time
+
+import numpy as np
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import main as game
+
+game.init_display(headless=True)
+
+QUERIES = 1000
+ENEMY_COUNTS = [100, 1000, 5000]
+K = 5
+
+def make_swarm(enemy_count):
+    random.seed(enemy_count)
+    size = game.MAP_WIDTH * game.TILE_SIZE
+    swarm = game.create_enemy_swarm()
+    for _ in range(enemy_count):
+        swarm.spawn(random.randint(0, size), random.randint(0, size), random.randint(0, 4))
+    # Some of them already killed this tick, which both searches must skip
+    swarm.health[:enemy_count:10] = 0
+    swarm.update(game.Player(game.WIDTH // 2, game.HEIGHT // 2))
+    return swarm
+
+def linear_nearest(enemies, x, y):
+    # The scan Player.use_ability did before the grid query
+    closest_enemy = None
+    min_distance = float('inf')
+    for enemy in enemies:
+        if enemy.health <= 0:
+            continue
+        dx = enemy.x - x
+        dy = enemy.y - y
+        distance = math.sqrt(dx*dx + dy*dy)
+        if distance < min_distance:
+            min_distance = distance
+            closest_enemy = enemy
+    return closest_enemy
+
+def check(swarm, points):
+    """The grid must return the same k nearest distances as a brute-force sort"""
+    n = swarm.count
+    x = swarm.rect_x[:n]
+    y = swarm.rect_y[:n]
+    alive = np.flatnonzero(swarm.health[:n] > 0)
+    for px, py in points:
+        expected = np.sort(np.hypot(x[alive] - px, y[alive] - py))[:K]
+        found = swarm.nearest_indices(px, py, K)
+        assert np.allclose(np.hypot(x[found] - px, y[found] - py), expected), (px, py)
+
+def time_queries(query, points):
+    start = time.perf_counter()
+    for px, py in points:
+        query(px, py)
+    return (time.perf_counter() - start) / len(points) * 1e6
+
+if __name__ == "__main__":
+    size = game.MAP_WIDTH * game.TILE_SIZE
+    print(f"{'enemies':>8} {'linear (us)':>12} {'grid k=1 (us)':>14} {f'grid k={K} (us)':>14} {'speedup':>8}")
+    for count in ENEMY_COUNTS:
+        swarm = make_swarm(count)
+        rng = random.Random(count)
+        points = [(rng.uniform(0, size), rng.uniform(0, size)) for _ in range(QUERIES)]
+        check(swarm, points)
+        views = list(swarm)
+        linear = time_queries(lambda px, py: linear_nearest(views, px, py), points[:QUERIES // 10])
+        grid = time_queries(lambda px, py: swarm.nearest(px, py), points)
+        grid_k = time_queries(lambda px, py: swarm.nearest(px, py, K), points)
+        print(f"{count:>8} {linear:>12.1f} {grid:>14.1f} {grid_k:>14.1f} {linear / grid:>7.1f}x")
@@ -0,0 +1,76 @@
+# Benchmark drawing on-screen entities with a blit and two rect fills each vs the batched render queue
+# Run from the repository root: python benchmarks/bench_render_queue.py
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import numpy as np
+import pygame
+import main as game
+
+window = game.init_display(headless=True)
+from old_draw import draw_enemy, draw_player
+from utils.render_queue import RenderQueue
+
+FRAMES = 60
+ENEMY_COUNTS = [50, 200, 1000, 3000]
+
+def make_game(count):
+    """A game with `count` enemies and a cake for every fourth one, all on screen, a third of them talking"""
+    state = game.Game(seed=count)
+    rng = state.rng
+    enemies = state.enemies
+    for i in range(count):
+        enemies.spawn(rng.randint(0, game.WIDTH - 40), rng.randint(30, game.HEIGHT - 40), rng.randint(0, 4))
+        enemies.health[i] = rng.randint(1, 30)
+        if i % 4 == 0:
+            game.spawn_cake(state.cakes, rng.randint(0, game.WIDTH - 40), rng.randint(0, game.HEIGHT - 40))
+    enemies.message_timer[:count:3] = 0
+    return state
+
+def draw_per_call(state):
+    # The old Game.draw entity loops: every sprite, bar and bubble issued on its own
+    camera_x, camera_y = state.camera_x, state.camera_y
+    cakes = state.cakes
+    frames = game.get_pulse_frames(game.assets.get("cake"))
+    for x, y, step in zip(cakes.x[:cakes.count].tolist(), cakes.y[:cakes.count].tolist(),
+                          cakes.pulse_step[:cakes.count].tolist()):
+        pulsed_img, offset_x, offset_y = frames[step]
+        window.blit(pulsed_img, (x - camera_x - offset_x, y - camera_y - offset_y))
+    for enemy in state.enemies:
+        draw_enemy(window, enemy, camera_x, camera_y)
+    draw_player(window, state.player, camera_x, camera_y)
+
+queue = RenderQueue()
+
+def draw_queued(state):
+    camera_x, camera_y = state.camera_x, state.camera_y
+    game.submit_cakes(queue, state.cakes, np.arange(len(state.cakes)), camera_x, camera_y)
+    state.enemies.submit(queue, np.arange(len(state.enemies)), camera_x, camera_y)
+    state.player.submit(queue, camera_x, camera_y)
+    queue.flush(window)
+
+def time_frames(state, draw):
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        draw(state)
+    return (time.perf_counter() - start) / FRAMES * 1000
+
+if __name__ == "__main__":
+    # Same picture either way, bar a pixel of rounding at the screen edges
+    state = make_game(200)
+    draw_per_call(state)
+    before = pygame.surfarray.array3d(window)
+    window.fill((0, 0, 0))
+    draw_queued(state)
+    assert np.mean(np.any(before != pygame.surfarray.array3d(window), axis=2)) < 0.001
+
+    print(f"{'enemies':>8} {'per call (ms)':>14} {'queued (ms)':>12} {'speedup':>8}")
+    for count in ENEMY_COUNTS:
+        state = make_game(count)
+        before = time_frames(state, draw_per_call)
+        after = time_frames(state, draw_queued)
+        print(f"{count:>8} {before:>14.2f} {after:>12.2f} {before / after:>7.1f}x")
@@ -0,0 +1,57 @@
+# Benchmark saving and restoring a late-game snapshot, and check the restored game plays on identically
+# Run from the repository root: python benchmarks/bench_snapshot.py [late.snap]
+# The optional path receives the snapshot, to start a profiling session with --snapshot-in
+import os
+import sys
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import main as game
+
+game.init_display(headless=True)
+
+ENEMY_COUNT = 3000
+REPEATS = 20
+CHECK_TICKS = 300
+
+def late_game(seed=1):
+    """A game a few minutes in, with the horde grown to ENEMY_COUNT"""
+    inputs = game.scripted_input(seed)
+    g = game.Game(seed=seed)
+    for _ in range(600):
+        g.step(*next(inputs))
+    rng = random.Random(seed)
+    size = game.MAP_WIDTH * game.TILE_SIZE
+    while len(g.enemies) < ENEMY_COUNT:
+        g.enemies.spawn(rng.randint(0, size), rng.randint(0, size), rng.randint(0, 4))
+    for _ in range(30):
+        g.step(0, 0, ["magic_missile"])  # Missiles with live targets in the snapshot
+    return g, inputs
+
+def time_repeats(func):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        result = func()
+    return (time.perf_counter() - start) / REPEATS * 1000, result
+
+if __name__ == "__main__":
+    g, inputs = late_game()
+    save_ms, data = time_repeats(g.snapshot)
+    restore_ms, restored = time_repeats(lambda: game.Game.restore(data))
+    print(f"{len(g.enemies)} enemies, {len(g.projectiles)} projectiles, {len(g.cakes)} cakes: "
+          f"{len(data) / 1024:.0f} KiB, save {save_ms:.2f} ms, restore {restore_ms:.2f} ms")
+
+    assert restored.state_hash() == g.state_hash()
+    for _ in range(CHECK_TICKS):
+        step = next(inputs)
+        g.step(*step)
+        restored.step(*step)
+    assert restored.state_hash() == g.state_hash(), "restored game diverged"
+    print(f"restored game matches the original after {CHECK_TICKS} more ticks")
+
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "wb") as f:
+            f.write(data)
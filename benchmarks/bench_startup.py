@@ -0,0 +1,49 @@
+# Benchmark startup: importing the game, opening the display, building a Game and drawing the first frame
+# Cold runs start from an empty sprite cache, warm runs reuse it.
+# Run from the repository root: python benchmarks/bench_startup.py
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RUNS = 5
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+CHILD = """
+import os, sys, time
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+sys.path.insert(0, {src!r})
+import pygame, numpy  # Library import time is the same before and after, keep it out of the numbers
+start = time.perf_counter()
+import main as game
+imported = time.perf_counter()
+game.assets.cache_dir = {cache_dir!r}
+game.init_display(headless=True)
+state = game.Game()
+state.draw(game.window)
+done = time.perf_counter()
+print((imported - start) * 1000, (done - imported) * 1000)
+"""
+
+def run_child(cache_dir):
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD.format(src=SRC, cache_dir=cache_dir)],
+        capture_output=True, text=True, check=True,
+    ).stdout.split()
+    return float(output[-2]), float(output[-1])
+
+def median_times(cache_dir_factory):
+    samples = [run_child(cache_dir_factory()) for _ in range(RUNS)]
+    return statistics.median(s[0] for s in samples), statistics.median(s[1] for s in samples)
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        cold = median_times(lambda: tempfile.mkdtemp(dir=tmp))
+        warm_dir = os.path.join(tmp, "warm")
+        run_child(warm_dir)  # Fill the cache once
+        warm = median_times(lambda: warm_dir)
+
+    print(f"{'':>6} {'import (ms)':>12} {'first frame (ms)':>17} {'total (ms)':>11}")
+    for label, (imported, first_frame) in (("cold", cold), ("warm", warm)):
+        print(f"{label:>6} {imported:>12.1f} {first_frame:>17.1f} {imported + first_frame:>11.1f}")
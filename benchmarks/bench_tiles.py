@@ -0,0 +1,49 @@
+# Benchmark finding the visible office tiles: culling the old tuple list vs a TileGrid range query
+# Run from the repository root: python benchmarks/bench_tiles.py
+import os
+import sys
+import random
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from utils.tile_grid import TileGrid
+
+TILE_SIZE = 40
+WIDTH, HEIGHT = 800, 600
+MAP_SIZES = [20, 200, 1000]  # in tiles
+FRAMES = 100
+
+def make_maps(map_size):
+    random.seed(map_size)
+    grid = TileGrid(map_size, map_size, TILE_SIZE)
+    for y in range(map_size):
+        for x in range(map_size):
+            grid.set_tile(x, y, random.randint(0, 2))
+    return list(grid), grid
+
+def culled(office_tiles, camera_x, camera_y):
+    # The scan draw_office_tiles did before the grid
+    return [(tile_x, tile_y, tile_type) for tile_x, tile_y, tile_type in office_tiles
+            if (tile_x + TILE_SIZE > camera_x and
+                tile_x < camera_x + WIDTH and
+                tile_y + TILE_SIZE > camera_y and
+                tile_y < camera_y + HEIGHT)]
+
+def time_frames(frame, cameras):
+    start = time.perf_counter()
+    for camera_x, camera_y in cameras:
+        frame(camera_x, camera_y)
+    return (time.perf_counter() - start) / len(cameras) * 1000
+
+if __name__ == "__main__":
+    print(f"{'map tiles':>10} {'list scan (ms)':>15} {'grid (ms)':>10} {'speedup':>8}")
+    for map_size in MAP_SIZES:
+        office_tiles, grid = make_maps(map_size)
+        rng = random.Random(0)
+        extent = map_size * TILE_SIZE
+        cameras = [(rng.uniform(0, max(extent - WIDTH, 0)), rng.uniform(0, max(extent - HEIGHT, 0))) for _ in range(FRAMES)]
+        assert all(culled(office_tiles, *camera) == grid.visible_tiles(*camera, WIDTH, HEIGHT) for camera in cameras[:5])
+        before = time_frames(lambda x, y: culled(office_tiles, x, y), cameras)
+        after = time_frames(lambda x, y: grid.visible_tiles(x, y, WIDTH, HEIGHT), cameras)
+        print(f"{map_size * map_size:>10} {before:>15.3f} {after:>10.3f} {before / after:>7.1f}x")
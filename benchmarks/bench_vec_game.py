@@ -0,0 +1,49 @@
+# Benchmark stepping many games one Game.step at a time vs all at once with VecGame
+# Run from the repository root: python benchmarks/bench_vec_game.py
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import numpy as np
+import main as game
+
+game.init_display(headless=True)
+from utils.replay import decode_input
+from vec_game import VecGame
+
+TICKS = 600
+GAME_COUNTS = [1, 16, 64, 256]
+
+def random_inputs(count, seed=0):
+    """Input bytes for `count` games, random keys held for a few ticks at a time"""
+    rng = np.random.default_rng(seed)
+    inputs = rng.integers(0, 256, (TICKS // 10, count), dtype=np.uint8)
+    return np.repeat(inputs, 10, axis=0)
+
+def run_games(count, inputs):
+    games = [game.Game(seed=seed) for seed in range(count)]
+    decoded = [decode_input(bits) for bits in range(256)]
+    start = time.perf_counter()
+    for tick_inputs in inputs.tolist():
+        for state, bits in zip(games, tick_inputs):
+            state.step(*decoded[bits])
+    return time.perf_counter() - start
+
+def run_vec_game(count, inputs):
+    env = VecGame(count, seed=0)
+    env.reset()
+    start = time.perf_counter()
+    for tick_inputs in inputs:
+        env.step(tick_inputs)
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    print(f"{'games':>6} {'Game loops (ms/tick)':>21} {'VecGame (ms/tick)':>18} {'speedup':>8}")
+    for count in GAME_COUNTS:
+        inputs = random_inputs(count)
+        before = run_games(count, inputs) / TICKS * 1000
+        after = run_vec_game(count, inputs) / TICKS * 1000
+        print(f"{count:>6} {before:>21.2f} {after:>18.2f} {before / after:>7.1f}x")
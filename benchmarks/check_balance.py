@@ -0,0 +1,31 @@
+# Balance check: play the default rules over fixed seeds with the balance bot and check deaths and kills
+# stay in the range measured before projectiles hit with their sprite masks (16 seeds x 18000 ticks:
+# 12% of games died, 623 kills on average)
+# Run from the repository root: python benchmarks/check_balance.py (a few minutes on one core)
+import os
+import sys
+import tempfile
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from balance import run_balance
+from utils.results import read_results
+
+SEEDS = range(16)
+MAX_TICKS = 60 * 60 * 5
+MAX_DIED = 0.25  # Share of games the bot may lose, two in sixteen before
+KILLS = (560, 690)  # Mean kills allowed, 623 give or take 10%
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        out = os.path.join(directory, "balance.jsb")
+        run_balance([{"name": "default"}], SEEDS, out, MAX_TICKS)
+        results = read_results(out)
+    died = results["died"].mean()
+    kills = results["kills"].mean()
+    print(f"{len(results['died'])} games: {died:.0%} died, {kills:.1f} kills on average")
+    if died > MAX_DIED:
+        sys.exit(f"the bot died in {died:.0%} of games, more than {MAX_DIED:.0%}")
+    if not KILLS[0] <= kills <= KILLS[1]:
+        sys.exit(f"mean kills {kills:.1f} outside {KILLS[0]}-{KILLS[1]}")
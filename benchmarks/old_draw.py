@@ -0,0 +1,49 @@
+# The per-call entity draws Game.draw used before the render queue, for the benchmarks that compare against them
+import pygame
+
+import main as game
+from utils.text_cache import text_cache
+
+def draw_player(window, player, camera_x, camera_y):
+    """Draw the player and its health bar, and return the screen rect covered"""
+    rect = window.blit(game.assets.get("hero"), (player.x - camera_x, player.y - camera_y))
+
+    # Draw health bar
+    rect.union_ip(pygame.draw.rect(window, game.RED, (player.x - camera_x, player.y - camera_y - 10, player.width, 5)))
+    pygame.draw.rect(window, game.GREEN, (player.x - camera_x, player.y - camera_y - 10,
+                                          player.width * (player.health / player.max_health), 5))
+    return rect
+
+def draw_enemy(window, enemy, camera_x, camera_y):
+    """Draw an EnemyView, its health bar and any speech bubble, and return the screen rect covered"""
+    x, y = enemy.x, enemy.y
+    width = enemy.width
+    rect = window.blit(enemy.img, (x - camera_x, y - camera_y))
+
+    # Draw health bar
+    rect.union_ip(pygame.draw.rect(window, (255, 0, 0), (x - camera_x, y - camera_y - 10, width, 5)))
+    pygame.draw.rect(window, (0, 255, 0), (x - camera_x, y - camera_y - 10, width * (enemy.health / enemy.swarm.max_health), 5))
+
+    # Draw speech bubble with message
+    if enemy.show_message:
+        text = text_cache.render(enemy.message, 16, (0, 0, 0))
+
+        # Speech bubble background
+        bubble_width = text.get_width() + 10
+        bubble_height = text.get_height() + 10
+        bubble_x = x - camera_x - bubble_width // 2 + width // 2
+        bubble_y = y - camera_y - 30
+
+        rect.union_ip(pygame.draw.rect(window, (255, 255, 255), (bubble_x, bubble_y, bubble_width, bubble_height)))
+        pygame.draw.rect(window, (0, 0, 0), (bubble_x, bubble_y, bubble_width, bubble_height), 1)
+
+        # Triangle pointer
+        rect.union_ip(pygame.draw.polygon(window, (255, 255, 255), [
+            (x - camera_x + width // 2, y - camera_y - 5),
+            (x - camera_x + width // 2 - 5, bubble_y + bubble_height),
+            (x - camera_x + width // 2 + 5, bubble_y + bubble_height)
+        ]))
+
+        # Text
+        window.blit(text, (bubble_x + 5, bubble_y + 5))
+    return rect
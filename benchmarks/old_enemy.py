@@ -0,0 +1,49 @@
+# The per-object enemy the game used before EnemySwarm, for the benchmarks that compare against it
+import math
+import random
+
+import pygame
+
+class Enemy:
+    def __init__(self, x, y, type_id, enemy_img, messages):
+        self.x = x
+        self.y = y
+        self.type_id = type_id
+        self.img = enemy_img
+        self.speed = 2
+        self.health = 30
+        self.cooldown = 0
+        self.messages = messages
+        self.message = random.choice(messages)
+        self.message_timer = random.randint(100, 200)  # Random timer for speech bubble
+        self.show_message = False
+        self.width = self.img.get_width()
+        self.height = self.img.get_height()
+        self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
+
+    def move_towards_player(self, player):
+        dx = player.x - self.x
+        dy = player.y - self.y
+        dist = math.sqrt(dx * dx + dy * dy)
+
+        if dist != 0:
+            dx = dx / dist
+            dy = dy / dist
+
+            self.x += dx * self.speed
+            self.y += dy * self.speed
+
+            self.rect.x = self.x
+            self.rect.y = self.y
+
+    def update(self, player):
+        self.move_towards_player(player)
+
+        # Update message timer
+        self.message_timer -= 1
+        if self.message_timer <= 0:
+            self.show_message = True
+            if self.message_timer <= -50:  # Show message for 50 frames
+                self.show_message = False
+                self.message = random.choice(self.messages)
+                self.message_timer = random.randint(100, 200)
@@ -0,0 +1,105 @@
+# Memory soak: run one seeded game under a heavy steady wave and check traced memory and entity arrays stay flat
+# Run from the repository root: python benchmarks/soak_memory.py
+import gc
+import os
+import sys
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import numpy as np
+import pygame
+import main as game
+
+game.init_display(headless=True)
+from balance import bot_policy
+from entities import ecs
+
+# Fifty enemies a second, every cycle the same size, so a few hundred are alive at any time. With
+# two-tick cooldowns about a hundred projectiles are in flight, and kills drop cakes faster than the
+# bot can walk to them, so every one on the map is collected every ten seconds. All three outgrow
+# their first arrays during the warm-up, then only churn through freed slots.
+WAVES = [{"start": 0, "duration": 3600, "count": 3000, "ramp": "constant"}]
+COOLDOWN = 2
+COLLECT_EVERY = 600
+
+WARMUP_TICKS = 60 * 60
+SAMPLE_EVERY = 60 * 20
+SAMPLES = 9  # Three more minutes
+MAX_GROWTH = 64 * 1024  # bytes over the warm-up, at any sample
+MAX_TREND = 8 * 1024  # bytes the later samples may average above the earlier ones
+
+def make_game(seed):
+    state = game.Game(seed=seed, waves=WAVES)
+    state.waves.growth = 1
+    state.player.max_cooldowns[:] = COOLDOWN
+    return state
+
+def step(state):
+    state.player.health = state.player.max_health  # The bot never dies, the soak is one game
+    state.step(*bot_policy(state))
+    if state.ticks % COLLECT_EVERY == 0:
+        cake_width, cake_height = game.assets.get("cake").get_size()
+        ecs.pickup(state.cakes, pygame.Rect(0, 0, game.MAP_WIDTH * game.TILE_SIZE, game.MAP_HEIGHT * game.TILE_SIZE),
+                   cake_width, cake_height)
+
+def traced_memory():
+    # Enemy views point back at their swarm, so some garbage waits for the cycle collector
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+def run(seed=1):
+    """Play the soak and return (memory growth over the warm-up per sample, live and array sizes at each sample)"""
+    state = make_game(seed)
+    groups = {"enemies": state.enemies, "projectiles": state.projectiles, "cakes": state.cakes}
+    initial = {name: len(group.x) for name, group in groups.items()}
+    # Preallocated, so recording the samples allocates nothing traced
+    samples = np.zeros(SAMPLES, dtype=np.int64)
+    sizes = np.zeros((SAMPLES, len(groups), 2), dtype=np.int64)  # Peak live count since the last sample, capacity
+    peaks = np.zeros(len(groups), dtype=np.int64)
+
+    tracemalloc.start()
+    for _ in range(WARMUP_TICKS):
+        step(state)
+    baseline = traced_memory()
+    for i in range(SAMPLES):
+        peaks[:] = 0
+        for _ in range(SAMPLE_EVERY):
+            step(state)
+            for j, group in enumerate(groups.values()):
+                peaks[j] = max(peaks[j], len(group))
+        samples[i] = traced_memory() - baseline
+        sizes[i, :, 0] = peaks
+        sizes[i, :, 1] = [len(group.x) for group in groups.values()]
+    tracemalloc.stop()
+
+    for i in range(SAMPLES):
+        print(f"{(WARMUP_TICKS + (i + 1) * SAMPLE_EVERY) / 3600:5.2f} min: {samples[i]:>+9} bytes, peak / capacity " +
+              ", ".join(f"{name} {peak}/{capacity}" for name, (peak, capacity) in zip(groups, sizes[i].tolist(), strict=True)))
+    return samples, sizes, initial
+
+def check(samples, sizes, initial):
+    """Messages for every way the soak failed"""
+    failures = []
+    if samples.max() > MAX_GROWTH:
+        failures.append(f"memory grew by {samples.max()} bytes, more than {MAX_GROWTH}")
+    half = len(samples) // 2
+    trend = samples[-half:].mean() - samples[:half].mean()
+    if trend > MAX_TREND:
+        failures.append(f"memory kept rising, the last samples average {trend:.0f} bytes above the first")
+    for j, name in enumerate(initial):
+        peak, capacity = sizes[:, j, 0].max(), sizes[:, j, 1]
+        if peak <= initial[name]:
+            failures.append(f"{name} peaked at {peak}, never past their first {initial[name]} slots")
+        if capacity[-1] != capacity[0]:
+            failures.append(f"{name} arrays grew from {capacity[0]} to {capacity[-1]} slots after the warm-up")
+        if capacity[-1] > 2 * peak:
+            failures.append(f"{name} hold {capacity[-1]} slots for at most {peak} live, freed slots are not reused")
+    return failures
+
+if __name__ == "__main__":
+    failures = check(*run())
+    if failures:
+        sys.exit("\n".join(failures))
+    print("memory and entity arrays stayed flat")
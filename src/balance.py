@@ -0,0 +1,227 @@
+# Balance runs: play many seeds of many parameter sets with a scripted bot, on every core.
+# Run from the repository root: python src/balance.py params.json --seeds 32 --out balance.jsb
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+import main as game
+from entities.waves import load_waves
+from utils.results import ResultsFile, read_results
+
+# Parameters a set may override, with the game's own values
+DEFAULT_PARAMS = {
+    "waves": None,  # Wave table or the path of a JSON one, None for the built-in table
+    "spawn_budget": 8,
+    "wave_growth": 1.5,
+    "enemy_speed": 2,
+    "enemy_health": 30,
+    "cooldowns": {},  # Ability name -> max_cooldown in ticks
+    "infinite": False,
+}
+
+COLUMNS = [
+    ("param_set", "u4"),  # Index into the parameter sets of the run that wrote the row
+    ("param_hash", "u8"),  # Identifies the parameter values and game length, so resuming survives reordering the sets
+    ("seed", "u8"),
+    ("survival_ticks", "u4"),
+    ("died", "?"),
+    ("kills", "u4"),
+    ("level", "u2"),
+    ("peak_entities", "u4"),
+    ("mean_tick_ms", "f8"),
+]
+
+BOT_DANGER_RADIUS = 160  # Enemies closer than this push the bot away
+BOT_CAST_RADIUS = 240  # Attacks are only cast with an enemy this close
+BOT_WALL_MARGIN = 80  # Map edges closer than this push the bot back towards the middle
+STOP_CHECK_TICKS = 60  # Games in the workers look for an interrupt this often
+
+stopping = None  # multiprocessing.Event shared with the workers, set when the run is interrupted
+
+def params_hash(params, max_ticks):
+    """64-bit hash of a parameter set's values with the defaults filled in, ignoring its name, and the
+    game length, so games cut short at different lengths never count as the same runs"""
+    values = {key: value for key, value in {**DEFAULT_PARAMS, **params}.items() if key != "name"}
+    values["max_ticks"] = max_ticks
+    digest = hashlib.sha256(json.dumps(values, sort_keys=True).encode()).digest()
+    return int.from_bytes(digest[:8], "little")
+
+def make_game(seed, params):
+    """A headless game from `seed` with the overrides in `params` applied"""
+    params = {**DEFAULT_PARAMS, **params}
+    waves = params["waves"] or game.WAVES
+    if isinstance(waves, str):
+        waves = load_waves(waves)
+    state = game.Game(infinite=params["infinite"], seed=seed, waves=waves, spawn_budget=params["spawn_budget"])
+    state.waves.growth = params["wave_growth"]
+    state.enemies.default_speed = params["enemy_speed"]
+    state.enemies.max_health = params["enemy_health"]
+    for name, cooldown in params["cooldowns"].items():
+        state.player.max_cooldowns[game.ABILITY_INDEX[name]] = cooldown
+    return state
+
+def bot_policy(state):
+    """Input for one tick: back away from nearby enemies, otherwise walk to the nearest cake,
+    and cast every ready attack once an enemy is in range"""
+    player = state.player
+    enemies = state.enemies
+    px = player.x + player.width / 2
+    py = player.y + player.height / 2
+    move_x = move_y = 0.0
+    nearest = float("inf")
+
+    n = enemies.count
+    if n:
+        ex = enemies.x[:n] + enemies.width[:n] / 2 - px
+        ey = enemies.y[:n] + enemies.height[:n] / 2 - py
+        dist2 = ex * ex + ey * ey
+        nearest = float(np.sqrt(dist2.min()))
+        near = dist2 < BOT_DANGER_RADIUS * BOT_DANGER_RADIUS
+        if near.any():
+            # Closer enemies push harder
+            weights = 1 / (dist2[near] + 1)
+            move_x = -float((ex[near] * weights).sum())
+            move_y = -float((ey[near] * weights).sum())
+
+    cakes = state.cakes
+    if move_x == move_y == 0 and len(cakes):
+        cx, cy = cakes.x[:cakes.count] - px, cakes.y[:cakes.count] - py
+        i = int(np.argmin(cx * cx + cy * cy))
+        move_x, move_y = float(cx[i]), float(cy[i])
+
+    if player.bounds:
+        width, height = player.bounds
+        if px < BOT_WALL_MARGIN or px > width - BOT_WALL_MARGIN:
+            move_x += (width / 2 - px) * 1e-4
+        if py < BOT_WALL_MARGIN or py > height - BOT_WALL_MARGIN:
+            move_y += (height / 2 - py) * 1e-4
+
+    # Only commit to an axis that carries a fair share of the direction
+    scale = max(abs(move_x), abs(move_y))
+    dx = int(np.sign(move_x)) if scale and abs(move_x) > scale / 2 else 0
+    dy = int(np.sign(move_y)) if scale and abs(move_y) > scale / 2 else 0
+
+    abilities = []
+    for ability, cooldown in zip(game.ABILITIES, player.cooldowns.tolist()):
+        if cooldown > 0:
+            continue
+        # Attacks once an enemy is in range, effects like the speed burst only to get away
+        attack = ability["projectile"] is not None
+        if attack and nearest < BOT_CAST_RADIUS or not attack and nearest < BOT_DANGER_RADIUS / 2:
+            abilities.append(ability["name"])
+    return dx, dy, abilities
+
+def play(param_set, seed, params, max_ticks):
+    """Play one game with the bot until it dies or `max_ticks` pass, returning its results row"""
+    state = make_game(seed, params)
+    peak = 0
+    start = time.perf_counter()
+    while state.ticks < max_ticks and not state.game_over:
+        if state.ticks % STOP_CHECK_TICKS == 0 and stopping is not None and stopping.is_set():
+            return None  # Interrupted, nothing records this game any more
+        state.step(*bot_policy(state))
+        peak = max(peak, len(state.enemies) + len(state.projectiles) + len(state.cakes))
+    elapsed = time.perf_counter() - start
+    return {
+        "param_set": param_set,
+        "param_hash": params_hash(params, max_ticks),
+        "seed": seed,
+        "survival_ticks": state.ticks,
+        "died": state.game_over,
+        "kills": state.kills,
+        "level": state.player.level,
+        "peak_entities": peak,
+        "mean_tick_ms": elapsed / max(state.ticks, 1) * 1000,
+    }
+
+def init_worker(stop):
+    global stopping
+    stopping = stop
+    game.init_display(headless=True)
+    # Ctrl+C reaches the whole process group; only the parent should act on it
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def run_balance(param_sets, seeds, out, max_ticks=60 * 60 * 10, workers=None):
+    """Play every seed of every parameter set across a process pool, streaming rows to `out`.
+
+    Runs already in `out` are skipped, so an interrupted batch picks up where it
+    stopped when started again with the same arguments.
+    """
+    with ResultsFile(out, COLUMNS) as results:
+        done = read_results(out)
+        finished = set(zip(done["param_hash"].tolist(), done["seed"].tolist()))
+        jobs = [(i, seed, params, max_ticks) for i, params in enumerate(param_sets) for seed in seeds
+                if (params_hash(params, max_ticks), seed) not in finished]
+        print(f"{len(param_sets) * len(seeds) - len(jobs)} runs already in {out}, {len(jobs)} to play")
+        if not jobs:
+            return
+
+        start = time.perf_counter()
+        stop = multiprocessing.Event()
+        executor = ProcessPoolExecutor(workers or os.cpu_count(), initializer=init_worker, initargs=(stop,))
+        pending = {executor.submit(play, *job) for job in jobs}
+        completed = 0
+        try:
+            while pending:
+                finished_now, pending = wait(pending, return_when=FIRST_COMPLETED)
+                rows = [future.result() for future in finished_now]
+                results.append(rows)
+                completed += len(rows)
+                print(f"\r{completed}/{len(jobs)} runs, {time.perf_counter() - start:.0f}s", end="", flush=True)
+            print()
+        except KeyboardInterrupt:
+            print(f"\nInterrupted after {completed} runs, start again with the same arguments to resume")
+            stop.set()  # Games in progress are lost either way, they give up within STOP_CHECK_TICKS
+            raise
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+def summarize(path, param_sets=None, max_ticks=60 * 60 * 10):
+    """Print the mean results of each parameter set in a results file, naming the sets in
+    `param_sets` played for `max_ticks`"""
+    results = read_results(path)
+    names = {params_hash(params, max_ticks): params.get("name", str(i))
+             for i, params in enumerate(param_sets or [])}
+    print(f"{'set':<16} {'runs':>5} {'died':>5} {'survived (s)':>13} {'kills':>7} {'level':>6} {'peak':>6} {'tick ms':>8}")
+    present = set(results["param_hash"].tolist())
+    # The sets given in `param_sets` in their order, then any other sets found in the file by hash
+    keys = [key for key in names if key in present] + sorted(present - names.keys())
+    for key in keys:
+        rows = results["param_hash"] == key
+        name = names.get(key, f"{key:016x}")
+        print(f"{name:<16} {rows.sum():>5} {results['died'][rows].mean():>5.0%} "
+              f"{results['survival_ticks'][rows].mean() / 60:>13.1f} {results['kills'][rows].mean():>7.1f} "
+              f"{results['level'][rows].mean():>6.1f} {results['peak_entities'][rows].mean():>6.0f} "
+              f"{results['mean_tick_ms'][rows].mean():>8.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many seeds of many parameter sets with a scripted bot")
+    parser.add_argument("params", nargs="?", help="JSON list of parameter sets (default: the game's own values)")
+    parser.add_argument("--seeds", type=int, default=16, help="games per parameter set")
+    parser.add_argument("--first-seed", type=int, default=0, help="seed of the first game of each set")
+    parser.add_argument("--max-ticks", type=int, default=60 * 60 * 10, help="end a game the bot survives this long")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--out", default="balance.jsb", help="results file, resumed if it exists")
+    args = parser.parse_args()
+
+    if args.params:
+        with open(args.params) as f:
+            param_sets = json.load(f)
+    else:
+        param_sets = [{"name": "default"}]
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+    try:
+        run_balance(param_sets, seeds, args.out, args.max_ticks, args.workers)
+    except KeyboardInterrupt:
+        return
+    summarize(args.out, param_sets, args.max_ticks)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+import math
+
+import numpy as np
+import pygame
+
+from utils.game_utils import PULSE_STEPS
+
+# A small entity-component store: entities with the same components form an archetype,
+# stored as one NumPy column per component, and systems advance whole columns at once.
+
+class Archetype:
+    """Entities sharing one set of components, one array per component.
+
+    `components` maps names to NumPy dtypes and each becomes an attribute of the
+    same name. Slots `[0, count)` are live. `kill` only marks an entity (its
+    `alive` flag clears at once, so systems later in the tick skip it); `compact`
+    removes everything marked at the end of the tick, swapping the last entity
+    into each freed slot in slot order, so the columns stay dense. `spawned`
+    counts every entity ever added, a ready-made unique id for the next one.
+    """
+    def __init__(self, components, capacity=64):
+        self.components = dict(components, alive=bool)
+        self.count = 0
+        self.spawned = 0
+        self.killed = []
+        for name, dtype in self.components.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self):
+        for name in self.components:
+            old = getattr(self, name)
+            new = np.zeros(len(old) * 2, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def spawn(self, **values):
+        """Add an entity with the given component values, the rest zero, and return its slot"""
+        i = self.count
+        if i == len(self.alive):
+            self._grow()
+        for name in self.components:
+            getattr(self, name)[i] = values.get(name, 0)
+        self.alive[i] = True
+        self.count += 1
+        self.spawned += 1
+        return i
+
+    def kill(self, slots):
+        """Mark a slot, or an array of them, for removal at the next `compact`"""
+        slots = np.atleast_1d(slots)
+        slots = slots[self.alive[slots]]
+        self.alive[slots] = False
+        self.killed.extend(slots.tolist())
+
+    def compact(self):
+        """Remove every entity killed since the last call and return how many there were"""
+        killed = self.killed
+        if not killed:
+            return 0
+        # Work out where the swaps leave each survivor, then move every column once
+        count = self.count
+        occupant = {}  # Slot -> original slot of the entity now in it, where they differ
+        position = {}  # Original slot -> current slot, where they differ
+        for slot in sorted(killed):
+            i = position.get(slot, slot)
+            count -= 1
+            last = occupant.get(count, count)
+            if i != count:
+                occupant[i] = last
+                position[last] = i
+        moves = [(dst, src) for dst, src in occupant.items() if dst < count]
+        if moves:
+            dst, src = np.array(moves).T
+            for name in self.components:
+                column = getattr(self, name)
+                column[dst] = column[src]
+        removed = self.count - count
+        self.count = count
+        killed.clear()
+        return removed
+
+    def clear(self):
+        self.alive[:self.count] = False
+        self.count = 0
+        self.killed.clear()
+
+class HitSet:
+    """Recent hits of lingering area effects, so they damage each enemy once per interval rather than every tick.
+
+    Each hit is a pair of ids, the source's in the high 32 bits of a key and the
+    target's in the low ones, kept sorted with the tick it stops counting. Expired
+    hits are dropped every tick, so the set holds no more than the last interval's.
+    """
+    def __init__(self):
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.until = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def expire(self, tick):
+        """Forget the hits whose interval is over by `tick`"""
+        live = self.until > tick
+        if not live.all():
+            self.keys = self.keys[live]
+            self.until = self.until[live]
+
+    def strike(self, sources, targets, tick, interval):
+        """Mask of the (source, target) id pairs not hit within their interval, recording them as hit at `tick`"""
+        keys = (np.asarray(sources, dtype=np.int64) << 32) | np.asarray(targets, dtype=np.int64)
+        at = np.searchsorted(self.keys, keys)
+        fresh = self.keys[np.minimum(at, len(self.keys) - 1)] != keys if len(self.keys) else np.ones(keys.shape, bool)
+        if fresh.any():
+            until = np.broadcast_to(tick + np.asarray(interval), keys.shape)[fresh]
+            keys = keys[fresh]
+            order = np.argsort(keys)
+            at = at[fresh][order]
+            self.keys = np.insert(self.keys, at, keys[order])
+            self.until = np.insert(self.until, at, until[order])
+        return fresh
+
+    def clear(self):
+        self.keys = self.keys[:0]
+        self.until = self.until[:0]
+
+def movement(archetype):
+    """Move every entity by its velocity"""
+    n = archetype.count
+    if n == 0:
+        return
+    archetype.x[:n] += archetype.vx[:n]
+    archetype.y[:n] += archetype.vy[:n]
+
+def lifetime(archetype):
+    """Count every live entity's lifetime down and kill the ones that run out"""
+    n = archetype.count
+    if n == 0:
+        return
+    # Dead entities count down too, it makes no difference before they are compacted away
+    life = archetype.lifetime[:n]
+    life -= 1
+    expired = np.flatnonzero(life <= 0)
+    if len(expired):
+        archetype.kill(expired)
+
+def rect_round(values):
+    """Round positions to whole pixels the way assigning them to a pygame.Rect does, halves away from zero"""
+    return np.trunc(values + np.copysign(0.5, values)).astype(np.int64)
+
+def rects(archetype, indices=slice(None)):
+    """Integer (left, top, width, height) columns of entities' rects, anchored as they are drawn"""
+    n = archetype.count
+    left = rect_round(archetype.x[:n][indices] - archetype.anchor_x[:n][indices])
+    top = rect_round(archetype.y[:n][indices] - archetype.anchor_y[:n][indices])
+    return left, top, archetype.width[:n][indices], archetype.height[:n][indices]
+
+def overlapping(left, top, width, height, rect):
+    """Indices of the rects in the columns that overlap pygame `rect`"""
+    return np.flatnonzero((left < rect.right) & (left + width > rect.left) &
+                          (top < rect.bottom) & (top + height > rect.top))
+
+def homing(projectiles, enemies):
+    """Point each homing projectile's velocity at its target enemy's centre.
+
+    Projectiles with a homing `speed` whose target has died pick the enemy nearest
+    to them; without any enemy left they stop. Targets are EnemyView objects, so
+    this is a loop over the handful of homing projectiles rather than their columns.
+    """
+    n = projectiles.count
+    speeds = projectiles.speed
+    targets = projectiles.target
+    generations = projectiles.target_generation
+    searchable = len(enemies) > 0
+    for i in np.flatnonzero(speeds[:n]).tolist():
+        x = float(projectiles.x[i])
+        y = float(projectiles.y[i])
+        target = targets[i]
+        if (target is None or target.generation != generations[i] or target.health <= 0) and searchable:
+            closest = enemies.nearest(x, y)
+            target = closest[0] if closest else None
+            targets[i] = target
+            generations[i] = target.generation if target else 0
+        vx = vy = 0.0
+        if target is not None and target.generation == generations[i] and target.health > 0:
+            dx = target.x + target.width // 2 - x
+            dy = target.y + target.height // 2 - y
+            dist = math.sqrt(dx * dx + dy * dy)
+            if dist > 0:
+                vx = dx / dist * speeds[i]
+                vy = dy / dist * speeds[i]
+        projectiles.vx[i] = vx
+        projectiles.vy[i] = vy
+
+def damage(projectiles, enemies, shapes, hits, tick):
+    """Apply every live projectile's damage to the enemies under it and return views of those it killed.
+
+    Projectiles go in slot order, each seeing the damage done before it. Enemies
+    under a projectile's rect come from the swarm's grid; `masked` projectiles then
+    keep those their sprite's pixels touch, looked up in `shapes` (tables from
+    `utils.masks.overlap_tables`, one per sprite id against the swarm's images).
+    Unless it `pierce`s, a projectile stops at the first enemy it touches and is
+    spent. One with a `hit_interval` damages each enemy at most once per that many
+    ticks, remembered in the HitSet `hits`.
+    """
+    n = projectiles.count
+    killed = []
+    if n == 0:
+        return killed
+    hits.expire(tick)
+    live = np.flatnonzero(projectiles.alive[:n])
+    spent = []
+    # Shape tables start with the widest and tallest enemy hanging off the sprite's left and top
+    reach_x = max(image.get_width() for image in enemies.images) - 1
+    reach_y = max(image.get_height() for image in enemies.images) - 1
+    for i, left, top, width, height, amount, pierce, sprite, masked, interval, uid in zip(
+            live.tolist(), *(column.tolist() for column in rects(projectiles, live)),
+            *(getattr(projectiles, name)[live].tolist()
+              for name in ("damage", "pierce", "sprite", "masked", "hit_interval", "uid"))):
+        candidates = enemies.query_indices(pygame.Rect(left, top, width, height))
+        if len(candidates) and masked:
+            offset_x = enemies.rect_x[candidates] - left + reach_x
+            offset_y = enemies.rect_y[candidates] - top + reach_y
+            candidates = candidates[shapes[sprite, enemies.type_id[candidates], offset_x, offset_y]]
+        if len(candidates) and interval:
+            candidates = candidates[hits.strike(uid, enemies.uid[candidates], tick, interval)]
+        if len(candidates) == 0:
+            continue
+        if not pierce:
+            candidates = candidates[:1]
+            spent.append(i)
+        killed += enemies.damage(candidates, amount)
+    if spent:
+        projectiles.kill(np.array(spent))
+    return killed
+
+def pickup(cakes, rect, width, height):
+    """Kill the live `width` x `height` cakes whose `left`, `top` corner puts them over `rect` and return their slots"""
+    n = cakes.count
+    if n == 0:
+        return np.zeros(0, dtype=np.intp)
+    slots = overlapping(cakes.left[:n], cakes.top[:n], width, height, rect)
+    if len(slots):
+        slots = slots[cakes.alive[slots]]
+        cakes.kill(slots)
+    return slots
+
+def pulse(cakes):
+    """Step every cake's pulse animation, growing to PULSE_STEPS and shrinking back to 0"""
+    n = cakes.count
+    if n == 0:
+        return
+    growing = cakes.growing[:n]
+    step = cakes.pulse_step[:n]
+    step += np.where(growing, 1, -1)
+    growing[:] = np.where(growing, step < PULSE_STEPS, step <= 0)
@@ -0,0 +1,344 @@
+import random
+
+import numpy as np
+import pygame
+
+from entities.ecs import rect_round
+from utils.render_queue import ENEMIES, bar_surface, bubble_surface
+from utils.spatial_hash import ArrayGrid
+
+MESSAGE_SHOW_FRAMES = 50  # Speech bubbles stay up for 50 frames once the timer runs out
+
+class EnemyView:
+    """Enemy-like handle onto one slot of an EnemySwarm, used for drawing and targeting"""
+    __slots__ = ("swarm", "index", "generation", "last_x", "last_y")
+
+    def __init__(self, swarm, index):
+        self.swarm = swarm
+        self.index = index  # -1 once the enemy has been removed from the swarm
+        self.generation = 0  # Bumped whenever the view is freed, so stale references can tell
+        self.last_x = 0.0
+        self.last_y = 0.0
+
+    @property
+    def alive(self):
+        return self.index >= 0
+
+    @property
+    def x(self):
+        return float(self.swarm.x[self.index]) if self.index >= 0 else self.last_x
+
+    @property
+    def y(self):
+        return float(self.swarm.y[self.index]) if self.index >= 0 else self.last_y
+
+    @property
+    def health(self):
+        return float(self.swarm.health[self.index]) if self.index >= 0 else 0
+
+    @health.setter
+    def health(self, value):
+        if self.index >= 0:
+            self.swarm.health[self.index] = value
+
+    @property
+    def speed(self):
+        return float(self.swarm.speed[self.index])
+
+    @property
+    def type_id(self):
+        return int(self.swarm.type_id[self.index])
+
+    @property
+    def img(self):
+        return self.swarm.images[self.swarm.type_id[self.index]]
+
+    @property
+    def width(self):
+        return int(self.swarm.width[self.index])
+
+    @property
+    def height(self):
+        return int(self.swarm.height[self.index])
+
+    @property
+    def rect(self):
+        swarm = self.swarm
+        i = self.index
+        return pygame.Rect(int(swarm.rect_x[i]), int(swarm.rect_y[i]), int(swarm.width[i]), int(swarm.height[i]))
+
+    @property
+    def message(self):
+        return self.swarm.messages[self.swarm.message_id[self.index]]
+
+    @property
+    def message_timer(self):
+        return int(self.swarm.message_timer[self.index])
+
+    @property
+    def show_message(self):
+        return self.swarm.message_timer[self.index] <= 0
+
+class EnemySwarm:
+    """Struct-of-arrays enemy store that advances the whole horde with NumPy.
+
+    Slots `[0, count)` of every array are live. Removal swaps the last enemy into
+    the freed slot, so the arrays stay dense and each `EnemyView` is re-pointed at
+    its new slot. Freed views are recycled with a new generation. Killed enemies are only marked (health <= 0) during a tick and
+    dropped together by `remove_dead`, which keeps indices stable while projectiles
+    are still querying the swarm.
+    """
+    ARRAYS = ("x", "y", "speed", "health", "type_id", "message_id", "message_timer",
+              "width", "height", "rect_x", "rect_y", "uid")
+
+    def __init__(self, images, messages, map_width, map_height, cell_size, speed=2, max_health=30, capacity=256,
+                 grid_size=None, rng=random):
+        self.rng = rng  # Simulation random stream, for speech bubble messages and timers
+        self.images = images  # Sprite per type id
+        self.messages = messages
+        self.map_width = map_width  # in pixels, None for an unbounded map
+        self.map_height = map_height
+        self.default_speed = speed
+        self.max_health = max_health
+        # The grid covers the whole map, or on unbounded maps `grid_size` pixels centred on the player
+        grid_width, grid_height = grid_size or (map_width, map_height)
+        self.grid = ArrayGrid(cell_size, grid_width // cell_size + 1, grid_height // cell_size + 1)
+        self.grid_dirty = False  # Set when slots move after the grid was built
+        self.count = 0
+        self.spawned = 0  # Enemies ever spawned, each one's uid is the count before it
+        self.views = []
+        self.free_views = []
+
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.speed = np.zeros(capacity)
+        self.health = np.zeros(capacity)
+        self.type_id = np.zeros(capacity, dtype=np.int8)
+        self.message_id = np.zeros(capacity, dtype=np.int16)
+        self.message_timer = np.zeros(capacity, dtype=np.int32)
+        self.width = np.zeros(capacity, dtype=np.int32)
+        self.height = np.zeros(capacity, dtype=np.int32)
+        # Integer screen-space positions, matching what pygame.Rect would store
+        self.rect_x = np.zeros(capacity, dtype=np.int32)
+        self.rect_y = np.zeros(capacity, dtype=np.int32)
+        self.uid = np.zeros(capacity, dtype=np.int64)  # Unique over the swarm's lifetime, unlike slots and views
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(self.views)
+
+    def _grow(self):
+        capacity = len(self.x) * 2
+        for name in self.ARRAYS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def spawn(self, x, y, type_id):
+        if self.count == len(self.x):
+            self._grow()
+        i = self.count
+        img = self.images[type_id]
+        self.x[i] = x
+        self.y[i] = y
+        self.rect_x[i], self.rect_y[i] = rect_round(np.array((x, y), dtype=np.float64))
+        self.speed[i] = self.default_speed
+        self.health[i] = self.max_health
+        self.type_id[i] = type_id
+        self.message_id[i] = self.rng.randrange(len(self.messages))
+        self.message_timer[i] = self.rng.randint(100, 200)  # Random timer for speech bubble
+        self.width[i] = img.get_width()
+        self.height[i] = img.get_height()
+        self.uid[i] = self.spawned
+        self.spawned += 1
+
+        if self.free_views:
+            view = self.free_views.pop()
+            view.index = i
+        else:
+            view = EnemyView(self, i)
+        self.views.append(view)
+        self.count += 1
+        self.grid_dirty = True
+        return view
+
+    def remove(self, view):
+        """Swap-remove one enemy in O(1)"""
+        i = view.index
+        if i < 0:
+            return
+        view.last_x = float(self.x[i])
+        view.last_y = float(self.y[i])
+        last = self.count - 1
+        if i != last:
+            for name in self.ARRAYS:
+                array = getattr(self, name)
+                array[i] = array[last]
+            moved = self.views[last]
+            moved.index = i
+            self.views[i] = moved
+        self.views.pop()
+        view.index = -1
+        view.generation += 1
+        self.free_views.append(view)
+        self.count = last
+        self.grid_dirty = True
+
+    def remove_dead(self):
+        """Drop every enemy whose health ran out this tick and return their views"""
+        dead = np.flatnonzero(self.health[:self.count] <= 0)
+        views = [self.views[i] for i in dead]
+        for view in views:
+            self.remove(view)
+        return views
+
+    def update(self, player, flow_field=None):
+        """Advance every enemy one tick and return how many are touching the player.
+
+        With a `flow_field` enemies steer their centres along its waypoints around
+        obstacles and only head straight for the player once they share a tile or
+        have no route.
+        """
+        n = self.count
+        if n == 0:
+            return 0
+        x = self.x[:n]
+        y = self.y[:n]
+
+        # Seek the player
+        if flow_field is None:
+            dx = player.x - x
+            dy = player.y - y
+        else:
+            # Centres, so bodies follow the tiles' centre lines between the desks
+            center_x = x + self.width[:n] / 2
+            center_y = y + self.height[:n] / 2
+            target_x, target_y, valid = flow_field.steer(center_x, center_y)
+            dx = np.where(valid, target_x, player.x + player.width / 2) - center_x
+            dy = np.where(valid, target_y, player.y + player.height / 2) - center_y
+        dist = np.hypot(dx, dy)
+        step = np.divide(self.speed[:n], dist, out=np.zeros(n), where=dist != 0)
+        if flow_field is not None:
+            np.minimum(step, 1, out=step)  # Stop on a waypoint rather than overshoot it
+        x += dx * step
+        y += dy * step
+
+        # Stay inside the map, or on an unbounded one keep the grid around the player
+        if self.map_width is None:
+            grid = self.grid
+            grid.origin_x = int(player.x) - grid.cols * grid.cell_size // 2
+            grid.origin_y = int(player.y) - grid.rows * grid.cell_size // 2
+        else:
+            np.clip(x, 0, self.map_width - self.width[:n], out=x)
+            np.clip(y, 0, self.map_height - self.height[:n], out=y)
+        rect_x = self.rect_x[:n]
+        rect_y = self.rect_y[:n]
+        rect_x[:] = rect_round(x)
+        rect_y[:] = rect_round(y)
+
+        # Speech bubble timers, a handful re-roll their message each tick
+        timer = self.message_timer[:n]
+        timer -= 1
+        rng = self.rng
+        for i in np.flatnonzero(timer <= -MESSAGE_SHOW_FRAMES):
+            self.message_id[i] = rng.randrange(len(self.messages))
+            timer[i] = rng.randint(100, 200)
+
+        self.rebuild_grid()
+
+        # Player contact
+        player_rect = player.rect
+        touching = ((rect_x < player_rect.right) & (rect_x + self.width[:n] > player_rect.left) &
+                    (rect_y < player_rect.bottom) & (rect_y + self.height[:n] > player_rect.top))
+        return int(np.count_nonzero(touching))
+
+    def rebuild_grid(self):
+        n = self.count
+        self.grid.rebuild(self.rect_x[:n], self.rect_y[:n], self.width[:n], self.height[:n])
+        self.grid_dirty = False
+
+    def query_indices(self, rect):
+        """Return slots of live enemies overlapping `rect`, using the grid built in `update`"""
+        if self.grid_dirty:
+            self.rebuild_grid()
+        candidates = self.grid.candidates(rect.left, rect.top, rect.right, rect.bottom)
+        candidates = candidates[candidates < self.count]
+        rect_x = self.rect_x[candidates]
+        rect_y = self.rect_y[candidates]
+        hits = ((rect_x < rect.right) & (rect_x + self.width[candidates] > rect.left) &
+                (rect_y < rect.bottom) & (rect_y + self.height[candidates] > rect.top) &
+                (self.health[candidates] > 0))
+        return candidates[hits]
+
+    def visible_indices(self, rect):
+        """Return slots of enemies overlapping `rect` in order, the order iterating the swarm draws them"""
+        return np.sort(self.query_indices(rect))
+
+    def submit(self, queue, indices, camera_x, camera_y):
+        """Queue the sprites, health bars and speech bubbles of the enemies in slots `indices`.
+
+        The per-enemy numbers are worked out for all of them at once, and the bars
+        and bubbles come from caches.
+        """
+        screen_x = self.x[indices] - camera_x
+        screen_y = self.y[indices] - camera_y
+        width = self.width[indices]
+        filled = np.clip(width * (self.health[indices] / self.max_health), 0, width).astype(np.intp)
+        images = self.images
+        messages = self.messages
+        blits = []
+        for x, y, type_id, w, bar_filled, timer, message_id in zip(
+                screen_x.tolist(), screen_y.tolist(), self.type_id[indices].tolist(), width.tolist(), filled.tolist(),
+                self.message_timer[indices].tolist(), self.message_id[indices].tolist(), strict=True):
+            blits.append((images[type_id], (x, y)))
+            blits.append((bar_surface(w, 5, bar_filled, (0, 255, 0), (255, 0, 0)), (x, y - 10)))
+            if timer <= 0:
+                bubble = bubble_surface(messages[message_id])
+                blits.append((bubble, (x - bubble.get_width() // 2 + w // 2, y - 30)))
+        queue.extend(ENEMIES, blits)
+
+    def damage(self, indices, amount):
+        """Apply `amount` damage to the given slots and return views of the ones it killed"""
+        health = self.health
+        health[indices] -= amount
+        killed = indices[health[indices] <= 0]
+        views = self.views
+        return [views[i] for i in killed]
+
+    def nearest_indices(self, x, y, k=1):
+        """Return slots of the `k` live enemies nearest to (`x`, `y`), closest first"""
+        if self.grid_dirty:
+            self.rebuild_grid()
+        n = self.count
+        return self.grid.nearest(x, y, k, self.rect_x[:n], self.rect_y[:n], self.health[:n] > 0)
+
+    def nearest(self, x, y, k=1):
+        """Return views of the `k` live enemies nearest to (`x`, `y`), closest first"""
+        views = self.views
+        return [views[i] for i in self.nearest_indices(x, y, k)]
+
+    def write_snapshot(self, writer):
+        """Append the live enemies to a SnapshotWriter"""
+        writer.pack("iiIQ", self.grid.origin_x, self.grid.origin_y, self.count, self.spawned)
+        for name in self.ARRAYS:
+            writer.array(getattr(self, name)[:self.count])
+
+    def read_snapshot(self, reader):
+        """Replace the swarm's contents with enemies read from a SnapshotReader.
+
+        Every enemy gets a fresh view; slot order is preserved, so slot indices saved
+        alongside the swarm (missile targets) stay valid.
+        """
+        self.grid.origin_x, self.grid.origin_y, count, self.spawned = reader.unpack("iiIQ")
+        while len(self.x) < count:
+            self._grow()
+        for name in self.ARRAYS:
+            array = getattr(self, name)
+            array[:count] = reader.array(array.dtype)
+        self.count = count
+        self.views = [EnemyView(self, i) for i in range(count)]
+        self.free_views = []
+        self.grid_dirty = True
@@ -0,0 +1,103 @@
+import json
+import random
+from collections import deque
+
+# Spawn sides, in the order spawn_enemy numbers them
+EDGES = ("top", "right", "bottom", "left")
+
+# Fraction of a wave's enemies queued once `progress` (0-1) of its duration has passed
+RAMPS = {
+    "constant": lambda progress: progress,  # Evenly spread, the old one-every-second trickle
+    "ease_in": lambda progress: progress * progress,  # Slow start, heavy finish
+    "ease_out": lambda progress: 1 - (1 - progress) ** 2,  # Heavy start, tapering off
+    "burst": lambda progress: 1.0,  # Everything at once
+}
+
+# Default wave table, one cycle is 3 minutes. Times are in ticks (60 per second).
+# count: enemies in the wave, types: enemy type id -> weight, edges: sides to spawn from
+WAVES = [
+    {"start": 0, "duration": 3600, "count": 60, "ramp": "constant"},
+    {"start": 3600, "duration": 3600, "count": 120, "ramp": "ease_in", "types": {0: 2, 1: 2, 2: 1, 3: 1, 4: 1}},
+    {"start": 7200, "duration": 1800, "count": 60, "ramp": "burst", "edges": ["left", "right"]},
+    {"start": 7200, "duration": 3600, "count": 180, "ramp": "ease_out", "edges": ["top", "bottom"],
+     "types": {2: 1, 3: 1, 4: 2}},
+]
+
+def load_waves(path):
+    """Read a wave table from a JSON list of wave objects (type ids become string keys in JSON)"""
+    with open(path) as f:
+        return json.load(f)
+
+class Wave:
+    __slots__ = ("start", "duration", "count", "ramp", "types", "weights", "edges")
+
+    def __init__(self, start, duration, count, ramp="constant", types=None, edges=EDGES):
+        self.start = start
+        self.duration = max(duration, 1)
+        self.count = count
+        self.ramp = RAMPS[ramp]
+        types = types or {type_id: 1 for type_id in range(5)}
+        self.types = [int(type_id) for type_id in types]
+        self.weights = list(types.values())
+        self.edges = [EDGES.index(edge) for edge in edges]
+
+    def target(self, tick, scale):
+        """Enemies this wave should have queued by `tick` of the cycle"""
+        if tick < self.start:
+            return 0
+        progress = min((tick - self.start) / self.duration, 1.0)
+        return int(self.count * scale * self.ramp(progress))
+
+class WaveScheduler:
+    """Turn a declarative wave table into a queue of spawns, drained a few per tick.
+
+    The table repeats once its last wave ends, with counts multiplied by `growth`
+    every cycle so difficulty keeps rising. Waves only decide how many enemies of
+    which type and side are due; `drain` hands out at most `budget` of them per tick,
+    so a burst of thousands spreads over frames instead of spiking one.
+    """
+    def __init__(self, waves=WAVES, budget=8, growth=1.5, rng=random):
+        self.table = waves  # As given, so snapshots can rebuild the scheduler
+        self.waves = [Wave(**wave) for wave in waves]
+        self.cycle_length = max(wave.start + wave.duration for wave in self.waves)
+        self.budget = budget
+        self.growth = growth
+        self.rng = rng
+        self.cycle = 0
+        self.queued = [0] * len(self.waves)  # Spawns queued from each wave this cycle
+        self.pending = deque()  # (enemy type id, side) waiting for budget
+
+    def update(self, tick):
+        """Queue the spawns due by game tick `tick`"""
+        cycle, cycle_tick = divmod(tick, self.cycle_length)
+        if cycle != self.cycle:
+            # Finish off the previous cycle before starting the next
+            self.enqueue(self.cycle_length, self.cycle)
+            self.cycle = cycle
+            self.queued = [0] * len(self.waves)
+        self.enqueue(cycle_tick, cycle)
+
+    def enqueue(self, cycle_tick, cycle):
+        scale = self.growth ** cycle
+        rng = self.rng
+        for i, wave in enumerate(self.waves):
+            target = wave.target(cycle_tick, scale)
+            due = target - self.queued[i]
+            if due > 0:
+                types = rng.choices(wave.types, wave.weights, k=due)
+                self.pending.extend((enemy_type, rng.choice(wave.edges)) for enemy_type in types)
+                self.queued[i] = target
+
+    def drain(self):
+        """Pop the spawns allowed this tick"""
+        pending = self.pending
+        return [pending.popleft() for _ in range(min(self.budget, len(pending)))]
+
+    def state(self):
+        """Cycle, queued counts and pending spawns, for snapshots and state hashes"""
+        return self.cycle, list(self.queued), list(self.pending)
+
+    def set_state(self, cycle, queued, pending):
+        self.cycle = cycle
+        self.queued = list(queued)
+        self.pending = deque(pending)
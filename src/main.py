@@ -1,85 +1,71 @@
 import pygame
+import argparse
+import hashlib
+import json
+import os
 import sys
-import math
 import random
+import struct
+import time
+import numpy as np
 from pygame.locals import *
 
-# Initialize pygame
-pygame.init()
-
-# Set up the game window
-WIDTH, HEIGHT = 800, 600
-window = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Johann's Office Survival")
-
-# Set game icon
-try:
-    icon = pygame.image.load("assets/icons/app_icon.png")
-    pygame.display.set_icon(icon)
-except pygame.error:
-    print("Warning: Unable to load app icon")
+from entities import ecs
+from entities.ecs import Archetype
+from entities.swarm import EnemySwarm
+from entities.waves import WAVES, WaveScheduler, load_waves
+from utils.game_utils import get_pulse_frames
+from utils.assets import AssetManager
+from utils.chunk_map import ChunkMap
+from utils.flow_field import FlowField, blocked_tiles
+from utils.dirty_rects import DirtyRects
+from utils.map_layer import EFFECT_TICKS, MapLayer
+from utils.masks import overlap_tables
+from utils.profiler import FrameProfiler
+from utils.render_queue import CAKES, HUD, PLAYER, PROJECTILES, RenderQueue, bar_surface
+from utils.replay import InputLog
+from utils.snapshot import SnapshotReader, SnapshotWriter
+from utils.text_cache import text_cache
+from utils.tile_grid import TileGrid
 
 # Game constants
+WIDTH, HEIGHT = 800, 600
 TILE_SIZE = 40
 MAP_WIDTH = 20  # in tiles
 MAP_HEIGHT = 20  # in tiles
 CAMERA_SPEED = 0.1
-
-# Load assets
-try:
-    hero_img = pygame.image.load("assets/sprites/hero-johann.png").convert_alpha()
-    mob_ariel_img = pygame.image.load("assets/sprites/mob-ariel.png").convert_alpha()
-    mob_john_img = pygame.image.load("assets/sprites/mob-john.png").convert_alpha()
-    mob_kirtik_img = pygame.image.load("assets/sprites/mob-kirtik.png").convert_alpha()
-    mob_margaret_img = pygame.image.load("assets/sprites/mob-margaret.png").convert_alpha()
-    mob_tim_img = pygame.image.load("assets/sprites/mob-tim.png").convert_alpha()
-    lightning_img = pygame.image.load("assets/sprites/lightning-sprite.png").convert_alpha()
-    magic_missile_img = pygame.image.load("assets/sprites/magic-missile-sprite.png").convert_alpha()
-    fire_cone_img = pygame.image.load("assets/sprites/fire-cone-sprite.png").convert_alpha()
-    cake_img = pygame.Surface((20, 20))  # Placeholder for cake sprite
-    cake_img.fill((255, 192, 203))  # Pink color for now
-except pygame.error:
-    print("Warning: Unable to load one or more images. Using placeholder graphics.")
-    # Create placeholder graphics
-    hero_img = pygame.Surface((32, 32))
-    hero_img.fill((0, 0, 255))
-    mob_ariel_img = pygame.Surface((32, 32))
-    mob_ariel_img.fill((255, 0, 0))
-    mob_john_img = pygame.Surface((32, 32))
-    mob_john_img.fill((255, 0, 0))
-    mob_kirtik_img = pygame.Surface((32, 32))
-    mob_kirtik_img.fill((255, 0, 0))
-    mob_margaret_img = pygame.Surface((32, 32))
-    mob_margaret_img.fill((255, 0, 0))
-    mob_tim_img = pygame.Surface((32, 32))
-    mob_tim_img.fill((255, 0, 0))
-    lightning_img = pygame.Surface((50, 10))
-    lightning_img.fill((255, 255, 0))
-    magic_missile_img = pygame.Surface((10, 10))
-    magic_missile_img.fill((0, 255, 255))
-    fire_cone_img = pygame.Surface((50, 50))
-    fire_cone_img.fill((255, 165, 0))
-    cake_img = pygame.Surface((20, 20))
-    cake_img.fill((255, 192, 203))
-
-# Resize character sprites to match tile size
-hero_img = pygame.transform.scale(hero_img, (TILE_SIZE, TILE_SIZE))
-mob_ariel_img = pygame.transform.scale(mob_ariel_img, (TILE_SIZE, TILE_SIZE))
-mob_john_img = pygame.transform.scale(mob_john_img, (TILE_SIZE, TILE_SIZE))
-mob_kirtik_img = pygame.transform.scale(mob_kirtik_img, (TILE_SIZE, TILE_SIZE))
-mob_margaret_img = pygame.transform.scale(mob_margaret_img, (TILE_SIZE, TILE_SIZE))
-mob_tim_img = pygame.transform.scale(mob_tim_img, (TILE_SIZE, TILE_SIZE))
-
-# Resize ability sprites to specified dimensions
-# Lightning should be as long as 6 tiles
-lightning_img = pygame.transform.scale(lightning_img, (TILE_SIZE, 6 * TILE_SIZE))
-# Magic missile should be only one tile large
-magic_missile_img = pygame.transform.scale(magic_missile_img, (TILE_SIZE, TILE_SIZE))
-# Fire cone should be the width of roughly 5 tiles
-fire_cone_img = pygame.transform.scale(fire_cone_img, (5 * TILE_SIZE, 5 * TILE_SIZE))
-
-# Rotate lightning sprite 90 degrees
-lightning_img = pygame.transform.rotate(lightning_img, 90)
+FLOW_FIELD_TILES = 32  # Window of an unbounded map the enemy flow field covers
+FLOW_FIELD_MARGIN = 8  # Tiles from its edge at which the window is moved to the player
+GRID_CELL_SIZE = TILE_SIZE * 2  # Spatial hash cell size for collision queries
+# How far entity draws reach outside their rects, for culling them against the viewport
+ENEMY_DRAW_MARGIN_X = 128  # Speech bubbles are centred on the enemy and can be much wider
+ENEMY_DRAW_MARGIN_Y = 30  # Health bar and speech bubble sit above the sprite
+CAKE_DRAW_MARGIN = 8  # Pulsing grows the cake around its rect
+
+# Sprites are loaded on first use, nothing touches the display until init_display
+assets = AssetManager(TILE_SIZE)
+window = None
+
+def init_display(headless=False):
+    """Initialize pygame and open the game window (or an invisible one for headless runs)"""
+    global window
+    if headless:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    # Initialize pygame
+    pygame.init()
+
+    # Set up the game window
+    window = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Johann's Office Survival")
+
+    # Set game icon
+    try:
+        icon = pygame.image.load("assets/icons/app_icon.png")
+        pygame.display.set_icon(icon)
+    except pygame.error:
+        print("Warning: Unable to load app icon")
+    return window
 
 # Color constants
 WHITE = (255, 255, 255)
@@ -103,7 +89,7 @@ def create_cake_sprite():
     return cake
 
 # Create birthday cake sprite
-cake_img = create_cake_sprite()
+assets.register_factory("cake", create_cake_sprite)
 
 # Interruption messages for speech bubbles
 INTERRUPTION_MESSAGES = [
@@ -124,88 +110,55 @@ class Player:
     def __init__(self, x, y):
         self.x = x
         self.y = y
-        self.width = hero_img.get_width()
-        self.height = hero_img.get_height()
+        self.width = assets.get("hero").get_width()
+        self.height = assets.get("hero").get_height()
         self.speed = 5
         self.health = 100
         self.max_health = 100
         self.xp = 0
         self.level = 1
         self.xp_to_level = 10
-        self.abilities = {
-            "lightning": {"cooldown": 0, "max_cooldown": 30},
-            "magic_missile": {"cooldown": 0, "max_cooldown": 15},
-            "fire_cone": {"cooldown": 0, "max_cooldown": 45},
-            "speed_burst": {"cooldown": 0, "max_cooldown": 60, "active": False, "duration": 0, "max_duration": 30}
-        }
+        # Ticks left of each ability's cooldown and of its effect, one column per ABILITIES entry
+        self.ability_timers = np.zeros((2, len(ABILITIES)), dtype=np.int32)
+        self.cooldowns, self.durations = self.ability_timers
+        self.max_cooldowns = np.array([ability["cooldown"] for ability in ABILITIES], dtype=np.int32)
+        self.bounds = (MAP_WIDTH * TILE_SIZE, MAP_HEIGHT * TILE_SIZE)  # None on an unbounded map
         self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
 
     def move(self, dx, dy):
-        speed_multiplier = 2 if self.abilities["speed_burst"]["active"] else 1
+        speed_multiplier = 2 if self.durations[SPEED_BURST] > 0 else 1
         self.x += dx * self.speed * speed_multiplier
         self.y += dy * self.speed * speed_multiplier
 
         # Keep player within map bounds
-        self.x = max(0, min(self.x, MAP_WIDTH * TILE_SIZE - self.width))
-        self.y = max(0, min(self.y, MAP_HEIGHT * TILE_SIZE - self.height))
+        if self.bounds:
+            self.x = max(0, min(self.x, self.bounds[0] - self.width))
+            self.y = max(0, min(self.y, self.bounds[1] - self.height))
 
         self.rect.x = self.x
         self.rect.y = self.y
 
-    def use_ability(self, ability_name, enemies, projectiles):
-        ability = self.abilities[ability_name]
-        if ability["cooldown"] <= 0:
-            ability["cooldown"] = ability["max_cooldown"]
-
-            if ability_name == "lightning":
-                projectiles.append(Lightning(self.x + self.width // 2, self.y + self.height // 2))
-
-            elif ability_name == "magic_missile":
-                # Find closest enemy for homing
-                closest_enemy = None
-                min_distance = float('inf')
-
-                for enemy in enemies:
-                    dx = enemy.x - self.x
-                    dy = enemy.y - self.y
-                    distance = math.sqrt(dx*dx + dy*dy)
-
-                    if distance < min_distance:
-                        min_distance = distance
-                        closest_enemy = enemy
-
-                if closest_enemy:
-                    projectiles.append(MagicMissile(
-                        self.x + self.width // 2, 
-                        self.y + self.height // 2,
-                        closest_enemy  # Pass target enemy for homing
-                    ))
-
-            elif ability_name == "fire_cone":
-                projectiles.append(FireCone(self.x + self.width // 2, self.y + self.height // 2))
-
-            elif ability_name == "speed_burst":
-                ability["active"] = True
-                ability["duration"] = ability["max_duration"]
+    def use_ability(self, index, enemies, projectiles):
+        """Cast ABILITIES[`index`] unless it is still cooling down"""
+        if self.cooldowns[index] > 0:
+            return
+        ability = ABILITIES[index]
+        self.cooldowns[index] = self.max_cooldowns[index]
+        self.durations[index] = ability["duration"]
+        if ability["spawn"] is not None:
+            ability["spawn"](self, ability, enemies, projectiles)
 
     def update(self):
-        # Update ability cooldowns
-        for ability in self.abilities.values():
-            if ability["cooldown"] > 0:
-                ability["cooldown"] -= 1
+        # Count every cooldown and effect down at once
+        timers = self.ability_timers
+        timers -= timers > 0
 
-        # Update speed burst duration
-        if self.abilities["speed_burst"]["active"]:
-            self.abilities["speed_burst"]["duration"] -= 1
-            if self.abilities["speed_burst"]["duration"] <= 0:
-                self.abilities["speed_burst"]["active"] = False
-
-    def draw(self, window, camera_x, camera_y):
-        window.blit(hero_img, (self.x - camera_x, self.y - camera_y))
-
-        # Draw health bar
-        pygame.draw.rect(window, RED, (self.x - camera_x, self.y - camera_y - 10, self.width, 5))
-        pygame.draw.rect(window, GREEN, (self.x - camera_x, self.y - camera_y - 10, self.width * (self.health / self.max_health), 5))
+    def submit(self, queue, camera_x, camera_y):
+        """Queue the player's sprite and health bar"""
+        x, y = self.x - camera_x, self.y - camera_y
+        queue.add(PLAYER, assets.get("hero"), (x, y))
+        queue.add(PLAYER, bar_surface(self.width, 5, bar_fill(self.width, self.health / self.max_health), GREEN, RED),
+                  (x, y - 10))
 
     def gain_xp(self, amount):
         self.xp += amount
@@ -218,327 +171,652 @@ class Player:
         self.xp_to_level = 10 * self.level
         self.health = self.max_health  # Refill health on level up
 
-class Enemy:
-    def __init__(self, x, y, type_id):
-        self.x = x
-        self.y = y
-        self.type_id = type_id
-        self.speed = 2
-        self.health = 30
-        self.cooldown = 0
-        self.message = random.choice(INTERRUPTION_MESSAGES)
-        self.message_timer = random.randint(100, 200)  # Random timer for speech bubble
-        self.show_message = False
-
-        # Select sprite based on enemy type
-        if type_id == 0:
-            self.img = mob_ariel_img
-        elif type_id == 1:
-            self.img = mob_john_img
-        elif type_id == 2:
-            self.img = mob_kirtik_img
-        elif type_id == 3:
-            self.img = mob_margaret_img
-        else:
-            self.img = mob_tim_img
-
-        self.width = self.img.get_width()
-        self.height = self.img.get_height()
-        self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
-
-    def move_towards_player(self, player):
-        dx = player.x - self.x
-        dy = player.y - self.y
-        dist = math.sqrt(dx * dx + dy * dy)
-
-        if dist != 0:
-            dx = dx / dist
-            dy = dy / dist
-
-            self.x += dx * self.speed
-            self.y += dy * self.speed
-
-            self.rect.x = self.x
-            self.rect.y = self.y
-
-    def update(self, player):
-        self.move_towards_player(player)
-
-        # Update message timer
-        self.message_timer -= 1
-        if self.message_timer <= 0:
-            self.show_message = True
-            if self.message_timer <= -50:  # Show message for 50 frames
-                self.show_message = False
-                self.message = random.choice(INTERRUPTION_MESSAGES)
-                self.message_timer = random.randint(100, 200)
-
-    def draw(self, window, camera_x, camera_y):
-        window.blit(self.img, (self.x - camera_x, self.y - camera_y))
-
-        # Draw health bar
-        pygame.draw.rect(window, RED, (self.x - camera_x, self.y - camera_y - 10, self.width, 5))
-        pygame.draw.rect(window, GREEN, (self.x - camera_x, self.y - camera_y - 10, self.width * (self.health / 30), 5))
-
-        # Draw speech bubble with message
-        if self.show_message:
-            font = pygame.font.SysFont(None, 16)
-            text = font.render(self.message, True, BLACK)
-
-            # Speech bubble background
-            bubble_width = text.get_width() + 10
-            bubble_height = text.get_height() + 10
-            bubble_x = self.x - camera_x - bubble_width // 2 + self.width // 2
-            bubble_y = self.y - camera_y - 30
-
-            pygame.draw.rect(window, WHITE, (bubble_x, bubble_y, bubble_width, bubble_height))
-            pygame.draw.rect(window, BLACK, (bubble_x, bubble_y, bubble_width, bubble_height), 1)
-
-            # Triangle pointer
-            pygame.draw.polygon(window, WHITE, [
-                (self.x - camera_x + self.width // 2, self.y - camera_y - 5),
-                (self.x - camera_x + self.width // 2 - 5, bubble_y + bubble_height),
-                (self.x - camera_x + self.width // 2 + 5, bubble_y + bubble_height)
-            ])
-
-            # Text
-            window.blit(text, (bubble_x + 5, bubble_y + 5))
-
-class Lightning:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.width = lightning_img.get_width()
-        self.height = lightning_img.get_height()
-        self.lifetime = 10
-        self.damage = 20
-        self.rect = pygame.Rect(self.x - self.width // 2, self.y, self.width, self.height)
+# Projectile kinds, indexed by their sprite id: lifetime in ticks, damage per hit, homing speed (0 for
+# none), whether they hit every enemy under them, whether they are centred on their position
+# (otherwise they hang from it, the middle of their top edge `top` rows above it), whether they
+# hit with their sprite's pixels rather than its whole rect, and the ticks before they can hit the
+# same enemy again (0 for every tick, only matters for those that pierce)
+PROJECTILE_KINDS = (
+    {"sprite": "lightning", "lifetime": 10, "damage": 20, "speed": 0, "pierce": False, "centred": False, "top": 0,
+     "mask": True, "hit_interval": 0},
+    {"sprite": "magic_missile", "lifetime": 120, "damage": 15, "speed": 6, "pierce": False, "centred": True, "top": 0,
+     "mask": False, "hit_interval": 0},
+    # 3 seconds, hitting twice a second. The flames fill the sprite from row 62 down, so they start at the caster
+    {"sprite": "fire_cone", "lifetime": 180, "damage": 20, "speed": 0, "pierce": True, "centred": False, "top": 62,
+     "mask": True, "hit_interval": 30},
+)
+LIGHTNING, MAGIC_MISSILE, FIRE_CONE = range(3)
+CAKE_VALUE = 1  # XP per cake
+
+# Components of the projectile and cake archetypes
+PROJECTILE_COMPONENTS = {
+    "x": np.float64, "y": np.float64, "vx": np.float64, "vy": np.float64,
+    "lifetime": np.int32, "damage": np.int32, "sprite": np.uint8,
+    "width": np.int32, "height": np.int32, "anchor_x": np.int32, "anchor_y": np.int32,
+    "speed": np.float64, "pierce": bool, "masked": bool, "hit_interval": np.int32,
+    "target": object, "target_generation": np.int32,  # Homing target's EnemyView and its generation then
+    "uid": np.int64,  # Unique over the game, for the hits it has landed
+}
+CAKE_COMPONENTS = {
+    "x": np.float64, "y": np.float64,
+    "left": np.int32, "top": np.int32,  # Rect corner, whole pixels; cakes never move
+    "value": np.int32, "pulse_step": np.int32, "growing": bool,
+}
+
+PROJECTILE_STATE = ("sprite", "x", "y", "lifetime", "uid")  # Projectile columns saved, the rest follow from the kind
+
+def spawn_projectile(projectiles, kind, x, y, target=None):
+    """Add a projectile of `kind` at (`x`, `y`), homing on the EnemyView `target` if given, and return its slot"""
+    spec = PROJECTILE_KINDS[kind]
+    width, height = assets.get(spec["sprite"]).get_size()
+    return projectiles.spawn(x=x, y=y, lifetime=spec["lifetime"], damage=spec["damage"], sprite=kind,
+                             width=width, height=height, anchor_x=width // 2,
+                             anchor_y=height // 2 if spec["centred"] else spec["top"], speed=spec["speed"],
+                             pierce=spec["pierce"], masked=spec["mask"], hit_interval=spec["hit_interval"],
+                             target=target, target_generation=target.generation if target else 0,
+                             uid=projectiles.spawned)
+
+def spawn_cake(cakes, x, y):
+    left, top = ecs.rect_round(np.array((x, y), dtype=np.float64)).tolist()
+    return cakes.spawn(x=x, y=y, left=left, top=top, value=CAKE_VALUE, pulse_step=0, growing=True)
+
+def submit_projectiles(queue, projectiles, indices, camera_x, camera_y):
+    """Queue the sprites of the projectiles in slots `indices`"""
+    images = [assets.get(spec["sprite"]) for spec in PROJECTILE_KINDS]
+    x = projectiles.x[indices] - projectiles.anchor_x[indices] - camera_x
+    y = projectiles.y[indices] - projectiles.anchor_y[indices] - camera_y
+    queue.extend(PROJECTILES, [(images[sprite], (x, y)) for sprite, x, y in
+                               zip(projectiles.sprite[indices].tolist(), x.tolist(), y.tolist())])
+
+def submit_cakes(queue, cakes, indices, camera_x, camera_y):
+    """Queue the cakes in slots `indices`, each at its frame of the pulse animation"""
+    frames = get_pulse_frames(assets.get("cake"))
+    blits = []
+    for x, y, step in zip(cakes.x[indices].tolist(), cakes.y[indices].tolist(), cakes.pulse_step[indices].tolist()):
+        pulsed_img, offset_x, offset_y = frames[step]
+        blits.append((pulsed_img, (x - camera_x - offset_x, y - camera_y - offset_y)))
+    queue.extend(CAKES, blits)
+
+def cast_projectile(player, ability, enemies, projectiles):
+    """Spawn the ability's projectile from the player's centre"""
+    spawn_projectile(projectiles, ability["projectile"], player.x + player.width // 2, player.y + player.height // 2)
+
+def cast_homing(player, ability, enemies, projectiles):
+    """Spawn the ability's projectile homing on the enemy nearest the player, if there is one"""
+    closest = enemies.nearest(player.x, player.y)
+    if closest:
+        spawn_projectile(projectiles, ability["projectile"], player.x + player.width // 2,
+                         player.y + player.height // 2, closest[0])
+
+# Player abilities, in HUD and input bit order: key binding, cooldown and effect duration in ticks,
+# the projectile kind they fire (its damage and sprite are in PROJECTILE_KINDS), and the function
+# called as `spawn(player, ability, enemies, projectiles)` when they are cast
+ABILITIES = (
+    {"name": "lightning", "key": K_j, "cooldown": 30, "duration": 0, "projectile": LIGHTNING,
+     "spawn": cast_projectile},
+    {"name": "magic_missile", "key": K_k, "cooldown": 15, "duration": 0, "projectile": MAGIC_MISSILE,
+     "spawn": cast_homing},
+    {"name": "fire_cone", "key": K_l, "cooldown": 45, "duration": 0, "projectile": FIRE_CONE,
+     "spawn": cast_projectile},
+    {"name": "speed_burst", "key": K_i, "cooldown": 60, "duration": 30, "projectile": None,
+     "spawn": None},  # Doubles the player's speed while it lasts
+)
+ABILITY_INDEX = {ability["name"]: i for i, ability in enumerate(ABILITIES)}
+SPEED_BURST = ABILITY_INDEX["speed_burst"]
+# What the HUD shows for each ability
+ABILITY_LABELS = tuple(ability["name"].replace("_", " ").title() for ability in ABILITIES)
+ABILITY_KEY_LABELS = tuple(pygame.key.name(ability["key"]).upper() for ability in ABILITIES)
+
+def bar_fill(width, fraction):
+    """Pixels of a `width` bar filled at `fraction`, as `pygame.draw.rect` would truncate them"""
+    return min(max(int(width * fraction), 0), width)
+
+def target_slots(projectiles):
+    """Swarm slot each projectile is homing on, or -1"""
+    return np.array([target.index if target is not None and target.generation == generation else -1
+                     for target, generation in zip(projectiles.target[:projectiles.count].tolist(),
+                                                   projectiles.target_generation[:projectiles.count].tolist())],
+                    dtype=np.int32)
 
-    def update(self):
-        self.lifetime -= 1
-        return self.lifetime <= 0
-
-    def draw(self, window, camera_x, camera_y):
-        window.blit(lightning_img, (self.x - self.width // 2 - camera_x, self.y - camera_y))
-
-class MagicMissile:
-    def __init__(self, x, y, target):
-        self.x = x
-        self.y = y
-        self.target = target  # Target enemy for homing
-        self.speed = 6
-        self.width = magic_missile_img.get_width()
-        self.height = magic_missile_img.get_height()
-        self.lifetime = 120
-        self.damage = 15
-        self.rect = pygame.Rect(self.x - self.width // 2, self.y - self.height // 2, self.width, self.height)
-
-    def update(self):
-        # Home in on target
-        if self.target and self.target.health > 0:
-            dx = self.target.x + self.target.width // 2 - self.x
-            dy = self.target.y + self.target.height // 2 - self.y
-            dist = math.sqrt(dx * dx + dy * dy)
+# Game functions
+def create_enemy_swarm(infinite=False, rng=random):
+    enemy_images = [assets.get(name) for name in ("mob_ariel", "mob_john", "mob_kirtik", "mob_margaret", "mob_tim")]
+    if infinite:
+        # Enemies spawn just off screen, so a grid of twice the screen around the player covers them
+        return EnemySwarm(enemy_images, INTERRUPTION_MESSAGES, None, None, GRID_CELL_SIZE, grid_size=(WIDTH * 2, HEIGHT * 2),
+                          rng=rng)
+    return EnemySwarm(enemy_images, INTERRUPTION_MESSAGES, MAP_WIDTH * TILE_SIZE, MAP_HEIGHT * TILE_SIZE, GRID_CELL_SIZE,
+                      rng=rng)
+
+def spawn_enemy(player, enemies, bounds=None, rng=random, enemy_type=None, side=None):
+    # Choose random position outside of screen but within map, or on `bounds` (left, top, right, bottom)
+    # The wave scheduler picks `side` (0-3: top, right, bottom, left) and `enemy_type`, otherwise they are random
+    left, top, right, bottom = bounds or (0, 0, MAP_WIDTH * TILE_SIZE, MAP_HEIGHT * TILE_SIZE)
+    if side is None:
+        side = rng.randint(0, 3)
+    if side == 0:  # Top
+        x = rng.randint(left, right)
+        y = top
+    elif side == 1:  # Right
+        x = right
+        y = rng.randint(top, bottom)
+    elif side == 2:  # Bottom
+        x = rng.randint(left, right)
+        y = bottom
+    else:  # Left
+        x = left
+        y = rng.randint(top, bottom)
 
-            if dist > 0:
-                dx = dx / dist
-                dy = dy / dist
+    if enemy_type is None:
+        enemy_type = rng.randint(0, 4)
+    return enemies.spawn(x, y, enemy_type)
 
-                self.x += dx * self.speed
-                self.y += dy * self.speed
+# Ability triggered by each key
+ABILITY_KEYS = {ability["key"]: ability["name"] for ability in ABILITIES}
 
-        self.rect.x = self.x - self.width // 2
-        self.rect.y = self.y - self.height // 2
+def create_office_tiles(rng=random):
+    # Create office tile grid
+    office_tiles = TileGrid(MAP_WIDTH, MAP_HEIGHT, TILE_SIZE)
+    for y in range(MAP_HEIGHT):
+        for x in range(MAP_WIDTH):
+            # Create floor tiles (placeholder, could be replaced with actual sprites)
+            tile_type = rng.randint(0, 2)  # 0: Empty, 1: Desk, 2: Chair
+            office_tiles.set_tile(x, y, tile_type)
+    return office_tiles
+
+class Game:
+    """State of one run, advanced by `step` one fixed 1/60 s tick at a time.
+
+    The windowed loop and the headless runner both drive the game through `step`,
+    so they share exactly the same player/enemy/projectile/cake logic.
+    With `infinite` the fixed 20x20 office is replaced by a chunked map streamed
+    around the camera from `map_seed`.
+
+    All gameplay randomness comes from `rng`, seeded with `seed`, so a seed plus the
+    per-tick inputs reproduce a run exactly. Cosmetic effects are a pure function
+    of the tick count, so drawing never changes the simulation.
+
+    Enemies arrive in the waves of the `waves` table, at most `spawn_budget` per tick.
+    """
+    def __init__(self, profiler=None, infinite=False, map_seed=None, seed=None, waves=WAVES, spawn_budget=8):
+        self.profiler = profiler or FrameProfiler()
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.infinite = infinite
+        self.player = Player(WIDTH // 2, HEIGHT // 2)
+        self.enemies = create_enemy_swarm(infinite, self.rng)
+        self.projectiles = Archetype(PROJECTILE_COMPONENTS)
+        self.cakes = Archetype(CAKE_COMPONENTS)  # Renamed from xp_orbs to cakes
+        self.hits = ecs.HitSet()  # Enemies lingering projectiles hit lately
+        # Where each projectile sprite touches each enemy, see ecs.damage
+        self.projectile_shapes = overlap_tables([assets.get(spec["sprite"]) for spec in PROJECTILE_KINDS],
+                                                self.enemies.images, [spec["mask"] for spec in PROJECTILE_KINDS])
+        self.waves = WaveScheduler(waves, spawn_budget, rng=self.rng)
+        self.camera_x, self.camera_y = 0, 0
+        self.game_over = False
+        self.game_over_start_time = 0
+        self.ticks = 0
+        self.kills = 0
+        self.culled = (0, 0, 0)  # Enemies, projectiles and cakes skipped by the last draw
+        self.render_queue = RenderQueue()
+        if infinite:
+            self.player.bounds = None
+            self.office_tiles = None
+            self.map_layer = ChunkMap(self.rng.getrandbits(32) if map_seed is None else map_seed, TILE_SIZE)
+            self.flow_field = None  # Built around the player on the first step
+        else:
+            self.office_tiles = create_office_tiles(self.rng)
+            # Desks block enemies, who share one flow field towards the player
+            self.flow_field = FlowField(blocked_tiles(self.office_tiles), TILE_SIZE)
+            self.map_layer = None  # Baked on first draw, headless runs never need it
+
+    def update_flow_field(self, x, y):
+        """On an unbounded map, move the flow field window once (`x`, `y`) gets near its edge"""
+        field = self.flow_field
+        if field is None or not field.covers(x, y, FLOW_FIELD_MARGIN):
+            col = int(x // TILE_SIZE) - FLOW_FIELD_TILES // 2
+            row = int(y // TILE_SIZE) - FLOW_FIELD_TILES // 2
+            blocked = self.map_layer.blocked(col, row, FLOW_FIELD_TILES, FLOW_FIELD_TILES)
+            self.flow_field = FlowField(blocked, TILE_SIZE, origin=(col, row))
+
+    def step(self, dx, dy, abilities=()):
+        """Advance one tick with movement direction `dx`, `dy` (-1, 0 or 1) and the abilities cast this tick"""
+        if self.game_over:
+            return
+        self.ticks += 1
+        profiler = self.profiler
+        player = self.player
+        enemies = self.enemies
+        projectiles = self.projectiles
+        cakes = self.cakes
+
+        for ability_name in abilities:
+            player.use_ability(ABILITY_INDEX[ability_name], enemies, projectiles)
 
-        self.lifetime -= 1
-        return self.lifetime <= 0
+        # Normalize diagonal movement
+        if dx != 0 and dy != 0:
+            dx *= 0.7071  # 1/sqrt(2)
+            dy *= 0.7071
 
-    def draw(self, window, camera_x, camera_y):
-        window.blit(magic_missile_img, (self.x - self.width // 2 - camera_x, self.y - self.height // 2 - camera_y))
+        player.move(dx, dy)
 
-class FireCone:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.width = fire_cone_img.get_width()
-        self.height = fire_cone_img.get_height()
-        self.lifetime = 180  # 3 seconds at 60 FPS
-        self.damage = 10
-        self.rect = pygame.Rect(self.x - self.width // 2, self.y, self.width, self.height)
+        # Update camera position to follow player smoothly
+        target_camera_x = player.x - WIDTH // 2
+        target_camera_y = player.y - HEIGHT // 2
 
-    def update(self):
-        self.lifetime -= 1
-        return self.lifetime <= 0
+        # Camera bounds
+        if not self.infinite:
+            target_camera_x = max(0, min(target_camera_x, MAP_WIDTH * TILE_SIZE - WIDTH))
+            target_camera_y = max(0, min(target_camera_y, MAP_HEIGHT * TILE_SIZE - HEIGHT))
 
-    def draw(self, window, camera_x, camera_y):
-        window.blit(fire_cone_img, (self.x - self.width // 2 - camera_x, self.y - camera_y))
+        # Smooth camera movement
+        self.camera_x += (target_camera_x - self.camera_x) * CAMERA_SPEED
+        self.camera_y += (target_camera_y - self.camera_y) * CAMERA_SPEED
+        if self.infinite:
+            self.map_layer.prefetch(self.camera_x, self.camera_y, WIDTH, HEIGHT)
 
-class Cake:  # Renamed from XPOrb to Cake
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.width = cake_img.get_width()
-        self.height = cake_img.get_height()
-        self.value = 1
-        self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
-        self.pulse = 0
-        self.growing = True
+        # Update game objects
+        player.update()
+        profiler.mark("player")
+
+        # Enemy spawning, queued by the wave table and drained under the per-tick budget
+        self.waves.update(self.ticks)
+        spawns = self.waves.drain()
+        if spawns:
+            bounds = None
+            if self.infinite:
+                # Just off screen around the player
+                left = int(player.x) - WIDTH // 2 - TILE_SIZE
+                top = int(player.y) - HEIGHT // 2 - TILE_SIZE
+                bounds = (left, top, left + WIDTH + 2 * TILE_SIZE, top + HEIGHT + 2 * TILE_SIZE)
+            for enemy_type, side in spawns:
+                spawn_enemy(player, enemies, bounds, self.rng, enemy_type, side)
+        profiler.mark("spawn")
+
+        # Update enemies, one vectorised step for the whole swarm
+        player_x = player.x + player.width / 2
+        player_y = player.y + player.height / 2
+        if self.infinite:
+            self.update_flow_field(player_x, player_y)
+        self.flow_field.update(player_x, player_y)
+        contacts = enemies.update(player, self.flow_field)
+
+        # Check collision with player
+        if contacts:
+            player.health -= contacts
+
+            # Check for game over
+            if player.health <= 0:
+                self.game_over = True
+                self.game_over_start_time = pygame.time.get_ticks()
+        profiler.mark("enemies")
+
+        # Update projectiles, expired and spent ones are removed at the end of the tick
+        ecs.homing(projectiles, enemies)
+        ecs.movement(projectiles)
+        ecs.lifetime(projectiles)
+
+        # Drop cake for dead enemies, they leave the swarm at the end of the pass
+        for enemy in ecs.damage(projectiles, enemies, self.projectile_shapes, self.hits, self.ticks):
+            self.kills += 1
+            spawn_cake(cakes, enemy.x, enemy.y)
+
+        enemies.remove_dead()
+        profiler.mark("projectiles")
 
-    def update(self):
-        # Pulsing effect
-        if self.growing:
-            self.pulse += 0.05
-            if self.pulse >= 1:
-                self.growing = False
+        # Update cakes
+        ecs.pulse(cakes)
+
+        # Check collision with player
+        cake_width, cake_height = assets.get("cake").get_size()
+        for value in cakes.value[ecs.pickup(cakes, player.rect, cake_width, cake_height)].tolist():
+            player.gain_xp(value)
+
+        # Drop everything removed this tick in one pass
+        projectiles.compact()
+        cakes.compact()
+        profiler.mark("cakes")
+
+    def state_hash(self):
+        """SHA-256 of the simulation state, for checking that a replay ended where the recording did"""
+        player = self.player
+        enemies = self.enemies
+        h = hashlib.sha256()
+        # Numbers go through struct so 400 and 400.0 hash the same
+        h.update(struct.pack("<II?dddddiii", self.ticks, self.kills, self.game_over, self.camera_x, self.camera_y,
+                             player.x, player.y, player.health, player.xp, player.level, player.xp_to_level))
+        h.update(player.ability_timers.tobytes())
+        h.update(player.max_cooldowns.tobytes())
+        h.update(repr((self.rng.getstate(), self.waves.state())).encode())
+        for name in enemies.ARRAYS:
+            h.update(getattr(enemies, name)[:enemies.count].tobytes())
+        projectiles = self.projectiles
+        for name in PROJECTILE_STATE:
+            h.update(getattr(projectiles, name)[:projectiles.count].tobytes())
+        h.update(target_slots(projectiles).tobytes())
+        h.update(struct.pack("<QQ", enemies.spawned, projectiles.spawned))
+        h.update(self.hits.keys.tobytes())
+        h.update(self.hits.until.tobytes())
+        for name in CAKE_COMPONENTS:
+            h.update(getattr(self.cakes, name)[:self.cakes.count].tobytes())
+        return h.digest()
+
+    def snapshot(self):
+        """Pack the whole simulation state into bytes that `Game.restore` turns back into a game"""
+        player = self.player
+        writer = SnapshotWriter()
+        writer.pack("?Q?IIddI", self.infinite, self.seed, self.game_over, self.ticks, self.kills,
+                    self.camera_x, self.camera_y, self.game_over_start_time)
+        writer.random_state(self.rng)
+
+        # The wave table as JSON, then the scheduler's progress through it
+        waves = self.waves
+        writer.array(np.frombuffer(json.dumps(waves.table).encode(), dtype=np.uint8))
+        cycle, queued, pending = waves.state()
+        writer.pack("Id", waves.budget, waves.growth)
+        writer.pack("I", cycle)
+        writer.array(np.array(queued, dtype=np.int32))
+        writer.array(np.array(pending, dtype=np.uint8).reshape(-1))
+
+        # The map itself regenerates from its seed, the fixed one is small enough to store
+        if self.infinite:
+            field = self.flow_field
+            writer.pack("Q?ii", self.map_layer.seed, field is not None,
+                        field.origin_col if field else 0, field.origin_row if field else 0)
+        else:
+            writer.array(self.office_tiles.array.ravel())
+
+        writer.pack("dddiii", player.x, player.y, player.health, player.xp, player.level, player.xp_to_level)
+        writer.array(player.cooldowns)
+        writer.array(player.durations)
+
+        self.enemies.write_snapshot(writer)
+
+        # Projectiles and cakes column by column, the rest of their components follow from these
+        projectiles = self.projectiles
+        for name in PROJECTILE_STATE:
+            writer.array(getattr(projectiles, name)[:projectiles.count])
+        writer.array(target_slots(projectiles))
+        writer.pack("Q", projectiles.spawned)
+        writer.array(self.hits.keys)
+        writer.array(self.hits.until)
+        for name in CAKE_COMPONENTS:
+            writer.array(getattr(self.cakes, name)[:self.cakes.count])
+        return writer.getvalue()
+
+    @classmethod
+    def restore(cls, data, profiler=None):
+        """Rebuild a game from `Game.snapshot` bytes"""
+        reader = SnapshotReader(data)
+        infinite, seed, game_over, ticks, kills, camera_x, camera_y, game_over_start_time = reader.unpack("?Q?IIddI")
+        rng_state = reader.random_state()
+        waves = json.loads(reader.array(np.uint8).tobytes())
+        spawn_budget, growth = reader.unpack("Id")
+        game = cls(profiler, infinite, seed=seed, waves=waves, spawn_budget=spawn_budget)
+        game.game_over = game_over
+        game.ticks = ticks
+        game.kills = kills
+        game.camera_x, game.camera_y = camera_x, camera_y
+        game.game_over_start_time = game_over_start_time
+        game.rng.setstate(rng_state)
+        game.waves.growth = growth
+        cycle, = reader.unpack("I")
+        queued = reader.array(np.int32).tolist()
+        pending = reader.array(np.uint8).reshape(-1, 2).tolist()
+        game.waves.set_state(cycle, queued, map(tuple, pending))
+
+        if infinite:
+            map_seed, has_field, origin_col, origin_row = reader.unpack("Q?ii")
+            game.map_layer = ChunkMap(map_seed, TILE_SIZE)
+            if has_field:
+                blocked = game.map_layer.blocked(origin_col, origin_row, FLOW_FIELD_TILES, FLOW_FIELD_TILES)
+                game.flow_field = FlowField(blocked, TILE_SIZE, origin=(origin_col, origin_row))
+        else:
+            game.office_tiles.array.ravel()[:] = reader.array(np.uint8)
+            game.flow_field = FlowField(blocked_tiles(game.office_tiles), TILE_SIZE)
+
+        player = game.player
+        player.x, player.y, player.health, player.xp, player.level, player.xp_to_level = reader.unpack("dddiii")
+        player.rect.x = player.x
+        player.rect.y = player.y
+        player.cooldowns[:] = reader.array(np.int32)
+        player.durations[:] = reader.array(np.int32)
+
+        enemies = game.enemies
+        enemies.read_snapshot(reader)
+
+        projectiles = game.projectiles
+        columns = [reader.array(PROJECTILE_COMPONENTS[name]) for name in PROJECTILE_STATE]
+        for kind, x, y, lifetime, uid, target in zip(*(column.tolist() for column in columns),
+                                                     reader.array(np.int32).tolist()):
+            slot = spawn_projectile(projectiles, kind, x, y, enemies.views[target] if target >= 0 else None)
+            projectiles.lifetime[slot] = lifetime
+            projectiles.uid[slot] = uid
+        projectiles.spawned, = reader.unpack("Q")
+        game.hits.keys = reader.array(np.int64)
+        game.hits.until = reader.array(np.int64)
+
+        cakes = game.cakes
+        columns = {name: reader.array(dtype) for name, dtype in CAKE_COMPONENTS.items()}
+        for x, y in zip(columns["x"].tolist(), columns["y"].tolist()):
+            spawn_cake(cakes, x, y)
+        for name, column in columns.items():
+            getattr(cakes, name)[:cakes.count] = column
+        return game
+
+    def counts(self):
+        """Entity counts for `FrameProfiler.end_frame`"""
+        return (len(self.enemies), len(self.projectiles), len(self.cakes)) + self.culled
+
+    def draw_background(self, surface):
+        """Draw the map and terminal effects under the camera and return the effect rects"""
+        # Whole pixels, so a cached background matches any camera with the same integer offset
+        camera_x, camera_y = int(self.camera_x), int(self.camera_y)
+        # Static map from the pre-rendered layer, then the terminal effects
+        if self.map_layer is None:
+            self.map_layer = MapLayer(self.office_tiles)
+        self.map_layer.draw(surface, camera_x, camera_y)
+        return self.map_layer.draw_effects(surface, camera_x, camera_y, self.ticks // EFFECT_TICKS)
+
+    def draw(self, window, dirty=None):
+        """Draw the frame and return the rects to pass to `display.update`, None for all of it.
+
+        With a `DirtyRects` the background is only redrawn under what moved, otherwise
+        the whole window is redrawn.
+        """
+        player = self.player
+        camera_x, camera_y = self.camera_x, self.camera_y
+        if dirty is None:
+            self.draw_background(window)
         else:
-            self.pulse -= 0.05
-            if self.pulse <= 0:
-                self.growing = True
-
-    def draw(self, window, camera_x, camera_y):
-        # Apply pulsing effect
-        pulse_scale = 1 + 0.2 * self.pulse
-        pulsed_img = pygame.transform.scale(
-            cake_img, 
-            (int(self.width * pulse_scale), int(self.height * pulse_scale))
-        )
-        window.blit(
-            pulsed_img, 
-            (
-                self.x - camera_x - (pulsed_img.get_width() - self.width) // 2, 
-                self.y - camera_y - (pulsed_img.get_height() - self.height) // 2
-            )
-        )
+            dirty.begin(window, camera_x, camera_y, self.ticks // EFFECT_TICKS, self.draw_background)
+        self.profiler.mark("background")
+        queue = self.render_queue
+
+        # Only draw what can reach the viewport: enemies through their grid, projectiles and cakes
+        # by testing their whole columns. A little slack: sprites are drawn at the fractional
+        # camera offset from rounded rects
+        view = pygame.Rect(int(camera_x), int(camera_y), WIDTH, HEIGHT).inflate(4, 4)
+        cakes = self.cakes
+        cake_width, cake_height = assets.get("cake").get_size()
+        visible_cakes = ecs.overlapping(cakes.left[:cakes.count], cakes.top[:cakes.count],
+                                        cake_width, cake_height,
+                                        view.inflate(2 * CAKE_DRAW_MARGIN, 2 * CAKE_DRAW_MARGIN))
+        visible_projectiles = ecs.overlapping(*ecs.rects(self.projectiles), view)
+        visible_enemies = self.enemies.visible_indices(pygame.Rect(view.left - ENEMY_DRAW_MARGIN_X, view.top,
+                                                                   view.width + 2 * ENEMY_DRAW_MARGIN_X,
+                                                                   view.height + ENEMY_DRAW_MARGIN_Y))
+
+        # Entities queue their sprites, drawn layer by layer below
+        submit_cakes(queue, cakes, visible_cakes, camera_x, camera_y)
+        submit_projectiles(queue, self.projectiles, visible_projectiles, camera_x, camera_y)
+        self.enemies.submit(queue, visible_enemies, camera_x, camera_y)
+        self.culled = (len(self.enemies) - len(visible_enemies), len(self.projectiles) - len(visible_projectiles),
+                       len(cakes) - len(visible_cakes))
+
+        player.submit(queue, camera_x, camera_y)
+        drawn = None if dirty is None else []  # Screen rects drawn over the background
+        queue.flush(window, drawn)
+        self.profiler.mark("entities")
+
+        # UI
+        # - Health bar
+        queue.add(HUD, bar_surface(200, 20, bar_fill(200, player.health / player.max_health), GREEN, RED), (10, 10))
+        text = text_cache.render(f"Health: {player.health}/{player.max_health}", 24, WHITE)
+        queue.add(HUD, text, (20, 12))
 
-# Game functions
-def spawn_enemy(player):
-    # Choose random position outside of screen but within map
-    side = random.randint(0, 3)
-    if side == 0:  # Top
-        x = random.randint(0, MAP_WIDTH * TILE_SIZE)
-        y = 0
-    elif side == 1:  # Right
-        x = MAP_WIDTH * TILE_SIZE
-        y = random.randint(0, MAP_HEIGHT * TILE_SIZE)
-    elif side == 2:  # Bottom
-        x = random.randint(0, MAP_WIDTH * TILE_SIZE)
-        y = MAP_HEIGHT * TILE_SIZE
-    else:  # Left
-        x = 0
-        y = random.randint(0, MAP_HEIGHT * TILE_SIZE)
+        # - XP bar
+        queue.add(HUD, bar_surface(200, 20, bar_fill(200, player.xp / player.xp_to_level), BLUE, (100, 100, 100)),
+                  (10, 40))
+        text = text_cache.render(f"Level: {player.level} - XP: {player.xp}/{player.xp_to_level}", 24, WHITE)
+        queue.add(HUD, text, (20, 42))
 
-    enemy_type = random.randint(0, 4)
-    return Enemy(x, y, enemy_type)
+        # - Ability cooldowns, or the time left of an active effect
+        cooldown_y = 70
+        for i, (ability, cooldown, duration, max_cooldown) in enumerate(zip(
+                ABILITIES, player.cooldowns.tolist(), player.durations.tolist(), player.max_cooldowns.tolist())):
+            ability_text = ABILITY_LABELS[i]
+            if duration > 0:
+                cooldown_percent = duration / ability["duration"]
+                color = YELLOW
+                ability_text += f" ({duration})"
+            else:
+                cooldown_percent = 1 - (cooldown / max_cooldown)
+                color = (0, 200, 200)
 
-def main():
-    # Game setup
+            queue.add(HUD, bar_surface(200, 20, bar_fill(200, cooldown_percent), color, (50, 50, 50)),
+                      (10, cooldown_y + i * 30))
+            queue.add(HUD, text_cache.render(ability_text, 24, WHITE), (20, cooldown_y + i * 30 + 2))
+            queue.add(HUD, text_cache.render(ABILITY_KEY_LABELS[i], 24, WHITE), (180, cooldown_y + i * 30 + 2))
+        queue.flush(window, drawn)
+
+        # Frame profiler overlay (F3)
+        if self.profiler.show_overlay:
+            rect = self.profiler.draw_overlay(window)
+            if drawn is not None:
+                drawn.append(rect)
+        self.profiler.mark("hud")
+        return None if dirty is None else dirty.end(drawn)
+
+    def draw_game_over(self, window):
+        # Display game over screen
+        window.fill(BLACK)
+        
+        # Calculate hero position and fade effect
+        current_time = pygame.time.get_ticks()
+        fall_distance = min(150, current_time - self.game_over_start_time) / 1.5
+        fall_alpha = max(0, 255 - fall_distance)
+        
+        # Create a fading hero sprite
+        falling_hero = assets.get("hero").copy()
+        falling_hero.set_alpha(int(fall_alpha))
+        
+        # Center message
+        message = "Happiest of birthdays, Johann!"
+        message_text = text_cache.render(message, 48, WHITE)
+        message_y = HEIGHT//2 - 40
+        
+        # Create skull sprite above the message
+        skull_size = 80
+        skull = pygame.Surface((skull_size, skull_size), pygame.SRCALPHA)
+        
+        # Draw skull - white circle for head
+        pygame.draw.circle(skull, WHITE, (skull_size//2, skull_size//2), skull_size//2)
+        
+        # Draw eye sockets - black circles
+        eye_radius = skull_size//6
+        pygame.draw.circle(skull, BLACK, (skull_size//3, skull_size//3), eye_radius)
+        pygame.draw.circle(skull, BLACK, (2*skull_size//3, skull_size//3), eye_radius)
+        
+        # Draw nose - triangle
+        nose_points = [(skull_size//2, skull_size//2), 
+                      (skull_size//2 - skull_size//8, 2*skull_size//3),
+                      (skull_size//2 + skull_size//8, 2*skull_size//3)]
+        pygame.draw.polygon(skull, BLACK, nose_points)
+        
+        # Draw mouth - curved line
+        for i in range(5):
+            x_offset = (i - 2) * (skull_size//6)
+            y_pos = 3*skull_size//4 + abs(x_offset)//2
+            pygame.draw.circle(skull, BLACK, (skull_size//2 + x_offset, y_pos), skull_size//20)
+        
+        # Display skull above the message
+        skull_y = message_y - skull_size - 20
+        window.blit(skull, (WIDTH//2 - skull_size//2, skull_y))
+        
+        # Draw message
+        window.blit(message_text, (WIDTH//2 - message_text.get_width()//2, message_y))
+        
+        # Draw falling hero just below the message
+        window.blit(falling_hero, (WIDTH//2 - falling_hero.get_width()//2, message_y + message_text.get_height() + 20 + fall_distance))
+        
+        # Draw additional text
+        text = text_cache.render("Better luck next time!", 36, WHITE)
+        window.blit(text, (WIDTH//2 - text.get_width()//2, HEIGHT - 80))
+        
+        text = text_cache.render("Press R to restart", 24, WHITE)
+        window.blit(text, (WIDTH//2 - text.get_width()//2, HEIGHT - 40))
+
+def load_snapshot(path, profiler=None):
+    with open(path, "rb") as f:
+        return Game.restore(f.read(), profiler)
+
+def save_snapshot(game, path):
+    with open(path, "wb") as f:
+        f.write(game.snapshot())
+
+def run_window(profile_out=None, infinite=False, seed=None, record=None, snapshot_in=None, snapshot_out=None,
+               waves=WAVES, spawn_budget=8, dirty_rects=False):
     clock = pygame.time.Clock()
-    player = Player(WIDTH // 2, HEIGHT // 2)
-    enemies = []
-    projectiles = []
-    cakes = []  # Renamed from xp_orbs to cakes
-    spawn_timer = 0
-    camera_x, camera_y = 0, 0
-    game_over = False
-    game_over_start_time = 0
-
-    # Create office tile grid
-    office_tiles = []
-    for y in range(MAP_HEIGHT):
-        for x in range(MAP_WIDTH):
-            # Create floor tiles (placeholder, could be replaced with actual sprites)
-            tile_type = random.randint(0, 2)  # 0: Empty, 1: Desk, 2: Chair
-            if tile_type > 0:
-                office_tiles.append((x * TILE_SIZE, y * TILE_SIZE, tile_type))
+    profiler = FrameProfiler()
+    dirty = DirtyRects() if dirty_rects else None  # Only flip the regions that changed
+    if snapshot_in:
+        game = load_snapshot(snapshot_in, profiler)
+        infinite = game.infinite
+    else:
+        game = Game(profiler, infinite, seed=seed, waves=waves, spawn_budget=spawn_budget)
+    log = InputLog(game.seed, infinite) if record else None
+    quick_save = None  # F5 stores a snapshot in memory, F9 rewinds to it
 
     # Game loop
     running = True
     while running:
         # Event handling
+        profiler.begin_frame()
+        abilities = []
         for event in pygame.event.get():
             if event.type == QUIT:
                 running = False
             elif event.type == KEYDOWN:
                 if event.key == K_ESCAPE:
                     running = False
+                elif event.key == K_F3:
+                    profiler.show_overlay = not profiler.show_overlay
+                elif event.key == K_F5:
+                    quick_save = game.snapshot()
+                elif event.key == K_F9 and quick_save:
+                    game = Game.restore(quick_save, profiler)
+                    if dirty:
+                        dirty.invalidate()
+                    if log is not None:
+                        print("Input recording stopped: the game was rewound")
+                        log = None
+                    continue
                 # Only handle ability inputs if not game over
-                if not game_over:
-                    if event.key == K_j:
-                        player.use_ability("lightning", enemies, projectiles)
-                    elif event.key == K_k:
-                        player.use_ability("magic_missile", enemies, projectiles)
-                    elif event.key == K_l:
-                        player.use_ability("fire_cone", enemies, projectiles)
-                    elif event.key == K_i:
-                        player.use_ability("speed_burst", enemies, projectiles)
+                if not game.game_over:
+                    if event.key in ABILITY_KEYS:
+                        abilities.append(ABILITY_KEYS[event.key])
                 # Restart on R key if game over
                 elif event.key == K_r:
-                    main()  # Restart game
-                    return
-
-        if game_over:
-            # Display game over screen
-            window.fill(BLACK)
-            
-            # Calculate hero position and fade effect
-            current_time = pygame.time.get_ticks()
-            fall_distance = min(150, current_time - game_over_start_time) / 1.5
-            fall_alpha = max(0, 255 - fall_distance)
-            
-            # Create a fading hero sprite
-            falling_hero = hero_img.copy()
-            falling_hero.set_alpha(int(fall_alpha))
-            
-            # Center message
-            font = pygame.font.SysFont(None, 48)
-            message = "Happiest of birthdays, Johann!"
-            message_text = font.render(message, True, WHITE)
-            message_y = HEIGHT//2 - 40
-            
-            # Create skull sprite above the message
-            skull_size = 80
-            skull = pygame.Surface((skull_size, skull_size), pygame.SRCALPHA)
-            
-            # Draw skull - white circle for head
-            pygame.draw.circle(skull, WHITE, (skull_size//2, skull_size//2), skull_size//2)
-            
-            # Draw eye sockets - black circles
-            eye_radius = skull_size//6
-            pygame.draw.circle(skull, BLACK, (skull_size//3, skull_size//3), eye_radius)
-            pygame.draw.circle(skull, BLACK, (2*skull_size//3, skull_size//3), eye_radius)
-            
-            # Draw nose - triangle
-            nose_points = [(skull_size//2, skull_size//2), 
-                          (skull_size//2 - skull_size//8, 2*skull_size//3),
-                          (skull_size//2 + skull_size//8, 2*skull_size//3)]
-            pygame.draw.polygon(skull, BLACK, nose_points)
-            
-            # Draw mouth - curved line
-            for i in range(5):
-                x_offset = (i - 2) * (skull_size//6)
-                y_pos = 3*skull_size//4 + abs(x_offset)//2
-                pygame.draw.circle(skull, BLACK, (skull_size//2 + x_offset, y_pos), skull_size//20)
-            
-            # Display skull above the message
-            skull_y = message_y - skull_size - 20
-            window.blit(skull, (WIDTH//2 - skull_size//2, skull_y))
-            
-            # Draw message
-            window.blit(message_text, (WIDTH//2 - message_text.get_width()//2, message_y))
-            
-            # Draw falling hero just below the message
-            window.blit(falling_hero, (WIDTH//2 - falling_hero.get_width()//2, message_y + message_text.get_height() + 20 + fall_distance))
-            
-            # Draw additional text
-            font = pygame.font.SysFont(None, 36)
-            text = font.render("Better luck next time!", True, WHITE)
-            window.blit(text, (WIDTH//2 - text.get_width()//2, HEIGHT - 80))
-            
-            font = pygame.font.SysFont(None, 24)
-            text = font.render("Press R to restart", True, WHITE)
-            window.blit(text, (WIDTH//2 - text.get_width()//2, HEIGHT - 40))
-            
+                    game = Game(profiler, infinite, waves=waves, spawn_budget=spawn_budget)  # Restart game
+                    if record:
+                        log = InputLog(game.seed, infinite)
+
+        if game.game_over:
+            game.draw_game_over(window)
             pygame.display.update()
+            if dirty:
+                dirty.invalidate()
             clock.tick(60)
             continue
 
@@ -553,177 +831,158 @@ def main():
             dx = -1
         if keys[K_d]:
             dx = 1
+        if log is not None:
+            # Play exactly what the log will replay
+            dx, dy, abilities = log.record(dx, dy, abilities)
 
-        # Normalize diagonal movement
-        if dx != 0 and dy != 0:
-            dx *= 0.7071  # 1/sqrt(2)
-            dy *= 0.7071
+        profiler.mark("input")
 
-        player.move(dx, dy)
+        game.step(dx, dy, abilities)
+        rects = game.draw(window, dirty)
 
-        # Update camera position to follow player smoothly
-        target_camera_x = player.x - WIDTH // 2
-        target_camera_y = player.y - HEIGHT // 2
-
-        # Camera bounds
-        target_camera_x = max(0, min(target_camera_x, MAP_WIDTH * TILE_SIZE - WIDTH))
-        target_camera_y = max(0, min(target_camera_y, MAP_HEIGHT * TILE_SIZE - HEIGHT))
-
-        # Smooth camera movement
-        camera_x += (target_camera_x - camera_x) * CAMERA_SPEED
-        camera_y += (target_camera_y - camera_y) * CAMERA_SPEED
-
-        # Update game objects
-        player.update()
-
-        # Enemy spawning
-        spawn_timer -= 1
-        if spawn_timer <= 0:
-            enemies.append(spawn_enemy(player))
-            spawn_timer = 60  # Spawn enemy every 60 frames
-
-        # Update enemies
-        for enemy in enemies[:]:
-            enemy.update(player)
-
-            # Check collision with player
-            if enemy.rect.colliderect(player.rect):
-                player.health -= 1
-
-                # Check for game over
-                if player.health <= 0:
-                    game_over = True
-                    game_over_start_time = pygame.time.get_ticks()
-
-        # Update projectiles
-        for proj in projectiles[:]:
-            if proj.update():
-                projectiles.remove(proj)
-                continue
-
-            # Check collision with enemies
-            for enemy in enemies[:]:
-                if proj.rect.colliderect(enemy.rect):
-                    enemy.health -= proj.damage
-
-                    # Remove dead enemies and drop cake
-                    if enemy.health <= 0:
-                        cakes.append(Cake(enemy.x, enemy.y))
-                        enemies.remove(enemy)
-
-                    # Remove projectile after hitting an enemy (except for fire cone)
-                    if not isinstance(proj, FireCone):
-                        if proj in projectiles:
-                            projectiles.remove(proj)
-                        break
-
-        # Update cakes
-        for cake in cakes[:]:
-            cake.update()
-
-            # Check collision with player
-            if cake.rect.colliderect(player.rect):
-                player.gain_xp(cake.value)
-                cakes.remove(cake)
-
-        # Drawing
-        window.fill((0, 0, 0))  # Black background for terminal theme
-
-        # Draw office tiles (terminal style)
-        for tile_x, tile_y, tile_type in office_tiles:
-            if (tile_x + TILE_SIZE > camera_x and 
-                tile_x < camera_x + WIDTH and 
-                tile_y + TILE_SIZE > camera_y and 
-                tile_y < camera_y + HEIGHT):
-
-                if tile_type == 1:  # Terminal window
-                    pygame.draw.rect(window, (30, 30, 30), (tile_x - camera_x, tile_y - camera_y, TILE_SIZE, TILE_SIZE))
-                    pygame.draw.rect(window, (0, 100, 0), (tile_x - camera_x, tile_y - camera_y, TILE_SIZE, TILE_SIZE), 1)
-                elif tile_type == 2:  # Command prompt
-                    pygame.draw.rect(window, (20, 20, 20), (tile_x - camera_x, tile_y - camera_y, TILE_SIZE, TILE_SIZE))
-                    pygame.draw.rect(window, (0, 150, 0), (tile_x - camera_x, tile_y - camera_y, TILE_SIZE, TILE_SIZE), 1)
-
-                    # Add text cursor effect
-                    if random.random() < 0.3:  # Only some tiles get the cursor
-                        cursor_x = tile_x - camera_x + random.randint(5, TILE_SIZE - 10)
-                        cursor_y = tile_y - camera_y + random.randint(5, TILE_SIZE - 10)
-                        pygame.draw.rect(window, (0, 255, 0), (cursor_x, cursor_y, 5, 2))
-
-        # Draw terminal-style grid lines
-        for x in range(0, MAP_WIDTH * TILE_SIZE, TILE_SIZE):
-            pygame.draw.line(window, (0, 80, 0), (x - camera_x, 0), (x - camera_x, HEIGHT))
-        for y in range(0, MAP_HEIGHT * TILE_SIZE, TILE_SIZE):
-            pygame.draw.line(window, (0, 80, 0), (0, y - camera_y), (WIDTH, y - camera_y))
-
-        # Add some terminal effects - random dots of green text
-        for _ in range(20):
-            x = random.randint(0, WIDTH)
-            y = random.randint(0, HEIGHT)
-            pygame.draw.rect(window, (0, 200, 0), (x, y, 2, 2))
-
-        # Draw cakes
-        for cake in cakes:
-            cake.draw(window, camera_x, camera_y)
-
-        # Draw projectiles
-        for proj in projectiles:
-            proj.draw(window, camera_x, camera_y)
-
-        # Draw enemies
-        for enemy in enemies:
-            enemy.draw(window, camera_x, camera_y)
-
-        # Draw player
-        player.draw(window, camera_x, camera_y)
-
-        # Draw UI
-        # - Health bar
-        pygame.draw.rect(window, RED, (10, 10, 200, 20))
-        pygame.draw.rect(window, GREEN, (10, 10, 200 * (player.health / player.max_health), 20))
-        font = pygame.font.SysFont(None, 24)
-        text = font.render(f"Health: {player.health}/{player.max_health}", True, WHITE)
-        window.blit(text, (20, 12))
-
-        # - XP bar
-        pygame.draw.rect(window, (100, 100, 100), (10, 40, 200, 20))
-        pygame.draw.rect(window, BLUE, (10, 40, 200 * (player.xp / player.xp_to_level), 20))
-        text = font.render(f"Level: {player.level} - XP: {player.xp}/{player.xp_to_level}", True, WHITE)
-        window.blit(text, (20, 42))
-
-        # - Ability cooldowns
-        cooldown_y = 70
-        for i, (ability_name, ability) in enumerate(player.abilities.items()):
-            pygame.draw.rect(window, (50, 50, 50), (10, cooldown_y + i * 30, 200, 20))
-
-            # Calculate cooldown percentage
-            if ability_name == "speed_burst" and ability["active"]:
-                # Show duration for active speed burst
-                cooldown_percent = ability["duration"] / ability["max_duration"]
-                color = YELLOW
-            else:
-                # Show cooldown for other abilities
-                cooldown_percent = 1 - (ability["cooldown"] / ability["max_cooldown"])
-                color = (0, 200, 200)
-
-            pygame.draw.rect(window, color, (10, cooldown_y + i * 30, 200 * cooldown_percent, 20))
-
-            # Ability text
-            ability_text = ability_name.replace("_", " ").title()
-            if ability_name == "speed_burst" and ability["active"]:
-                ability_text += f" ({ability['duration']})"
-            text = font.render(ability_text, True, WHITE)
-            window.blit(text, (20, cooldown_y + i * 30 + 2))
-
-            # Ability key
-            key_map = {"lightning": "J", "magic_missile": "K", "fire_cone": "L", "speed_burst": "I"}
-            key_text = font.render(key_map[ability_name], True, WHITE)
-            window.blit(key_text, (180, cooldown_y + i * 30 + 2))
-
-        pygame.display.update()
+        if rects is None:
+            pygame.display.update()
+        else:
+            pygame.display.update(rects)
+        profiler.mark("display")
+        profiler.end_frame(*game.counts())
         clock.tick(60)
 
+    if profile_out:
+        profiler.dump(profile_out)
+    if log is not None:
+        log.state_hash = game.state_hash()
+        log.save(record)
+    if snapshot_out:
+        save_snapshot(game, snapshot_out)
     pygame.quit()
     sys.exit()
 
+def scripted_input(seed=None):
+    """Endless stream of (dx, dy, abilities) from a simple bot that wanders and casts whenever it can"""
+    rng = random.Random(seed)
+    dx, dy = 0, 0
+    tick = 0
+    while True:
+        if tick % 30 == 0:  # Pick a new direction twice a second
+            dx, dy = rng.randint(-1, 1), rng.randint(-1, 1)
+        abilities = [name for name in ABILITY_KEYS.values() if rng.random() < 0.1]
+        yield dx, dy, abilities
+        tick += 1
+
+def run_headless(ticks, seed=None, profile_out=None, infinite=False, record=None, snapshot_in=None, snapshot_out=None,
+                 waves=WAVES, spawn_budget=8):
+    """Step the game `ticks` times as fast as possible and report throughput.
+
+    With `record` the inputs of the last game played are saved there as an input log.
+    The first game can be resumed from a snapshot file, and the last one saved to one.
+    """
+    seeds = random.Random(seed)  # Seeds each game, so a run is reproducible from `seed`
+    inputs = scripted_input(seed)
+    profiler = FrameProfiler()
+    if snapshot_in:
+        game = load_snapshot(snapshot_in, profiler)
+        infinite = game.infinite
+    else:
+        game = Game(profiler, infinite, seed=seeds.getrandbits(32), waves=waves, spawn_budget=spawn_budget)
+    log = InputLog(game.seed, infinite) if record else None
+    deaths = 0
+    max_enemies = 0
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        if game.game_over:
+            deaths += 1
+            game = Game(profiler, infinite, seed=seeds.getrandbits(32), waves=waves, spawn_budget=spawn_budget)
+            if record:
+                log = InputLog(game.seed, infinite)
+        profiler.begin_frame()
+        dx, dy, abilities = next(inputs)
+        if log is not None:
+            dx, dy, abilities = log.record(dx, dy, abilities)
+        game.step(dx, dy, abilities)
+        profiler.end_frame(*game.counts())
+        max_enemies = max(max_enemies, len(game.enemies))
+    elapsed = time.perf_counter() - start
+
+    if profile_out:
+        profiler.dump(profile_out)
+    if log is not None:
+        log.state_hash = game.state_hash()
+        log.save(record)
+    if snapshot_out:
+        save_snapshot(game, snapshot_out)
+    print(f"{ticks} ticks ({ticks / 3600:.1f} simulated minutes) in {elapsed:.2f}s: "
+          f"{ticks / elapsed:.0f} ticks/s, {deaths} deaths, peak {max_enemies} enemies")
+    return game
+
+def run_replay(path, render=False, profile_out=None, waves=WAVES, spawn_budget=8, dirty_rects=False):
+    """Re-run an input log as fast as possible and check it ends in the recorded state.
+
+    Returns True if the final state hash matches. With `render` every tick is also
+    drawn, still without a frame limit. The log does not store the wave table, so
+    `waves` and `spawn_budget` must match the recording.
+    """
+    log = InputLog.load(path)
+    profiler = FrameProfiler()
+    game = Game(profiler, log.infinite, seed=log.seed, waves=waves, spawn_budget=spawn_budget)
+    dirty = DirtyRects() if dirty_rects else None
+
+    start = time.perf_counter()
+    for dx, dy, abilities in log:
+        profiler.begin_frame()
+        game.step(dx, dy, abilities)
+        if render:
+            rects = game.draw(window, dirty)
+            if rects is None:
+                pygame.display.update()
+            else:
+                pygame.display.update(rects)
+            pygame.event.pump()
+            profiler.mark("display")
+        profiler.end_frame(*game.counts())
+    elapsed = time.perf_counter() - start
+
+    if profile_out:
+        profiler.dump(profile_out)
+    matches = game.state_hash() == log.state_hash
+    print(f"Replayed {len(log)} ticks in {elapsed:.2f}s: {len(log) / elapsed:.0f} ticks/s, "
+          f"final state {'matches' if matches else 'DOES NOT match'} the recording")
+    return matches
+
+def main():
+    parser = argparse.ArgumentParser(description="Johann's Office Survival")
+    parser.add_argument("--headless", action="store_true", help="run the simulation without a display or frame limit")
+    parser.add_argument("--ticks", type=int, default=60 * 60 * 10, help="ticks to simulate in headless mode")
+    parser.add_argument("--seed", type=int, help="random seed for the game")
+    parser.add_argument("--infinite", action="store_true", help="play on an unbounded map streamed in chunks")
+    parser.add_argument("--record", metavar="PATH", help="save the inputs of the last game played to an input log")
+    parser.add_argument("--replay", metavar="PATH", help="re-run an input log at full speed and verify its final state")
+    parser.add_argument("--render", action="store_true", help="draw the game while replaying")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="redraw and update only the screen regions that changed each frame")
+    parser.add_argument("--snapshot-in", metavar="PATH", help="start from a saved game snapshot")
+    parser.add_argument("--snapshot-out", metavar="PATH", help="save a snapshot of the game at exit")
+    parser.add_argument("--waves", metavar="PATH", help="load the enemy wave table from a JSON file")
+    parser.add_argument("--spawn-budget", type=int, default=8, help="most enemies spawned in one tick")
+    parser.add_argument("--profile-out", help="write per-phase frame timings to this .csv or .json file at exit")
+    args = parser.parse_args()
+    if args.record and args.snapshot_in:
+        parser.error("--record replays from a fresh game and cannot start from --snapshot-in")
+    waves = load_waves(args.waves) if args.waves else WAVES
+
+    if args.replay:
+        init_display(headless=not args.render)
+        sys.exit(0 if run_replay(args.replay, args.render, args.profile_out, waves, args.spawn_budget,
+                                 args.dirty_rects) else 1)
+
+    init_display(headless=args.headless)
+    if args.headless:
+        run_headless(args.ticks, args.seed, args.profile_out, args.infinite, args.record, args.snapshot_in, args.snapshot_out,
+                     waves, args.spawn_budget)
+    else:
+        run_window(args.profile_out, args.infinite, args.seed, args.record, args.snapshot_in, args.snapshot_out,
+                   waves, args.spawn_budget, args.dirty_rects)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,119 @@
+import hashlib
+import os
+import struct
+
+import pygame
+
+# Sprite table: name -> (path, size in tiles, rotation in degrees, placeholder size, placeholder colour)
+SPRITES = {
+    "hero": ("assets/sprites/hero-johann.png", (1, 1), 0, (32, 32), (0, 0, 255)),
+    "mob_ariel": ("assets/sprites/mob-ariel.png", (1, 1), 0, (32, 32), (255, 0, 0)),
+    "mob_john": ("assets/sprites/mob-john.png", (1, 1), 0, (32, 32), (255, 0, 0)),
+    "mob_kirtik": ("assets/sprites/mob-kirtik.png", (1, 1), 0, (32, 32), (255, 0, 0)),
+    "mob_margaret": ("assets/sprites/mob-margaret.png", (1, 1), 0, (32, 32), (255, 0, 0)),
+    "mob_tim": ("assets/sprites/mob-tim.png", (1, 1), 0, (32, 32), (255, 0, 0)),
+    # Lightning should be as long as 6 tiles, then rotated 90 degrees
+    "lightning": ("assets/sprites/lightning-sprite.png", (1, 6), 90, (50, 10), (255, 255, 0)),
+    # Magic missile should be only one tile large
+    "magic_missile": ("assets/sprites/magic-missile-sprite.png", (1, 1), 0, (10, 10), (0, 255, 255)),
+    # Fire cone should be the width of roughly 5 tiles
+    "fire_cone": ("assets/sprites/fire-cone-sprite.png", (5, 5), 0, (50, 50), (255, 165, 0)),
+}
+
+CACHE_DIR = os.path.join(".cache", "sprites")
+CACHE_HEADER = struct.Struct("<II")  # width, height of the raw RGBA pixels that follow
+
+def placeholder(name):
+    """Flat-coloured stand-in for a sprite that could not be loaded"""
+    size, color = SPRITES[name][3:]
+    surface = pygame.Surface(size)
+    surface.fill(color)
+    return surface
+
+class AssetManager:
+    """Load sprites on first use, scaled to the tile size.
+
+    The scaled and rotated pixels are written to a raw RGBA cache keyed by a hash
+    of the source PNG and the transform, so warm starts skip both the PNG decode
+    and `pygame.transform`. Procedural sprites can be registered as factories.
+    """
+    def __init__(self, tile_size, sprites=SPRITES, cache_dir=CACHE_DIR):
+        self.tile_size = tile_size
+        self.sprites = sprites
+        self.cache_dir = cache_dir
+        self.factories = {}
+        self.images = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def register_factory(self, name, factory):
+        self.factories[name] = factory
+
+    def get(self, name):
+        image = self.images.get(name)
+        if image is None:
+            if name in self.factories:
+                image = self.factories[name]()
+            else:
+                image = self.load(name)
+            self.images[name] = image
+        return image
+
+    def load(self, name):
+        path, (tiles_wide, tiles_high), angle = self.sprites[name][:3]
+        size = (tiles_wide * self.tile_size, tiles_high * self.tile_size)
+        try:
+            with open(path, "rb") as f:
+                source = f.read()
+        except OSError:
+            print(f"Warning: Unable to load {path}. Using placeholder graphics.")
+            return self.transform(placeholder(name), size, angle)
+
+        key = hashlib.sha1(source + repr((size, angle)).encode()).hexdigest()[:16]
+        cache_path = os.path.join(self.cache_dir, f"{name}-{key}.raw")
+        image = self.read_cache(cache_path)
+        if image is not None:
+            self.cache_hits += 1
+            return self.finish(image)
+
+        self.cache_misses += 1
+        try:
+            image = pygame.image.load(path)
+        except pygame.error:
+            print(f"Warning: Unable to load {path}. Using placeholder graphics.")
+            return self.transform(placeholder(name), size, angle)
+        image = self.transform(image.convert_alpha() if pygame.display.get_surface() else image, size, angle)
+        self.write_cache(cache_path, image)
+        return image
+
+    def transform(self, image, size, angle):
+        image = pygame.transform.scale(image, size)
+        if angle:
+            image = pygame.transform.rotate(image, angle)
+        return image
+
+    def finish(self, image):
+        # Match the display's pixel format when there is one, for fast blits
+        if pygame.display.get_surface():
+            return image.convert_alpha()
+        return image
+
+    def read_cache(self, cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                data = f.read()
+            width, height = CACHE_HEADER.unpack_from(data)
+            return pygame.image.frombuffer(data[CACHE_HEADER.size:], (width, height), "RGBA")
+        except (OSError, struct.error, ValueError):
+            return None
+
+    def write_cache(self, cache_path, image):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = cache_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(CACHE_HEADER.pack(*image.get_size()))
+                f.write(pygame.image.tostring(image, "RGBA"))
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass  # The cache is only an optimisation
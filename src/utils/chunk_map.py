@@ -0,0 +1,129 @@
+import random
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+from utils.map_layer import draw_cursor_effects, draw_grid_lines, draw_tiles
+from utils.tile_grid import CHAIR, DESK, TileGrid
+
+# Unbounded office map, generated chunk by chunk from a seed
+
+class Chunk:
+    """Tile types for one `size` x `size` block of the map"""
+    __slots__ = ("cx", "cy", "grid", "prompt_tiles")
+
+    def __init__(self, cx, cy, grid, prompt_tiles):
+        self.cx = cx
+        self.cy = cy
+        self.grid = grid  # TileGrid in chunk-local coordinates
+        self.prompt_tiles = prompt_tiles  # (x, y, type) map pixel positions of the command prompt tiles
+
+class ChunkMap:
+    """Infinite office map streamed in chunks around the camera.
+
+    Chunks are generated on demand from the map seed and the chunk coordinates, so
+    an evicted chunk comes back identical. Both the tile data and the baked chunk
+    surfaces are kept in LRU caches, which bounds memory however far the player
+    walks. Tile lookups are a dict hit plus an index into the chunk.
+    """
+    def __init__(self, seed, tile_size, chunk_size=8, max_chunks=1024, max_surfaces=32):
+        self.seed = seed
+        self.tile_size = tile_size
+        self.chunk_size = chunk_size  # in tiles
+        self.chunk_pixels = chunk_size * tile_size
+        self.max_chunks = max_chunks
+        self.max_surfaces = max_surfaces
+        self.chunks = OrderedDict()  # (cx, cy) -> Chunk, least recently used first
+        self.surfaces = OrderedDict()  # (cx, cy) -> baked Surface
+        self.generated = 0
+
+    def generate(self, cx, cy):
+        # Same tile mix as create_office_tiles, from a stream that only depends on the seed and position
+        rng = random.Random(f"{self.seed}:{cx}:{cy}")
+        size = self.chunk_size
+        grid = TileGrid(size, size, self.tile_size, bytearray(rng.randint(0, 2) for _ in range(size * size)))
+        left = cx * self.chunk_pixels
+        top = cy * self.chunk_pixels
+        prompt_tiles = [(left + x, top + y, tile_type) for x, y, tile_type in grid if tile_type == CHAIR]
+        self.generated += 1
+        return Chunk(cx, cy, grid, prompt_tiles)
+
+    def chunk(self, cx, cy):
+        key = (cx, cy)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = self.generate(cx, cy)
+            if len(self.chunks) > self.max_chunks:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(key)
+        return chunk
+
+    def tile_at(self, tile_x, tile_y):
+        """Return the tile type at tile coordinates (`tile_x`, `tile_y`)"""
+        size = self.chunk_size
+        cx, local_x = divmod(tile_x, size)
+        cy, local_y = divmod(tile_y, size)
+        return self.chunk(cx, cy).grid.tile_at(local_x, local_y)
+
+    def visible_chunks(self, camera_x, camera_y, width, height, margin=0):
+        """Chunk coordinates overlapping the viewport grown by `margin` pixels"""
+        pixels = self.chunk_pixels
+        cx0 = int((camera_x - margin) // pixels)
+        cy0 = int((camera_y - margin) // pixels)
+        cx1 = int((camera_x + width + margin - 1) // pixels)
+        cy1 = int((camera_y + height + margin - 1) // pixels)
+        return [(cx, cy) for cy in range(cy0, cy1 + 1) for cx in range(cx0, cx1 + 1)]
+
+    def prefetch(self, camera_x, camera_y, width, height):
+        """Generate the chunks within one chunk of the viewport before they scroll into view"""
+        for cx, cy in self.visible_chunks(camera_x, camera_y, width, height, self.chunk_pixels):
+            self.chunk(cx, cy)
+
+    def blocked(self, tile_x, tile_y, cols, rows, obstacle_types=(DESK,)):
+        """Boolean (rows, cols) grid of obstacle tiles starting at tile (`tile_x`, `tile_y`)"""
+        size = self.chunk_size
+        types = np.zeros((rows, cols), dtype=np.uint8)
+        cx0, cx1 = tile_x // size, (tile_x + cols - 1) // size
+        cy0, cy1 = tile_y // size, (tile_y + rows - 1) // size
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                tiles = self.chunk(cx, cy).grid.array
+                # Overlap of this chunk with the requested window, in window coordinates
+                x0 = max(cx * size - tile_x, 0)
+                y0 = max(cy * size - tile_y, 0)
+                x1 = min((cx + 1) * size - tile_x, cols)
+                y1 = min((cy + 1) * size - tile_y, rows)
+                types[y0:y1, x0:x1] = tiles[y0 + tile_y - cy * size:y1 + tile_y - cy * size,
+                                            x0 + tile_x - cx * size:x1 + tile_x - cx * size]
+        return np.isin(types, obstacle_types)
+
+    def surface(self, cx, cy):
+        key = (cx, cy)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+
+        surface = pygame.Surface((self.chunk_pixels, self.chunk_pixels)).convert()
+        surface.fill((0, 0, 0))  # Black background for terminal theme
+        draw_tiles(surface, self.chunk(cx, cy).grid, self.tile_size)
+        draw_grid_lines(surface, self.tile_size)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_surfaces:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def draw(self, window, camera_x, camera_y):
+        """Blit the chunks under the camera, baking any that are not cached"""
+        pixels = self.chunk_pixels
+        for cx, cy in self.visible_chunks(camera_x, camera_y, window.get_width(), window.get_height()):
+            window.blit(self.surface(cx, cy), (cx * pixels - camera_x, cy * pixels - camera_y))
+
+    def draw_effects(self, window, camera_x, camera_y, step=0):
+        """Draw the terminal effects of effect `step` over the visible chunks and return their rects"""
+        prompt_tiles = []
+        for cx, cy in self.visible_chunks(camera_x, camera_y, window.get_width(), window.get_height()):
+            prompt_tiles += self.chunk(cx, cy).prompt_tiles
+        return draw_cursor_effects(window, prompt_tiles, camera_x, camera_y, self.tile_size, step)
@@ -0,0 +1,64 @@
+import pygame
+
+# Partial screen updates: redraw and flip only the regions that changed since the last frame
+
+class DirtyRects:
+    """Cached background plus the screen rects drawn over it, for `display.update(rects)`.
+
+    Each frame `begin` wipes last frame's sprites by copying the background back over
+    their rects, the caller draws and hands the rects it drew to `end`, which returns
+    the old and new rects together: everything that changed on screen. The background
+    (map and terminal effects) is only redrawn when the effect step changes. A new
+    camera pixel offset redraws it all and makes `end` return None, meaning update
+    the whole window. So does a crowded frame whose rects add up to more than
+    `max_fraction` of the window, where one big update beats many overlapping ones.
+    """
+    def __init__(self, max_fraction=0.5):
+        self.max_fraction = max_fraction
+        self.background = None
+        self.camera = None  # Integer camera offset the background was drawn for
+        self.step = None  # Terminal effect step the background was drawn for
+        self.background_rects = []  # Effect rects on the background, redrawn when the step changes
+        self.previous = []  # Rects drawn over the background last frame
+        self.rects = []
+        self.full = True
+
+    def invalidate(self):
+        """Forget the window contents, e.g. after something else drew over it"""
+        self.camera = None
+
+    def begin(self, window, camera_x, camera_y, step, draw_background):
+        """Restore the window under last frame's sprites.
+
+        `draw_background(surface)` paints the map and effects for the current
+        camera and effect `step` and returns the effect rects.
+        """
+        if self.background is None or self.background.get_size() != window.get_size():
+            self.background = pygame.Surface(window.get_size()).convert()
+        background = self.background
+        camera = (int(camera_x), int(camera_y))
+        width, height = window.get_size()
+        crowded = sum(rect.width * rect.height for rect in self.previous) > self.max_fraction * width * height
+        if camera != self.camera or step != self.step:
+            old_rects = self.background_rects
+            self.background_rects = draw_background(background)
+        self.full = camera != self.camera or crowded
+        if self.full:
+            window.blit(background, (0, 0))
+            self.rects = []
+        else:
+            self.rects = self.previous
+            if step != self.step:
+                self.rects = self.rects + old_rects + self.background_rects
+            for rect in self.rects:
+                window.blit(background, rect, rect)
+        self.camera = camera
+        self.step = step
+
+    def end(self, drawn):
+        """Take the rects `drawn` over the background this frame and return the rects
+        to pass to `display.update`, or None if the whole window changed"""
+        self.previous = drawn
+        if self.full:
+            return None
+        return self.rects + drawn
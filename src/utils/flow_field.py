@@ -0,0 +1,156 @@
+import numpy as np
+
+from utils.tile_grid import DESK
+
+# 8-neighbourhood, orthogonal steps first so they win ties against diagonals
+NEIGHBOURS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+UNREACHABLE = -1
+
+def blocked_tiles(tile_grid, obstacle_types=(DESK,)):
+    """Boolean (rows, cols) grid marking the tiles of a TileGrid enemies have to path around"""
+    return np.isin(tile_grid.array, obstacle_types)
+
+class FlowField:
+    """Shared BFS distance map towards the player's tile over a grid of obstacles.
+
+    The field is only recomputed when the target moves to another tile. Every tile
+    stores the centre pixel of the neighbouring tile one step closer to the target,
+    so an enemy finds its next waypoint with two array lookups however many enemies
+    there are. Diagonal steps may not cut the corner of an obstacle.
+    `origin` is the map tile of `blocked[0, 0]`, for fields over a window of a larger map.
+    """
+    def __init__(self, blocked, tile_size, origin=(0, 0)):
+        self.blocked = blocked
+        self.tile_size = tile_size
+        self.origin_col, self.origin_row = origin
+        self.rows, self.cols = blocked.shape
+        self.distance = np.full(blocked.shape, UNREACHABLE, dtype=np.int32)
+        # Waypoint per tile, only meaningful where `has_next` is set
+        self.next_x = np.zeros(blocked.shape)
+        self.next_y = np.zeros(blocked.shape)
+        self.has_next = np.zeros(blocked.shape, dtype=bool)
+        self.ahead_x = np.zeros(blocked.shape)  # Direction of the step, -1, 0 or 1 along each axis
+        self.ahead_y = np.zeros(blocked.shape)
+        # Centre pixel of every tile
+        self.center_x, self.center_y = np.meshgrid((np.arange(self.cols) + self.origin_col + 0.5) * tile_size,
+                                                   (np.arange(self.rows) + self.origin_row + 0.5) * tile_size)
+        self.target = None  # (column, row) the field currently leads to
+        self.rebuilds = 0
+
+        # The obstacles never move, so the legal steps between tiles are worked out once.
+        # Tiles are numbered row-major; `links[i]` are the walkable tiles one step from tile i.
+        rows, cols = self.rows, self.cols
+        outside = np.ones((rows + 2, cols + 2), dtype=bool)  # Blocked, with a blocked border around it
+        outside[1:-1, 1:-1] = blocked
+        self.links = [[] for _ in range(rows * cols)]
+        for dx, dy in NEIGHBOURS:
+            allowed = ~outside[1 + dy:1 + dy + rows, 1 + dx:1 + dx + cols]
+            if dx and dy:
+                allowed &= ~outside[1:-1, 1 + dx:1 + dx + cols] & ~outside[1 + dy:1 + dy + rows, 1:-1]
+            offset = dy * cols + dx
+            for i in np.flatnonzero(allowed).tolist():
+                self.links[i].append(i + offset)
+
+    def tile_of(self, x, y):
+        size = self.tile_size
+        return (min(max(int(x // size) - self.origin_col, 0), self.cols - 1),
+                min(max(int(y // size) - self.origin_row, 0), self.rows - 1))
+
+    def covers(self, x, y, margin):
+        """Whether pixel position (`x`, `y`) is at least `margin` tiles inside the field"""
+        col = int(x // self.tile_size) - self.origin_col
+        row = int(y // self.tile_size) - self.origin_row
+        return margin <= col < self.cols - margin and margin <= row < self.rows - margin
+
+    def update(self, x, y):
+        """Point the field at pixel position (`x`, `y`), rebuilding it if that is a new tile"""
+        target = self.tile_of(x, y)
+        if target != self.target:
+            self.target = target
+            self.rebuild()
+
+    def rebuild(self):
+        links = self.links
+        distance = [UNREACHABLE] * (self.rows * self.cols)
+        parent = [-1] * (self.rows * self.cols)  # Neighbouring tile one step closer to the target
+
+        # Breadth-first from the target; the target tile itself may be blocked (the player walks over desks)
+        target_col, target_row = self.target
+        start = target_row * self.cols + target_col
+        distance[start] = 0
+        queue = [start]
+        for i in queue:
+            step = distance[i] + 1
+            for j in links[i]:
+                if distance[j] < 0:
+                    distance[j] = step
+                    parent[j] = i
+                    queue.append(j)
+
+        shape = (self.rows, self.cols)
+        self.distance = np.array(distance, dtype=np.int32).reshape(shape)
+        parent = np.array(parent).reshape(shape)
+        self.step_off_obstacles(parent)
+        self.has_next = parent >= 0
+        self.next_x = (parent % self.cols + self.origin_col + 0.5) * self.tile_size
+        self.next_y = (parent // self.cols + self.origin_row + 0.5) * self.tile_size
+        self.ahead_x = np.where(self.has_next, np.sign(self.next_x - self.center_x), 0)
+        self.ahead_y = np.where(self.has_next, np.sign(self.next_y - self.center_y), 0)
+        self.rebuilds += 1
+
+    def step_off_obstacles(self, parent):
+        """Point unreachable obstacle tiles at their closest reachable neighbour, for enemies spawned on a desk"""
+        rows, cols = self.rows, self.cols
+        far = rows * cols  # Further than any BFS distance
+        padded = np.full((rows + 2, cols + 2), far, dtype=np.int32)
+        padded[1:-1, 1:-1] = np.where(self.distance >= 0, self.distance, far)
+        around = np.stack([padded[1 + dy:1 + dy + rows, 1 + dx:1 + dx + cols] for dx, dy in NEIGHBOURS])
+        best = around.argmin(axis=0)
+        stuck = self.blocked & (self.distance < 0) & (around.min(axis=0) < far)
+        offsets = np.array([dy * cols + dx for dx, dy in NEIGHBOURS])
+        parent[stuck] = np.flatnonzero(stuck) + offsets[best[stuck]]
+
+    def sample(self, center_x, center_y):
+        """Look up waypoints for arrays of pixel positions.
+
+        Returns (next_x, next_y, valid); positions on the target tile, outside the field
+        or with no route are not valid and should head straight for the target instead.
+        """
+        cells, inside = self.cells(center_x, center_y)
+        return (self.next_x.take(cells), self.next_y.take(cells), self.has_next.take(cells) & inside)
+
+    def steer(self, center_x, center_y):
+        """Pixel positions arrays of body centres should head for to follow the field.
+
+        Returns (target_x, target_y, valid) as `sample`. A body as large as a tile only
+        stays off obstacles while its centre travels from tile centre to tile centre,
+        so one that is not yet on the line to its waypoint, having just turned in from
+        another tile, first heads for the centre of the walkable tile it is on.
+        """
+        cells, inside = self.cells(center_x, center_y)
+        tile_x = self.center_x.take(cells)
+        tile_y = self.center_y.take(cells)
+        off_x = center_x - tile_x
+        off_y = center_y - tile_y
+        ahead_x = self.ahead_x.take(cells)
+        ahead_y = self.ahead_y.take(cells)
+        # Off to the side of the step, or short of the centre; half a pixel still rounds onto the tile
+        on_line = ((np.abs(off_x) * (ahead_x == 0) - off_x * ahead_x <= 0.5) &
+                   (np.abs(off_y) * (ahead_y == 0) - off_y * ahead_y <= 0.5))
+        recentre = ~(on_line | self.blocked.take(cells))
+        target_x = np.where(recentre, tile_x, self.next_x.take(cells))
+        target_y = np.where(recentre, tile_y, self.next_y.take(cells))
+        return target_x, target_y, self.has_next.take(cells) & inside
+
+    def cells(self, center_x, center_y):
+        """Flat indices into the field of the tiles under arrays of pixel positions, clipped onto it,
+        and whether each position is inside it"""
+        size = self.tile_size
+        cols = (center_x // size).astype(np.intp) - self.origin_col
+        rows = (center_y // size).astype(np.intp) - self.origin_row
+        inside = (cols >= 0) & (cols < self.cols) & (rows >= 0) & (rows < self.rows)
+        np.clip(cols, 0, self.cols - 1, out=cols)
+        np.clip(rows, 0, self.rows - 1, out=rows)
+        rows *= self.cols
+        rows += cols
+        return rows, inside
@@ -0,0 +1,92 @@
+import pygame
+
+from utils.tile_grid import CHAIR
+
+# Pre-rendered background for the static office map
+
+def draw_tiles(surface, office_tiles, tile_size, offset_x=0, offset_y=0):
+    """Draw (x, y, type) office tiles in terminal style, shifted by the given offset"""
+    for tile_x, tile_y, tile_type in office_tiles:
+        rect = (tile_x - offset_x, tile_y - offset_y, tile_size, tile_size)
+        if tile_type == 1:  # Terminal window
+            pygame.draw.rect(surface, (30, 30, 30), rect)
+            pygame.draw.rect(surface, (0, 100, 0), rect, 1)
+        elif tile_type == 2:  # Command prompt
+            pygame.draw.rect(surface, (20, 20, 20), rect)
+            pygame.draw.rect(surface, (0, 150, 0), rect, 1)
+
+def draw_grid_lines(surface, tile_size):
+    """Draw terminal-style grid lines over the whole surface"""
+    width, height = surface.get_size()
+    for x in range(0, width, tile_size):
+        pygame.draw.line(surface, (0, 80, 0), (x, 0), (x, height))
+    for y in range(0, height, tile_size):
+        pygame.draw.line(surface, (0, 80, 0), (0, y), (width, y))
+
+EFFECT_TICKS = 30  # The terminal effects change twice a second and hold still in between
+
+def effect_hash(*values):
+    """32-bit hash of some integers, stable across runs (unlike `hash` of a tuple)"""
+    h = 2166136261
+    for value in values:
+        h = ((h ^ (value & 0xFFFFFFFF)) * 16777619) & 0xFFFFFFFF
+    # Final avalanche so the low bits depend on every input
+    h ^= h >> 15
+    h = (h * 0x2C1B3C6D) & 0xFFFFFFFF
+    return h ^ (h >> 12)
+
+def draw_cursor_effects(window, prompt_tiles, camera_x, camera_y, tile_size, step=0):
+    """Blink a cursor on some of the given (x, y, type) command prompt tiles and scatter green dots.
+
+    Callers pass only the tiles around the viewport, from a visible-range query. What
+    is drawn depends only on the tile positions and the effect `step` (game ticks //
+    EFFECT_TICKS), so the effects stay put between steps and never touch the
+    simulation's random stream. Returns the rects drawn.
+    """
+    width, height = window.get_size()
+    rects = []
+    cursor_range = tile_size - 14  # Offsets 5 to tile_size - 10
+    for tile_x, tile_y, _ in prompt_tiles:
+        # Add text cursor effect
+        h = effect_hash(int(tile_x), int(tile_y), step)
+        if h % 10 < 3:  # Only some tiles get the cursor
+            cursor_x = tile_x - camera_x + 5 + (h >> 8) % cursor_range
+            cursor_y = tile_y - camera_y + 5 + (h >> 20) % cursor_range
+            rects.append(pygame.draw.rect(window, (0, 255, 0), (cursor_x, cursor_y, 5, 2)))
+
+    # Add some terminal effects - scattered dots of green text
+    for i in range(20):
+        h = effect_hash(i, step)
+        x = h % (width + 1)
+        y = (h >> 16) % (height + 1)
+        rects.append(pygame.draw.rect(window, (0, 200, 0), (x, y, 2, 2)))
+    return rects
+
+class MapLayer:
+    """Office tiles and grid lines baked once into a map-sized surface.
+
+    Each frame only the camera viewport is blitted from it; the terminal effects
+    are drawn on top by `draw_effects`.
+    """
+    def __init__(self, office_tiles):
+        self.office_tiles = office_tiles  # TileGrid
+        tile_size = self.tile_size = office_tiles.tile_size
+        self.surface = pygame.Surface((office_tiles.cols * tile_size, office_tiles.rows * tile_size)).convert()
+        self.surface.fill((0, 0, 0))  # Black background for terminal theme
+
+        draw_tiles(self.surface, office_tiles, tile_size)
+        draw_grid_lines(self.surface, tile_size)
+
+    def draw(self, window, camera_x, camera_y):
+        """Blit the part of the map under the camera"""
+        viewport = pygame.Rect(int(camera_x), int(camera_y), window.get_width(), window.get_height())
+        if not self.surface.get_rect().contains(viewport):
+            window.fill((0, 0, 0))
+        window.blit(self.surface, (0, 0), viewport)
+
+    def draw_effects(self, window, camera_x, camera_y, step=0):
+        """Draw the terminal effects of effect `step` over the baked map and return their rects"""
+        # Command prompt tiles get the blinking cursor overlay
+        width, height = window.get_size()
+        prompt_tiles = self.office_tiles.visible_tiles(camera_x, camera_y, width, height, CHAIR)
+        return draw_cursor_effects(window, prompt_tiles, camera_x, camera_y, self.tile_size, step)
@@ -0,0 +1,41 @@
+import numpy as np
+import pygame
+
+# Pixel-exact hit shapes. Whether a sprite's mask touches a target rect depends only on
+# their relative offset, so it is worked out once per offset with Mask.convolve and
+# looked up for many targets at once afterwards.
+
+_tables = {}
+
+def mask_array(mask):
+    """A pygame mask as a bool array indexed [x, y]"""
+    surface = mask.to_surface(setcolor=(255, 255, 255, 255), unsetcolor=(0, 0, 0, 255))
+    return pygame.surfarray.array_red(surface) > 0
+
+def overlap_tables(images, targets, exact):
+    """Whether each of `images` touches each of `targets` with their rect corners (dx, dy) apart.
+
+    Returns a bool array indexed [image, target, dx + width - 1, dy + height - 1],
+    where width and height are the largest target size, and (dx, dy) is the
+    target's corner relative to the image's. Targets count as solid rects, and so
+    do images whose `exact` flag is false; the others use their opaque pixels.
+    Built once per combination of sprites.
+    """
+    key = (tuple(images), tuple(targets), tuple(exact))
+    tables = _tables.get(key)
+    if tables is None:
+        width = max(target.get_width() for target in targets)
+        height = max(target.get_height() for target in targets)
+        shape = (max(image.get_width() for image in images) + width - 1,
+                 max(image.get_height() for image in images) + height - 1)
+        tables = np.zeros((len(images), len(targets)) + shape, dtype=bool)
+        for i, (image, is_exact) in enumerate(zip(images, exact)):
+            mask = pygame.mask.from_surface(image) if is_exact else pygame.mask.Mask(image.get_size(), fill=True)
+            for j, target in enumerate(targets):
+                # Bit (x, y) of the convolution is set when the target's bottom right corner can sit there
+                touching = mask_array(mask.convolve(pygame.mask.Mask(target.get_size(), fill=True)))
+                left = width - target.get_width()
+                top = height - target.get_height()
+                tables[i, j, left:left + touching.shape[0], top:top + touching.shape[1]] = touching
+        _tables[key] = tables
+    return tables
@@ -0,0 +1,114 @@
+import csv
+import json
+import time
+
+import numpy as np
+import pygame
+
+from utils.text_cache import text_cache
+
+# Phases of a frame, in the order they run
+PHASES = ("input", "player", "spawn", "enemies", "projectiles", "cakes", "background", "entities", "hud", "display")
+COUNTERS = ("enemies", "projectiles", "cakes", "enemies_culled", "projectiles_culled", "cakes_culled")
+PERCENTILES = (50, 95, 99)
+OVERLAY_REFRESH_FRAMES = 30
+
+class FrameProfiler:
+    """Per-phase frame timings kept in a fixed-size ring buffer.
+
+    Call `begin_frame`, then `mark(phase)` as each phase finishes: the time since
+    the previous mark is added to that phase. `end_frame` records entity counts
+    and advances the ring.
+    """
+    def __init__(self, capacity=600, phases=PHASES, counters=COUNTERS):
+        self.capacity = capacity
+        self.phases = phases
+        self.counters = counters
+        self.phase_index = {name: i for i, name in enumerate(phases)}
+        self.times = np.zeros((capacity, len(phases)))  # milliseconds
+        self.counts = np.zeros((capacity, len(counters)), dtype=np.int32)
+        self.frames = 0  # Frames recorded so far, the ring holds the last `capacity`
+        self.row = 0
+        self.last = time.perf_counter()
+        self.show_overlay = False
+        self.overlay = None
+        self.overlay_frame = 0
+
+    def begin_frame(self):
+        self.row = self.frames % self.capacity
+        self.times[self.row] = 0
+        self.last = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.times[self.row, self.phase_index[phase]] += (now - self.last) * 1000
+        self.last = now
+
+    def end_frame(self, *counts):
+        self.counts[self.row] = counts
+        self.frames += 1
+
+    def recorded(self):
+        """Return (times, counts) for the buffered frames, oldest first"""
+        if self.frames <= self.capacity:
+            return self.times[:self.frames], self.counts[:self.frames]
+        start = self.frames % self.capacity
+        order = np.r_[start:self.capacity, 0:start]
+        return self.times[order], self.counts[order]
+
+    def percentiles(self):
+        """Per-phase percentiles in ms, shaped (len(phases), len(PERCENTILES))"""
+        times = self.recorded()[0]
+        if len(times) == 0:
+            return np.zeros((len(self.phases), len(PERCENTILES)))
+        return np.percentile(times, PERCENTILES, axis=0).T
+
+    def draw_overlay(self, window):
+        # Re-render the panel a couple of times a second rather than every frame
+        if self.overlay is None or self.frames - self.overlay_frame >= OVERLAY_REFRESH_FRAMES:
+            self.overlay = self.render_overlay()
+            self.overlay_frame = self.frames
+        return window.blit(self.overlay, (window.get_width() - self.overlay.get_width() - 5, 5))
+
+    def render_overlay(self):
+        stats = self.percentiles()
+        totals = self.recorded()[0].sum(axis=1)
+        lines = ["phase       " + "".join(f"p{p:<6}" for p in PERCENTILES)]
+        for name, row in zip(self.phases, stats):
+            lines.append(f"{name:<12}" + "".join(f"{value:<7.2f}" for value in row))
+        if len(totals):
+            lines.append(f"{'frame':<12}" + "".join(f"{value:<7.2f}" for value in np.percentile(totals, PERCENTILES)))
+        if self.frames:
+            counts = self.counts[(self.frames - 1) % self.capacity]
+            lines.append("  ".join(f"{name} {count}" for name, count in zip(self.counters, counts)))
+
+        # Rendered straight from the font so changing numbers don't churn the shared text cache
+        font = text_cache.font(16, "monospace")
+        rendered = [font.render(line, True, (0, 255, 0)) for line in lines]
+        line_height = font.get_linesize()
+        panel = pygame.Surface((max(text.get_width() for text in rendered) + 10, line_height * len(lines) + 10), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 180))
+        for i, text in enumerate(rendered):
+            panel.blit(text, (5, 5 + i * line_height))
+        return panel
+
+    def dump(self, path):
+        """Write the buffered frames to `path` as CSV, or JSON if it ends in .json"""
+        times, counts = self.recorded()
+        first_frame = self.frames - len(times)
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({
+                    "phases": list(self.phases),
+                    "counters": list(self.counters),
+                    "first_frame": first_frame,
+                    "times_ms": times.round(4).tolist(),
+                    "counts": counts.tolist(),
+                }, f)
+            return
+
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + [f"{name}_ms" for name in self.phases] + list(self.counters))
+            for i, (row_times, row_counts) in enumerate(zip(times, counts)):
+                writer.writerow([first_frame + i] + [f"{value:.4f}" for value in row_times] + row_counts.tolist())
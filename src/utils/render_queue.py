@@ -0,0 +1,86 @@
+import pygame
+
+from utils.text_cache import text_cache
+
+# Per-frame sprite batching: collect blits by layer, then hand each layer to Surface.blits at once
+
+# Layers, drawn in this order
+CAKES, PROJECTILES, ENEMIES, PLAYER, HUD = range(5)
+LAYER_COUNT = 5
+
+BUBBLE_KEY = (255, 0, 255)  # Transparent colour around a speech bubble's pointer
+
+class RenderQueue:
+    """Sprite blits for one frame, grouped by layer.
+
+    Entities `add` (surface, position) pairs as they are visited, in any layer order;
+    `flush` blits the layers bottom to top, one `Surface.blits` call each, and
+    empties the queue. Within a layer blits keep the order they were added.
+    """
+    def __init__(self, layers=LAYER_COUNT):
+        self.layers = [[] for _ in range(layers)]
+
+    def add(self, layer, surface, position):
+        self.layers[layer].append((surface, position))
+
+    def extend(self, layer, blits):
+        """Queue an iterable of (surface, position) pairs"""
+        self.layers[layer].extend(blits)
+
+    def __len__(self):
+        return sum(len(blits) for blits in self.layers)
+
+    def flush(self, window, rects=None):
+        """Blit everything queued onto `window`, appending the screen rects covered to `rects` if given"""
+        for blits in self.layers:
+            if not blits:
+                continue
+            if rects is None:
+                window.blits(blits, doreturn=False)
+            else:
+                rects += window.blits(blits)
+            blits.clear()
+
+# Bars and bubbles are small and come in few variants, so each is rendered once and reused
+bar_cache = {}
+bubble_cache = {}
+
+def bar_surface(width, height, filled, color, background):
+    """A `width` x `height` bar whose first `filled` pixels are `color` and the rest `background`.
+
+    Health bars are quantised to whole pixels of fill, the finest step they can show,
+    so a bar of width w has at most w + 1 variants.
+    """
+    key = (width, height, filled, color, background)
+    surface = bar_cache.get(key)
+    if surface is None:
+        surface = pygame.Surface((width, height)).convert()
+        surface.fill(background)
+        surface.fill(color, (0, 0, filled, height))
+        bar_cache[key] = surface
+    return surface
+
+def bubble_surface(message):
+    """Speech bubble with `message` and its pointer, positioned by its top-left corner.
+
+    The pointer tip sits 25 pixels below the bubble's top, centred.
+    """
+    surface = bubble_cache.get(message)
+    if surface is None:
+        text = text_cache.render(message, 16, (0, 0, 0))
+        bubble_width = text.get_width() + 10
+        bubble_height = text.get_height() + 10
+        surface = pygame.Surface((bubble_width, max(bubble_height, 26))).convert()
+        surface.fill(BUBBLE_KEY)
+        surface.set_colorkey(BUBBLE_KEY)
+        pygame.draw.rect(surface, (255, 255, 255), (0, 0, bubble_width, bubble_height))
+        pygame.draw.rect(surface, (0, 0, 0), (0, 0, bubble_width, bubble_height), 1)
+        # Triangle pointer
+        pygame.draw.polygon(surface, (255, 255, 255), [
+            (bubble_width // 2, 25),
+            (bubble_width // 2 - 5, bubble_height),
+            (bubble_width // 2 + 5, bubble_height)
+        ])
+        surface.blit(text, (5, 5))
+        bubble_cache[message] = surface
+    return surface
@@ -0,0 +1,79 @@
+import struct
+
+# Compact per-tick input logs: one byte per tick, movement keys in the low bits and
+# the abilities cast that tick in the high bits.
+MOVE_UP = 1 << 0  # W
+MOVE_LEFT = 1 << 1  # A
+MOVE_DOWN = 1 << 2  # S
+MOVE_RIGHT = 1 << 3  # D
+ABILITY_BITS = {  # J, K, L, I
+    "lightning": 1 << 4,
+    "magic_missile": 1 << 5,
+    "fire_cone": 1 << 6,
+    "speed_burst": 1 << 7,
+}
+
+MAGIC = b"JOSR"
+VERSION = 1
+# magic, version, flags, game seed, tick count, sha256 of the final state
+HEADER = struct.Struct("<4sBBQI32s")
+FLAG_INFINITE = 1
+
+def encode_input(dx, dy, abilities):
+    """Pack one tick of input into a byte"""
+    bits = 0
+    if dy < 0:
+        bits |= MOVE_UP
+    elif dy > 0:
+        bits |= MOVE_DOWN
+    if dx < 0:
+        bits |= MOVE_LEFT
+    elif dx > 0:
+        bits |= MOVE_RIGHT
+    for name in abilities:
+        bits |= ABILITY_BITS[name]
+    return bits
+
+def decode_input(bits):
+    """Unpack a byte into (dx, dy, abilities), abilities always in the same order"""
+    dx = (1 if bits & MOVE_RIGHT else 0) - (1 if bits & MOVE_LEFT else 0)
+    dy = (1 if bits & MOVE_DOWN else 0) - (1 if bits & MOVE_UP else 0)
+    return dx, dy, [name for name, bit in ABILITY_BITS.items() if bits & bit]
+
+class InputLog:
+    """Inputs of one game from its seed, plus the hash of the state they led to"""
+    def __init__(self, seed, infinite=False, inputs=None, state_hash=bytes(32)):
+        self.seed = seed
+        self.infinite = infinite
+        self.inputs = bytearray() if inputs is None else inputs
+        self.state_hash = state_hash
+
+    def record(self, dx, dy, abilities):
+        """Append one tick and return the input exactly as it will replay"""
+        bits = encode_input(dx, dy, abilities)
+        self.inputs.append(bits)
+        return decode_input(bits)
+
+    def __iter__(self):
+        return map(decode_input, self.inputs)
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def save(self, path):
+        flags = FLAG_INFINITE if self.infinite else 0
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, flags, self.seed, len(self.inputs), self.state_hash))
+            f.write(self.inputs)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, flags, seed, ticks, state_hash = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} input log")
+        inputs = bytearray(data[HEADER.size:HEADER.size + ticks])
+        if len(inputs) != ticks:
+            raise ValueError(f"{path} is truncated: {len(inputs)} of {ticks} ticks")
+        return cls(seed, bool(flags & FLAG_INFINITE), inputs, state_hash)
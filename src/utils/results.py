@@ -0,0 +1,91 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+# Append-only columnar results file: a JSON schema header, then row groups that each
+# hold a few rows column by column, so a column reads back as one array per group.
+#
+#   magic "JOSB", header length (uint32), header JSON {"columns": [[name, dtype], ...]}
+#   per row group: magic "ROWS", row count (uint32), then every column's raw values
+#
+# A run killed mid-write leaves at most one partial row group at the end, which
+# `ResultsFile` cuts off when it reopens the file.
+
+MAGIC = b"JOSB"
+GROUP_MAGIC = b"ROWS"
+GROUP_HEADER = struct.Struct("<4sI")
+
+class ResultsFile:
+    """Columnar results on disk that rows are streamed into and survive interruption"""
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = [(name, np.dtype(dtype)) for name, dtype in columns]
+        self.row_size = sum(dtype.itemsize for _, dtype in self.columns)
+        header = json.dumps({"columns": [[name, dtype.str] for name, dtype in self.columns]}).encode()
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                magic, length = struct.unpack("<4sI", f.read(8))
+                if magic != MAGIC or f.read(length) != header:
+                    raise ValueError(f"{path} is not a results file with the same columns")
+            valid = self.scan()
+            if valid < os.path.getsize(path):
+                with open(path, "r+b") as f:
+                    f.truncate(valid)
+        else:
+            with open(path, "wb") as f:
+                f.write(struct.pack("<4sI", MAGIC, len(header)) + header)
+        self.file = open(path, "ab")
+
+    def scan(self):
+        """Return the byte length of the file up to the end of its last complete row group"""
+        with open(self.path, "rb") as f:
+            data = f.read()
+        offset = 8 + struct.unpack_from("<I", data, 4)[0]
+        while offset + GROUP_HEADER.size <= len(data):
+            magic, rows = GROUP_HEADER.unpack_from(data, offset)
+            end = offset + GROUP_HEADER.size + rows * self.row_size
+            if magic != GROUP_MAGIC or end > len(data):
+                break
+            offset = end
+        return offset
+
+    def append(self, rows):
+        """Write a row group from a list of dicts keyed by column name, and flush it to disk"""
+        data = bytearray(GROUP_HEADER.pack(GROUP_MAGIC, len(rows)))
+        for name, dtype in self.columns:
+            data += np.array([row[name] for row in rows], dtype=dtype).tobytes()
+        self.file.write(data)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def read_results(path):
+    """Read a results file into a dict of column name -> NumPy array"""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, length = struct.unpack_from("<4sI", data)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a results file")
+    columns = [(name, np.dtype(dtype)) for name, dtype in json.loads(data[8:8 + length])["columns"]]
+    row_size = sum(dtype.itemsize for _, dtype in columns)
+    pieces = {name: [] for name, _ in columns}
+    offset = 8 + length
+    while offset + GROUP_HEADER.size <= len(data):
+        magic, rows = GROUP_HEADER.unpack_from(data, offset)
+        if magic != GROUP_MAGIC or offset + GROUP_HEADER.size + rows * row_size > len(data):
+            break  # Partial row group from an interrupted run
+        offset += GROUP_HEADER.size
+        for name, dtype in columns:
+            pieces[name].append(np.frombuffer(data, dtype=dtype, count=rows, offset=offset))
+            offset += rows * dtype.itemsize
+    return {name: np.concatenate(parts) if parts else np.zeros(0, dtype=dtype)
+            for (name, dtype), parts in zip(columns, pieces.values())}
@@ -0,0 +1,59 @@
+import struct
+
+import numpy as np
+
+# Binary game snapshots: a flat little-endian byte stream of struct-packed records
+# and raw array contents, written and read back in the same order.
+
+MAGIC = b"JOSS"
+VERSION = 7
+
+class SnapshotWriter:
+    def __init__(self):
+        self.data = bytearray(struct.pack("<4sB", MAGIC, VERSION))
+
+    def pack(self, fmt, *values):
+        self.data += struct.pack("<" + fmt, *values)
+
+    def array(self, array):
+        """Append a NumPy array as its length and raw contents"""
+        self.pack("I", len(array))
+        self.data += np.ascontiguousarray(array).tobytes()
+
+    def random_state(self, rng):
+        """Append the state of a `random.Random` (Mersenne Twister words and the cached gauss value)"""
+        version, words, gauss_next = rng.getstate()
+        self.pack("BI", version, len(words))
+        self.data += np.array(words, dtype=np.uint32).tobytes()
+        self.pack("?d", gauss_next is not None, gauss_next or 0.0)
+
+    def getvalue(self):
+        return bytes(self.data)
+
+class SnapshotReader:
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.offset = 0
+        magic, version = self.unpack("4sB")
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"not a version {VERSION} game snapshot")
+
+    def unpack(self, fmt):
+        values = struct.unpack_from("<" + fmt, self.data, self.offset)
+        self.offset += struct.calcsize("<" + fmt)
+        return values
+
+    def array(self, dtype):
+        """Read an array written by `SnapshotWriter.array`, copied out of the snapshot"""
+        length, = self.unpack("I")
+        dtype = np.dtype(dtype)
+        array = np.frombuffer(self.data, dtype=dtype, count=length, offset=self.offset).copy()
+        self.offset += length * dtype.itemsize
+        return array
+
+    def random_state(self):
+        version, length = self.unpack("BI")
+        words = np.frombuffer(self.data, dtype=np.uint32, count=length, offset=self.offset)
+        self.offset += length * 4
+        has_gauss, gauss_next = self.unpack("?d")
+        return version, tuple(words.tolist()), gauss_next if has_gauss else None
@@ -0,0 +1,102 @@
+import numpy as np
+
+# Uniform-grid spatial hash used for broadphase collision and nearest-neighbour queries
+
+class ArrayGrid:
+    """Uniform grid over parallel coordinate arrays, rebuilt with a single sort.
+
+    Cells are numbered row-major inside a `cols` x `rows` area starting at pixel
+    (`origin_x`, `origin_y`) and points outside it are clamped into the border cells,
+    so candidate lists are always a superset of the true overlaps. Callers do the
+    exact overlap test on the returned indices. On unbounded maps the origin is moved
+    to keep the area around the player.
+    """
+    def __init__(self, cell_size, cols, rows):
+        self.cell_size = cell_size
+        self.cols = cols
+        self.rows = rows
+        self.origin_x = 0
+        self.origin_y = 0
+        self.order = np.zeros(0, dtype=np.intp)
+        self.starts = np.zeros(cols * rows + 1, dtype=np.intp)
+        self.max_width = 0
+        self.max_height = 0
+
+    def rebuild(self, x, y, width, height):
+        """Index integer top-left positions `x`, `y` of objects sized `width` x `height`"""
+        size = self.cell_size
+        cell_x = np.clip((x - self.origin_x) // size, 0, self.cols - 1)
+        cell_y = np.clip((y - self.origin_y) // size, 0, self.rows - 1)
+        keys = cell_y * self.cols + cell_x
+        self.order = np.argsort(keys, kind="stable")
+        self.starts = np.searchsorted(keys[self.order], np.arange(self.cols * self.rows + 1))
+        self.max_width = int(width.max()) if len(width) else 0
+        self.max_height = int(height.max()) if len(height) else 0
+
+    def candidates(self, left, top, right, bottom):
+        """Return indices of objects that may overlap the given bounds"""
+        size = self.cell_size
+        left -= self.origin_x
+        right -= self.origin_x
+        top -= self.origin_y
+        bottom -= self.origin_y
+        x0 = min(max((left - self.max_width) // size, 0), self.cols - 1)
+        y0 = min(max((top - self.max_height) // size, 0), self.rows - 1)
+        x1 = min(max((right - 1) // size, 0), self.cols - 1)
+        y1 = min(max((bottom - 1) // size, 0), self.rows - 1)
+
+        starts = self.starts
+        order = self.order
+        pieces = [order[starts[cy * self.cols + x0]:starts[cy * self.cols + x1 + 1]] for cy in range(y0, y1 + 1)]
+        if len(pieces) == 1:
+            return pieces[0]
+        return np.concatenate(pieces)
+
+    def nearest(self, px, py, k, x, y, alive):
+        """Return up to `k` indices ordered by distance from (`px`, `py`) to (`x[i]`, `y[i]`).
+
+        `x` and `y` must be the positions passed to the last `rebuild` and `alive` a mask
+        over them; indices outside it or masked out are skipped. Rings of cells are
+        searched outwards from the query cell until the k-th best distance is no further
+        than the nearest unsearched cell.
+        """
+        size = self.cell_size
+        cols, rows = self.cols, self.rows
+        cx = min(max(int((px - self.origin_x) // size), 0), cols - 1)
+        cy = min(max(int((py - self.origin_y) // size), 0), rows - 1)
+        starts = self.starts
+        order = self.order
+        n = len(x)
+        found = []
+        found_dist = []
+        count = 0
+        for r in range(max(cols, rows)):
+            x0, x1 = max(cx - r, 0), min(cx + r, cols - 1)
+            y0, y1 = max(cy - r, 0), min(cy + r, rows - 1)
+            # Full rows on the top and bottom edge of the ring, single cells down its sides
+            pieces = [order[starts[row * cols + x0]:starts[row * cols + x1 + 1]]
+                      for row in {cy - r, cy + r} if 0 <= row < rows]
+            for col in {cx - r, cx + r}:
+                if 0 <= col < cols:
+                    pieces += [order[starts[row * cols + col]:starts[row * cols + col + 1]]
+                               for row in range(max(cy - r + 1, 0), min(cy + r, rows))]
+            if pieces:
+                candidates = np.concatenate(pieces)
+                candidates = candidates[candidates < n]
+                candidates = candidates[alive[candidates]]
+                if len(candidates):
+                    found.append(candidates)
+                    found_dist.append(np.hypot(x[candidates] - px, y[candidates] - py))
+                    count += len(candidates)
+
+            # Everything not searched yet lies at least r cells away (clamped points even further)
+            if count >= k and np.partition(np.concatenate(found_dist), k - 1)[k - 1] <= r * size:
+                break
+            if x0 == 0 and y0 == 0 and x1 == cols - 1 and y1 == rows - 1:
+                break  # The whole grid has been searched
+
+        if not found:
+            return np.zeros(0, dtype=np.intp)
+        candidates = np.concatenate(found)
+        dist = np.concatenate(found_dist)
+        return candidates[np.argsort(dist, kind="stable")[:k]]
@@ -0,0 +1,49 @@
+import pygame
+from collections import OrderedDict
+
+# Shared font registry and rendered-text cache for the HUD, speech bubbles and menus
+
+class TextCache:
+    """Load each font face/size once and keep recently rendered strings as surfaces"""
+    def __init__(self, max_surfaces=512):
+        self.max_surfaces = max_surfaces
+        self.fonts = {}  # (name, size) -> pygame.font.Font
+        self.surfaces = OrderedDict()  # (name, size, text, color) -> Surface, oldest first
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, size, name=None):
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = pygame.font.SysFont(name, size)
+        return font
+
+    def render(self, text, size, color, name=None):
+        """Return an antialiased surface for `text`, rendering it only on a cache miss"""
+        key = (name, size, text, tuple(color))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.font(size, name).render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_surfaces:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "surfaces": len(self.surfaces),
+            "fonts": len(self.fonts),
+        }
+
+# Shared by every draw function in the game
+text_cache = TextCache()
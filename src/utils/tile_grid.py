@@ -0,0 +1,54 @@
+import numpy as np
+
+# Office tile types
+EMPTY = 0
+DESK = 1
+CHAIR = 2
+
+class TileGrid:
+    """Tile types of a fixed-size map, one byte per tile in row-major order.
+
+    `tiles` is the bytearray itself and `array` a (rows, cols) NumPy view onto the
+    same memory, so gameplay lookups stay plain indexing while bulk work (obstacle
+    masks, drawing) can use whole-array operations.
+    """
+    def __init__(self, cols, rows, tile_size, tiles=None):
+        self.cols = cols
+        self.rows = rows
+        self.tile_size = tile_size
+        self.tiles = bytearray(cols * rows) if tiles is None else tiles
+        self.array = np.frombuffer(self.tiles, dtype=np.uint8).reshape(rows, cols)
+
+    def tile_at(self, tile_x, tile_y):
+        """Return the tile type at tile coordinates (`tile_x`, `tile_y`), EMPTY off the map"""
+        if 0 <= tile_x < self.cols and 0 <= tile_y < self.rows:
+            return self.tiles[tile_y * self.cols + tile_x]
+        return EMPTY
+
+    def set_tile(self, tile_x, tile_y, tile_type):
+        self.tiles[tile_y * self.cols + tile_x] = tile_type
+
+    def visible_range(self, camera_x, camera_y, width, height):
+        """Return the (col0, row0, col1, row1) tiles overlapped by the camera rect, end exclusive"""
+        size = self.tile_size
+        col0 = min(max(int(camera_x // size), 0), self.cols)
+        row0 = min(max(int(camera_y // size), 0), self.rows)
+        col1 = min(max(int(-(-(camera_x + width) // size)), 0), self.cols)
+        row1 = min(max(int(-(-(camera_y + height) // size)), 0), self.rows)
+        return col0, row0, col1, row1
+
+    def visible_tiles(self, camera_x, camera_y, width, height, tile_type=None):
+        """Return (x, y, type) pixel positions of the non-empty tiles in the camera rect.
+
+        With `tile_type` only tiles of that type are returned.
+        """
+        col0, row0, col1, row1 = self.visible_range(camera_x, camera_y, width, height)
+        window = self.array[row0:row1, col0:col1]
+        rows, cols = np.nonzero(window == tile_type if tile_type is not None else window)
+        size = self.tile_size
+        return [((col0 + col) * size, (row0 + row) * size, int(window[row, col]))
+                for row, col in zip(rows.tolist(), cols.tolist())]
+
+    def __iter__(self):
+        """Iterate (x, y, type) over every non-empty tile, the old `office_tiles` tuples"""
+        return iter(self.visible_tiles(0, 0, self.cols * self.tile_size, self.rows * self.tile_size))
@@ -0,0 +1,538 @@
+# Vectorised games for bot training: many independent games stepped in lockstep on NumPy arrays.
+# Usage: with src/ first on sys.path (as the benchmarks and balance.py run), import vec_game
+# after main.init_display(headless=True), see VecGame.
+import numpy as np
+
+import main as game
+
+if not hasattr(game, "Game"):
+    # From the repository root `main` can be the launcher, which only wraps src/main.py
+    raise ImportError("vec_game needs src/ first on sys.path, so that `main` is src/main.py")
+from entities import ecs
+from entities.waves import WAVES, Wave
+from utils.masks import overlap_tables
+from utils.replay import ABILITY_BITS, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT, MOVE_UP
+
+# Ability columns of VecGame.cooldown, in input bit order (J, K, L, I)
+ABILITIES = tuple(ABILITY_BITS)
+LIGHTNING, MAGIC_MISSILE, FIRE_CONE, SPEED_BURST = range(4)
+ABILITY_MASKS = np.array(list(ABILITY_BITS.values()), dtype=np.uint8)
+
+PLAYER_FEATURES = 10  # Position, health, XP progress, level, four cooldowns, speed burst
+
+def used_columns(alive):
+    """Number of leading columns of an alive mask that hold every live entity of any game.
+
+    Slots are handed out lowest first, so this tracks the peak population of the
+    busiest game rather than the arrays' capacity.
+    """
+    used = np.flatnonzero(alive.any(axis=0))
+    return int(used[-1]) + 1 if len(used) else 0
+
+class VecGame:
+    """`count` independent games advanced together, one fixed tick per `step`.
+
+    Follows the rules of `Game.step` on the fixed office map: WASD movement, the
+    four abilities with their cooldowns, enemy waves under the per-tick spawn budget,
+    contact damage, projectiles, cakes and levelling. Every game is a row of the
+    same arrays; enemies, projectiles and cakes are padded columns with an alive mask,
+    so each rule is a handful of NumPy operations over all games at once and
+    nothing is drawn.
+
+    Differences from `Game`: the office has no desks, so enemies walk straight at
+    the player as they do without a flow field; all games share one random
+    stream, so the batch (not each game) is reproducible from its seed; the
+    projectiles of a tick all resolve against the enemies alive at its start; and
+    when a missile or lightning bolt touches two enemies in the same grid cell it
+    hits the one in the lower column, where `Game` hits the lower swarm slot, an
+    order its swap-removals shuffle.
+
+    Actions are input bytes as recorded by `InputLog` (movement and ability bits
+    from `utils.replay`), one per game. Games that end are reset at the end of the
+    step that ended them, the classic vector-environment auto-reset.
+
+    Each step costs a fixed number of NumPy calls whatever the batch size, so a
+    single game steps about half as fast as a plain `Game` loop; from 16 games on
+    it is several times faster per game (benchmarks/bench_vec_game.py).
+    """
+    def __init__(self, count, seed=None, waves=WAVES, spawn_budget=8, max_ticks=60 * 60 * 10, nearest=8):
+        self.count = count
+        self.max_ticks = max_ticks  # Games are truncated after this many ticks
+        self.nearest = nearest  # Enemies and cakes described in each observation
+        self.rng = np.random.default_rng(seed)
+        self.map_width = game.MAP_WIDTH * game.TILE_SIZE
+        self.map_height = game.MAP_HEIGHT * game.TILE_SIZE
+
+        # Rules are read off the game's own entities, so tuning them carries over
+        player = game.Player(0, 0)
+        self.player_width, self.player_height = player.width, player.height
+        self.player_speed = player.speed
+        self.max_health = player.max_health
+        self.max_cooldown = player.max_cooldowns[[game.ABILITY_INDEX[name] for name in ABILITIES]]
+        self.burst_duration = game.ABILITIES[game.SPEED_BURST]["duration"]
+
+        swarm = game.create_enemy_swarm()
+        self.enemy_speed = swarm.default_speed
+        self.enemy_health = swarm.max_health
+        self.enemy_width = np.array([image.get_width() for image in swarm.images], dtype=np.int64)
+        self.enemy_height = np.array([image.get_height() for image in swarm.images], dtype=np.int64)
+
+        # Per projectile kind, indexed by LIGHTNING, MAGIC_MISSILE and FIRE_CONE
+        kinds = game.PROJECTILE_KINDS
+        sizes = [game.assets.get(spec["sprite"]).get_size() for spec in kinds]
+        self.proj_width = np.array([width for width, _ in sizes], dtype=np.int64)
+        self.proj_height = np.array([height for _, height in sizes], dtype=np.int64)
+        self.proj_lifetime = np.array([spec["lifetime"] for spec in kinds], dtype=np.int32)
+        self.proj_damage = np.array([spec["damage"] for spec in kinds], dtype=np.float64)
+        # Rect top above y
+        self.proj_top = np.array([height // 2 if spec["centred"] else spec["top"]
+                                  for spec, (_, height) in zip(kinds, sizes)], dtype=np.int64)
+        self.proj_pierces = np.array([spec["pierce"] for spec in kinds])  # Fire cones hit everything under them
+        self.proj_interval = np.array([spec["hit_interval"] for spec in kinds], dtype=np.int64)
+        # Pixel hit shapes by kind and enemy type, as Game.projectile_shapes
+        self.proj_shapes = overlap_tables([game.assets.get(spec["sprite"]) for spec in kinds], swarm.images,
+                                          [spec["mask"] for spec in kinds])
+        self.reach_x = self.enemy_width.max() - 1
+        self.reach_y = self.enemy_height.max() - 1
+        # The swarm's grid, whose cells order the enemies a projectile meets first
+        self.cell_size, self.grid_cols, self.grid_rows = swarm.grid.cell_size, swarm.grid.cols, swarm.grid.rows
+        self.missile_speed = kinds[game.MAGIC_MISSILE]["speed"]
+
+        self.cake_width, self.cake_height = game.assets.get("cake").get_size()
+        self.cake_value = game.CAKE_VALUE
+
+        self.waves = [Wave(**wave) for wave in waves]
+        self.cycle_length = max(wave.start + wave.duration for wave in self.waves)
+        self.spawn_budget = spawn_budget
+        self.wave_growth = 1.5
+
+        shape = (count,)
+        self.ticks = np.zeros(shape, dtype=np.int64)
+        self.kills = np.zeros(shape, dtype=np.int64)
+        self.player_x = np.zeros(shape)
+        self.player_y = np.zeros(shape)
+        self.health = np.zeros(shape)
+        self.xp = np.zeros(shape, dtype=np.int64)
+        self.level = np.zeros(shape, dtype=np.int64)
+        self.xp_to_level = np.zeros(shape, dtype=np.int64)
+        self.cooldown = np.zeros((count, len(ABILITIES)), dtype=np.int32)
+        self.burst = np.zeros(shape, dtype=np.int32)  # Speed burst ticks left, active while positive
+        self.cycle = np.zeros(shape, dtype=np.int64)
+        self.queued = np.zeros((count, len(self.waves)), dtype=np.int64)  # As WaveScheduler.queued
+        self.pending = np.zeros((count, len(self.waves)), dtype=np.int64)  # Spawns waiting, by wave
+
+        # Padded per-game columns, grown together when any game runs out of free slots
+        self.enemy_x = np.zeros((count, 64))
+        self.enemy_y = np.zeros((count, 64))
+        self.enemy_hp = np.zeros((count, 64))
+        self.enemy_type = np.zeros((count, 64), dtype=np.int8)
+        self.enemy_alive = np.zeros((count, 64), dtype=bool)
+        self.enemy_generation = np.zeros((count, 64), dtype=np.int32)  # Bumped on death, for missile targets
+        self.enemy_uid = np.zeros((count, 64), dtype=np.int64)
+        self.proj_kind = np.zeros((count, 16), dtype=np.int8)
+        self.proj_x = np.zeros((count, 16))
+        self.proj_y = np.zeros((count, 16))
+        self.proj_life = np.zeros((count, 16), dtype=np.int32)
+        self.proj_alive = np.zeros((count, 16), dtype=bool)
+        self.proj_target = np.full((count, 16), -1, dtype=np.int64)
+        self.proj_target_generation = np.zeros((count, 16), dtype=np.int32)
+        self.proj_uid = np.zeros((count, 16), dtype=np.int64)
+        # Ids unique across all games, so one HitSet serves them all
+        self.spawned = 0
+        self.clock = 0
+        self.hits = ecs.HitSet()
+        self.cake_x = np.zeros((count, 64))
+        self.cake_y = np.zeros((count, 64))
+        self.cake_alive = np.zeros((count, 64), dtype=bool)
+
+    # Padded column groups, each ending with its alive mask
+    ENEMY_ARRAYS = ("enemy_x", "enemy_y", "enemy_hp", "enemy_type", "enemy_generation", "enemy_uid", "enemy_alive")
+    PROJECTILE_ARRAYS = ("proj_kind", "proj_x", "proj_y", "proj_life", "proj_target", "proj_target_generation",
+                         "proj_uid", "proj_alive")
+    CAKE_ARRAYS = ("cake_x", "cake_y", "cake_alive")
+
+    @property
+    def observation_size(self):
+        return PLAYER_FEATURES + 4 * self.nearest + 3 * self.nearest
+
+    def reset(self, seed=None):
+        """Start every game over and return (observations, info)"""
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self.reset_games(np.ones(self.count, dtype=bool))
+        return self.observe(), {}
+
+    def reset_games(self, games):
+        """Start the games in boolean mask `games` over"""
+        self.ticks[games] = 0
+        self.kills[games] = 0
+        self.player_x[games] = game.WIDTH // 2
+        self.player_y[games] = game.HEIGHT // 2
+        self.health[games] = self.max_health
+        self.xp[games] = 0
+        self.level[games] = 1
+        self.xp_to_level[games] = 10
+        self.cooldown[games] = 0
+        self.burst[games] = 0
+        self.cycle[games] = 0
+        self.queued[games] = 0
+        self.pending[games] = 0
+        self.enemy_alive[games] = False
+        self.proj_alive[games] = False
+        self.cake_alive[games] = False
+
+    def step(self, actions):
+        """Advance every game one tick with its input byte in `actions`.
+
+        Returns (observations, rewards, terminated, truncated, info) like a gymnasium
+        vector environment: the reward is the XP collected this tick, `terminated`
+        marks games the player died in and `truncated` ones that reached `max_ticks`.
+        Both are reset before returning, `info` holds their final "ticks", "kills"
+        and "level".
+        """
+        actions = np.asarray(actions, dtype=np.uint8)
+        self.ticks += 1
+        self.clock += 1
+
+        # Abilities, then movement, in the order Game.step applies them
+        cast = (actions[:, None] & ABILITY_MASKS) != 0
+        cast &= self.cooldown <= 0
+        self.cooldown[cast] = np.broadcast_to(self.max_cooldown, cast.shape)[cast]
+        self.use_abilities(cast)
+
+        dx = ((actions & MOVE_RIGHT) != 0).astype(np.float64) - ((actions & MOVE_LEFT) != 0)
+        dy = ((actions & MOVE_DOWN) != 0).astype(np.float64) - ((actions & MOVE_UP) != 0)
+        diagonal = (dx != 0) & (dy != 0)
+        dx[diagonal] *= 0.7071
+        dy[diagonal] *= 0.7071
+        speed = self.player_speed * np.where(self.burst > 0, 2, 1)
+        np.clip(self.player_x + dx * speed, 0, self.map_width - self.player_width, out=self.player_x)
+        np.clip(self.player_y + dy * speed, 0, self.map_height - self.player_height, out=self.player_y)
+
+        self.cooldown -= self.cooldown > 0
+        self.burst -= self.burst > 0
+
+        self.spawn_waves()
+        self.update_enemies()
+        self.update_projectiles()
+        rewards = self.collect_cakes()
+
+        terminated = self.health <= 0
+        truncated = ~terminated & (self.ticks >= self.max_ticks)
+        info = {"ticks": self.ticks.copy(), "kills": self.kills.copy(), "level": self.level.copy()}
+        done = terminated | truncated
+        if done.any():
+            self.reset_games(done)
+        return self.observe(), rewards, terminated, truncated, info
+
+    def allocate(self, names, counts):
+        """Claim the first `counts[g]` free slots of each game in the padded arrays `names`,
+        doubling them while any game is short, and return (games, slots) in game order"""
+        free = ~getattr(self, names[-1])
+        while (counts > free.sum(axis=1)).any():
+            for name in names:
+                old = getattr(self, name)
+                new = np.zeros((self.count, old.shape[1] * 2), dtype=old.dtype)
+                new[:, :old.shape[1]] = old
+                setattr(self, name, new)
+            free = ~getattr(self, names[-1])
+        return np.nonzero(free & (np.cumsum(free, axis=1) <= counts[:, None]))
+
+    def new_uids(self, count):
+        uids = np.arange(self.spawned, self.spawned + count, dtype=np.int64)
+        self.spawned += count
+        return uids
+
+    def add_projectiles(self, games, kind, x, y, target=None):
+        games_mask = np.zeros(self.count, dtype=bool)
+        games_mask[games] = True
+        rows, slots = self.allocate(self.PROJECTILE_ARRAYS, games_mask.astype(np.int64))
+        self.proj_kind[rows, slots] = kind
+        self.proj_x[rows, slots] = x
+        self.proj_y[rows, slots] = y
+        self.proj_life[rows, slots] = self.proj_lifetime[kind]
+        self.proj_uid[rows, slots] = self.new_uids(len(rows))
+        self.proj_alive[rows, slots] = True
+        if target is not None:
+            self.proj_target[rows, slots] = target
+            self.proj_target_generation[rows, slots] = self.enemy_generation[rows, target]
+
+    def use_abilities(self, cast):
+        """Spawn the projectiles of the abilities in boolean matrix `cast` from each player's centre"""
+        centre_x = self.player_x + self.player_width // 2
+        centre_y = self.player_y + self.player_height // 2
+        for kind in (LIGHTNING, MAGIC_MISSILE, FIRE_CONE):
+            games = np.flatnonzero(cast[:, kind])
+            if len(games) == 0:
+                continue
+            if kind == MAGIC_MISSILE:
+                # Homing on the nearest enemy, not cast at all without one
+                target, found = self.nearest_enemies(games, self.player_x[games], self.player_y[games])
+                games, target = games[found], target[found]
+                if len(games):
+                    self.add_projectiles(games, kind, centre_x[games], centre_y[games], target)
+            else:
+                self.add_projectiles(games, kind, centre_x[games], centre_y[games])
+        self.burst[cast[:, SPEED_BURST]] = self.burst_duration
+
+    def nearest_enemies(self, games, x, y):
+        """Slot of the live enemy of each of `games` whose rect corner is nearest (`x`, `y`), and whether one exists"""
+        n = max(used_columns(self.enemy_alive), 1)
+        alive = self.enemy_alive[games, :n]
+        dist = np.hypot(ecs.rect_round(self.enemy_x[games, :n]) - x[:, None],
+                        ecs.rect_round(self.enemy_y[games, :n]) - y[:, None])
+        dist[~alive] = np.inf
+        return dist.argmin(axis=1), alive.any(axis=1)
+
+    def wave_targets(self, cycle_tick, cycle):
+        """Enemies each wave should have queued by `cycle_tick` of `cycle`, as Wave.target per game"""
+        scale = self.wave_growth ** cycle
+        targets = np.zeros((self.count, len(self.waves)), dtype=np.int64)
+        for i, wave in enumerate(self.waves):
+            progress = np.minimum((cycle_tick - wave.start) / wave.duration, 1.0)
+            target = (wave.count * scale * wave.ramp(progress)).astype(np.int64)
+            targets[:, i] = np.where(cycle_tick < wave.start, 0, target)
+        return targets
+
+    def spawn_waves(self):
+        """Queue each game's due spawns like WaveScheduler and spawn up to the budget of them"""
+        cycle, cycle_tick = np.divmod(self.ticks, self.cycle_length)
+        changed = cycle != self.cycle
+        if changed.any():
+            # Finish off the previous cycle before starting the next
+            finished = self.wave_targets(np.full(self.count, self.cycle_length), self.cycle)
+            self.pending += np.where(changed[:, None], np.maximum(finished - self.queued, 0), 0)
+            self.queued[changed] = 0
+            self.cycle = cycle
+        targets = self.wave_targets(cycle_tick, cycle)
+        self.pending += np.maximum(targets - self.queued, 0)
+        np.maximum(self.queued, targets, out=self.queued)
+
+        # Drain the waves in table order until the budget is spent
+        before = np.cumsum(self.pending, axis=1) - self.pending
+        taken = np.clip(self.spawn_budget - before, 0, self.pending)
+        if not taken.any():
+            return
+        self.pending -= taken
+        rng = self.rng
+        games, types, sides = [], [], []
+        for i, wave in enumerate(self.waves):
+            n = int(taken[:, i].sum())
+            if n:
+                games.append(np.repeat(np.arange(self.count), taken[:, i]))
+                weights = np.array(wave.weights, dtype=np.float64)
+                types.append(rng.choice(wave.types, n, p=weights / weights.sum()))
+                sides.append(rng.choice(wave.edges, n))
+        games = np.concatenate(games)
+        order = np.argsort(games, kind="stable")
+        types = np.concatenate(types)[order]
+        sides = np.concatenate(sides)[order]
+
+        # On a random point of the chosen map edge, as spawn_enemy
+        n = len(sides)
+        x = rng.integers(0, self.map_width, n, endpoint=True)
+        y = rng.integers(0, self.map_height, n, endpoint=True)
+        y[sides == 0] = 0
+        x[sides == 1] = self.map_width
+        y[sides == 2] = self.map_height
+        x[sides == 3] = 0
+
+        rows, slots = self.allocate(self.ENEMY_ARRAYS, taken.sum(axis=1))
+        self.enemy_x[rows, slots] = x
+        self.enemy_y[rows, slots] = y
+        self.enemy_hp[rows, slots] = self.enemy_health
+        self.enemy_type[rows, slots] = types
+        self.enemy_uid[rows, slots] = self.new_uids(len(rows))
+        self.enemy_alive[rows, slots] = True
+
+    def player_rect(self):
+        """(left, top, right, bottom) of each player's rect, rounded as Player.move stores it"""
+        left = ecs.rect_round(self.player_x)
+        top = ecs.rect_round(self.player_y)
+        return left, top, left + self.player_width, top + self.player_height
+
+    def update_enemies(self):
+        """Move every enemy towards its player and apply contact damage"""
+        n = used_columns(self.enemy_alive)
+        x, y = self.enemy_x[:, :n], self.enemy_y[:, :n]
+        width = self.enemy_width[self.enemy_type[:, :n]]
+        height = self.enemy_height[self.enemy_type[:, :n]]
+        dx = self.player_x[:, None] - x
+        dy = self.player_y[:, None] - y
+        dist = np.hypot(dx, dy)
+        step = np.divide(self.enemy_speed, dist, out=np.zeros_like(dist), where=dist != 0)
+        x += dx * step
+        y += dy * step
+        np.clip(x, 0, self.map_width - width, out=x)
+        np.clip(y, 0, self.map_height - height, out=y)
+
+        left, top, right, bottom = self.player_rect()
+        rect_x, rect_y = ecs.rect_round(x), ecs.rect_round(y)
+        touching = (self.enemy_alive[:, :n] & (rect_x < right[:, None]) & (rect_x + width > left[:, None]) &
+                    (rect_y < bottom[:, None]) & (rect_y + height > top[:, None]))
+        self.health -= np.count_nonzero(touching, axis=1)
+
+    def update_projectiles(self):
+        """Age and move projectiles, then apply their hits and turn killed enemies into cakes"""
+        m = used_columns(self.proj_alive)
+        alive = self.proj_alive[:, :m]
+        kind = self.proj_kind[:, :m]
+        proj_x, proj_y = self.proj_x[:, :m], self.proj_y[:, :m]
+
+        # Missiles pick a new target once theirs is gone, then home in on it
+        missiles = alive & (kind == MAGIC_MISSILE)
+        if missiles.any():
+            target = self.proj_target[:, :m]
+            target_generation = self.proj_target_generation[:, :m]
+            safe = np.maximum(target, 0)
+            lost = missiles & ((target < 0) | ~np.take_along_axis(self.enemy_alive, safe, axis=1) |
+                               (np.take_along_axis(self.enemy_generation, safe, axis=1) != target_generation))
+            if lost.any():
+                games, slots = np.nonzero(lost)
+                found_target, found = self.nearest_enemies(games, proj_x[games, slots], proj_y[games, slots])
+                target[games, slots] = np.where(found, found_target, -1)
+                target_generation[games, slots] = self.enemy_generation[games, found_target]
+                safe = np.maximum(target, 0)
+            homing = missiles & (target >= 0)
+            target_type = np.take_along_axis(self.enemy_type, safe, axis=1)
+            dx = np.take_along_axis(self.enemy_x, safe, axis=1) + self.enemy_width[target_type] // 2 - proj_x
+            dy = np.take_along_axis(self.enemy_y, safe, axis=1) + self.enemy_height[target_type] // 2 - proj_y
+            dist = np.hypot(dx, dy)
+            step = np.divide(self.missile_speed, dist, out=np.zeros_like(dist), where=homing & (dist > 0))
+            proj_x += dx * step
+            proj_y += dy * step
+
+        life = self.proj_life[:, :m]
+        life -= alive
+        alive &= life > 0
+        n = used_columns(self.enemy_alive)
+        if n == 0 or not alive.any():
+            return
+
+        # Every live projectile against every live enemy of its game
+        left = ecs.rect_round(proj_x - self.proj_width[kind] // 2)
+        top = ecs.rect_round(proj_y - self.proj_top[kind])
+        right = left + self.proj_width[kind]
+        bottom = top + self.proj_height[kind]
+        enemy_alive = self.enemy_alive[:, :n]
+        enemy_x = ecs.rect_round(self.enemy_x[:, None, :n])
+        enemy_y = ecs.rect_round(self.enemy_y[:, None, :n])
+        width = self.enemy_width[self.enemy_type[:, None, :n]]
+        height = self.enemy_height[self.enemy_type[:, None, :n]]
+        overlap = (alive[:, :, None] & enemy_alive[:, None, :] &
+                   (enemy_x < right[:, :, None]) & (enemy_x + width > left[:, :, None]) &
+                   (enemy_y < bottom[:, :, None]) & (enemy_y + height > top[:, :, None]))
+        # Narrowed to the sprites' pixels, with offsets clipped where the rects are apart anyway
+        table = self.proj_shapes
+        offset_x = np.clip(enemy_x - left[:, :, None] + self.reach_x, 0, table.shape[2] - 1)
+        offset_y = np.clip(enemy_y - top[:, :, None] + self.reach_y, 0, table.shape[3] - 1)
+        overlap &= table[kind[:, :, None], self.enemy_type[:, None, :n], offset_x, offset_y]
+
+        # Lightning and missiles stop at their first enemy, fire cones hit all of them. First is the
+        # swarm's grid order: by the cell holding the enemy's corner, row by row, then by slot
+        pierces = self.proj_pierces[kind]
+        cell = (np.clip(enemy_y // self.cell_size, 0, self.grid_rows - 1) * self.grid_cols +
+                np.clip(enemy_x // self.cell_size, 0, self.grid_cols - 1))
+        order = np.where(overlap, cell * n + np.arange(n), np.iinfo(np.int64).max)
+        first = order.argmin(axis=2)
+        hit = overlap & (pierces[:, :, None] | (np.arange(n) == first[:, :, None]))
+        alive &= pierces | ~overlap.any(axis=2)
+        # Lingering ones at most once per hit interval
+        self.hits.expire(self.clock)
+        games, slots, enemies = np.nonzero(hit & (self.proj_interval[kind] > 0)[:, :, None])
+        if len(games):
+            stale = ~self.hits.strike(self.proj_uid[games, slots], self.enemy_uid[games, enemies], self.clock,
+                                      self.proj_interval[kind[games, slots]])
+            hit[games[stale], slots[stale], enemies[stale]] = False
+        damage = np.matmul(self.proj_damage[kind][:, None, :], hit.astype(np.float64))[:, 0]
+
+        hp = self.enemy_hp[:, :n]
+        hp -= damage
+        killed = enemy_alive & (hp <= 0)
+        if killed.any():
+            self.kills += np.count_nonzero(killed, axis=1)
+            enemy_alive &= ~killed
+            self.enemy_generation[:, :n] += killed
+            games, slots = np.nonzero(killed)
+            rows, cake_slots = self.allocate(self.CAKE_ARRAYS, np.count_nonzero(killed, axis=1))
+            self.cake_x[rows, cake_slots] = self.enemy_x[games, slots]
+            self.cake_y[rows, cake_slots] = self.enemy_y[games, slots]
+            self.cake_alive[rows, cake_slots] = True
+
+    def collect_cakes(self):
+        """Pick up the cakes under each player, level up, and return the XP gained"""
+        n = used_columns(self.cake_alive)
+        left, top, right, bottom = self.player_rect()
+        cake_alive = self.cake_alive[:, :n]
+        cake_x = ecs.rect_round(self.cake_x[:, :n])
+        cake_y = ecs.rect_round(self.cake_y[:, :n])
+        picked = (cake_alive & (cake_x < right[:, None]) & (cake_x + self.cake_width > left[:, None]) &
+                  (cake_y < bottom[:, None]) & (cake_y + self.cake_height > top[:, None]))
+        gained = np.count_nonzero(picked, axis=1) * self.cake_value
+        cake_alive &= ~picked
+
+        # Player.gain_xp one cake at a time: XP restarts from zero at each level
+        self.xp += gained
+        levelled = self.xp >= self.xp_to_level
+        while levelled.any():
+            self.xp[levelled] -= self.xp_to_level[levelled]
+            self.level[levelled] += 1
+            self.xp_to_level[levelled] = 10 * self.level[levelled]
+            self.health[levelled] = self.max_health
+            levelled = self.xp >= self.xp_to_level
+        return gained.astype(np.float32)
+
+    def nearest_columns(self, x, y, alive):
+        """Columns of the `nearest` live entities to each player, closest first, and which exist"""
+        k = self.nearest
+        dist = np.hypot(x - self.player_x[:, None], y - self.player_y[:, None])
+        dist[~alive] = np.inf
+        if dist.shape[1] < k:
+            dist = np.pad(dist, ((0, 0), (0, k - dist.shape[1])), constant_values=np.inf)
+        columns = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        columns = np.take_along_axis(columns, np.take_along_axis(dist, columns, axis=1).argsort(axis=1), axis=1)
+        present = np.isfinite(np.take_along_axis(dist, columns, axis=1))
+        return np.minimum(columns, max(x.shape[1] - 1, 0)), present  # Padding columns are never present
+
+    def observe(self):
+        """Observation matrix, one float32 row per game.
+
+        The player's position (as a fraction of the map), health fraction, XP
+        progress, level, ability cooldown fractions and speed burst fraction, then
+        for the `nearest` closest enemies their offset from the player (in map widths),
+        health fraction and a present flag, then the same for cakes without health.
+        Missing entities are all zeros.
+        """
+        k = self.nearest
+        obs = np.zeros((self.count, self.observation_size), dtype=np.float32)
+        obs[:, 0] = self.player_x / self.map_width
+        obs[:, 1] = self.player_y / self.map_height
+        obs[:, 2] = self.health / self.max_health
+        obs[:, 3] = self.xp / self.xp_to_level
+        obs[:, 4] = self.level
+        obs[:, 5:9] = self.cooldown / self.max_cooldown
+        obs[:, 9] = self.burst / self.burst_duration
+
+        n = used_columns(self.enemy_alive)
+        if n:
+            x, y = self.enemy_x[:, :n], self.enemy_y[:, :n]
+            columns, present = self.nearest_columns(x, y, self.enemy_alive[:, :n])
+            enemies = np.zeros((self.count, k, 4), dtype=np.float32)
+            enemies[..., 0] = (np.take_along_axis(x, columns, axis=1) - self.player_x[:, None]) / self.map_width
+            enemies[..., 1] = (np.take_along_axis(y, columns, axis=1) - self.player_y[:, None]) / self.map_width
+            enemies[..., 2] = np.take_along_axis(self.enemy_hp[:, :n], columns, axis=1) / self.enemy_health
+            enemies[..., 3] = 1
+            enemies[~present] = 0
+            obs[:, PLAYER_FEATURES:PLAYER_FEATURES + 4 * k] = enemies.reshape(self.count, -1)
+
+        n = used_columns(self.cake_alive)
+        if n:
+            x, y = self.cake_x[:, :n], self.cake_y[:, :n]
+            columns, present = self.nearest_columns(x, y, self.cake_alive[:, :n])
+            cakes = np.zeros((self.count, k, 3), dtype=np.float32)
+            cakes[..., 0] = (np.take_along_axis(x, columns, axis=1) - self.player_x[:, None]) / self.map_width
+            cakes[..., 1] = (np.take_along_axis(y, columns, axis=1) - self.player_y[:, None]) / self.map_width
+            cakes[..., 2] = 1
+            cakes[~present] = 0
+            obs[:, PLAYER_FEATURES + 4 * k:] = cakes.reshape(self.count, -1)
+        return obs